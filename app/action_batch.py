@@ -0,0 +1,156 @@
+# app/action_batch.py
+"""
+Wykonanie uporządkowanej listy akcji na jednym stanie gry - wszystko albo nic.
+
+Akcje mają format dziennika zdarzeń (jak w replay.py):
+    {"type": "agent_move", "player": ..., "card": ..., "location": ..., "kwargs": {...}}
+    {"type": "pass_turn", "player": ...}
+    {"type": "play_intrigue", "player": ..., "intrigue": ..., "kwargs": {...}}
+    {"type": "buy_card", "player": ..., "card": ...}
+    {"type": "commit_troops", "player": ..., "amount": ...}
+Każda akcja przechodzi tę samą walidację i te same funkcje game_manager, co
+odpowiadająca jej trasa formularza (is_move_valid, process_move,
+process_buy_card, ...). Ruch lub intryga wymagające decyzji muszą mieć ją
+w "kwargs" (pay_cost, choice_index) - inaczej akcja jest odrzucana.
+
+apply_batch pracuje na kopii stanu: pierwszy błąd przerywa całą listę
+(ActionError), a stan wejściowy pozostaje nietknięty. Udana lista to jeden
+nowy stan, zapisywany przez wywołującego jednym save_game_state.
+"""
+from game_manager import (
+    is_move_valid, process_move, check_and_advance_phase, process_pass_turn, process_intrigue,
+    process_buy_card, process_commit_troops, get_agent_move_requirements, get_intrigue_requirements
+)
+from state_diff import clone
+
+# Klucze, które musi mieć akcja danego typu (poza "type")
+REQUIRED_FIELDS = {
+    "agent_move": ("player", "card", "location"),
+    "pass_turn": ("player",),
+    "play_intrigue": ("player", "intrigue"),
+    "buy_card": ("player", "card"),
+    "commit_troops": ("player", "amount"),
+}
+DECISION_KWARGS = ("pay_cost", "choice_index")
+
+
+class ActionError(Exception):
+    """Akcja `index` z listy nie mogła zostać wykonana - cała lista jest odrzucona."""
+
+    def __init__(self, index, action, message):
+        super().__init__(f"Action {index} ({action.get('type') if isinstance(action, dict) else action}): {message}")
+        self.index = index
+        self.action = action
+        self.message = message
+
+
+def _decision_kwargs(action):
+    kwargs = action.get("kwargs") or {}
+    if not isinstance(kwargs, dict) or any(key not in DECISION_KWARGS for key in kwargs):
+        raise ValueError(f"kwargs may only contain {', '.join(DECISION_KWARGS)}.")
+    if "choice_index" in kwargs:
+        kwargs["choice_index"] = int(kwargs["choice_index"])
+    if "pay_cost" in kwargs:
+        kwargs["pay_cost"] = bool(kwargs["pay_cost"])
+    return kwargs
+
+
+def _require_phase(game_state, *phases):
+    phase = game_state.get("current_phase")
+    if phase not in phases:
+        raise ValueError(f"Not allowed in phase {phase} (needs {' or '.join(phases)}).")
+
+
+def _agent_move(game_state, action, dbs):
+    locations_db, cards_db, _, leaders_db = dbs
+    player_name, card_id, location_id = action["player"], action["card"], action["location"]
+    is_valid, message = is_move_valid(game_state, locations_db, leaders_db, cards_db, player_name, card_id, location_id)
+    if not is_valid:
+        raise ValueError(message)
+    kwargs = _decision_kwargs(action)
+    requirements = get_agent_move_requirements(card_id, location_id, game_state["players"][player_name],
+                                               cards_db, locations_db, leaders_db)
+    if requirements["type"] != "simple" and not kwargs:
+        raise ValueError(f"Move requires a decision for effect from {requirements.get('source', 'Unknown')} "
+                         f"(pass kwargs: {', '.join(DECISION_KWARGS)}).")
+    process_move(game_state, locations_db, cards_db, leaders_db, player_name, card_id, location_id, **kwargs)
+    check_and_advance_phase(game_state, cards_db)
+    return f"Player {player_name} played {card_id} on {location_id}."
+
+
+def _pass_turn(game_state, action, dbs):
+    _require_phase(game_state, "AGENT_TURN")
+    _, is_valid, message = process_pass_turn(game_state, action["player"])
+    if not is_valid:
+        raise ValueError(message)
+    check_and_advance_phase(game_state, dbs[1])
+    return message
+
+
+def _play_intrigue(game_state, action, dbs):
+    _, cards_db, intrigues_db, leaders_db = dbs
+    _require_phase(game_state, "AGENT_TURN", "REVEAL")
+    player_name, intrigue_id = action["player"], action["intrigue"]
+    player_state = game_state.get("players", {}).get(player_name)
+    if not player_state or intrigue_id not in player_state.get("intrigue_hand", []):
+        raise ValueError(f"Player {player_name} does not have card {intrigue_id}.")
+    kwargs = _decision_kwargs(action)
+    requirements = get_intrigue_requirements(intrigue_id, intrigues_db)
+    if requirements["type"] not in ("simple", "not_found") and not kwargs:
+        raise ValueError(f"Intrigue {intrigue_id} requires a decision (pass kwargs: {', '.join(DECISION_KWARGS)}).")
+    is_valid, message = process_intrigue(game_state, intrigues_db, cards_db, leaders_db, player_name, intrigue_id, **kwargs)
+    if not is_valid:
+        raise ValueError(message)
+    return message
+
+
+def _buy_card(game_state, action, dbs):
+    _require_phase(game_state, "REVEAL")
+    is_valid, message = process_buy_card(game_state, action["player"], action["card"], dbs[1])
+    if not is_valid:
+        raise ValueError(message)
+    return message
+
+
+def _commit_troops(game_state, action, dbs):
+    _require_phase(game_state, "REVEAL")
+    is_valid, message = process_commit_troops(game_state, action["player"], action["amount"])
+    if not is_valid:
+        raise ValueError(message)
+    return message
+
+
+BATCH_HANDLERS = {
+    "agent_move": _agent_move,
+    "pass_turn": _pass_turn,
+    "play_intrigue": _play_intrigue,
+    "buy_card": _buy_card,
+    "commit_troops": _commit_troops,
+}
+
+
+def apply_batch(game_state, actions, dbs):
+    """
+    Wykonuje `actions` po kolei na kopii `game_state`. `dbs` to
+    (locations_db, cards_db, intrigues_db, leaders_db).
+    Zwraca (nowy stan, komunikaty akcji, akcje w postaci do dziennika);
+    przy pierwszej nieudanej akcji rzuca ActionError.
+    """
+    if not isinstance(actions, list) or not actions:
+        raise ActionError(0, {}, "Expected a non-empty list of actions.")
+    working_state = clone(game_state)
+    messages = []
+    logged = []
+    for index, action in enumerate(actions):
+        if not isinstance(action, dict) or action.get("type") not in BATCH_HANDLERS:
+            raise ActionError(index, action, f"Unknown action type; expected one of {', '.join(BATCH_HANDLERS)}.")
+        missing = [key for key in REQUIRED_FIELDS[action["type"]] if action.get(key) in (None, "")]
+        if missing:
+            raise ActionError(index, action, f"Missing field(s): {', '.join(missing)}.")
+        try:
+            messages.append(BATCH_HANDLERS[action["type"]](working_state, action, dbs))
+        except (ValueError, TypeError) as e:
+            raise ActionError(index, action, str(e))
+        logged.append({key: action[key] for key in ("type",) + REQUIRED_FIELDS[action["type"]] + ("kwargs",)
+                       if key in action})
+    return working_state, messages, logged
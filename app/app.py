@@ -1,12 +1,18 @@
 # app.py
-from flask import Flask, render_template, request, redirect, url_for, flash
+from flask import Flask, render_template, request, redirect, url_for, flash, g, abort, session, Response
+import functools
 import json
 import os
+import random
+import signal
+import sys
+import tempfile
+import time
 
 from game_manager import (
-    load_game_data, perform_full_game_reset, save_json_file, is_move_valid, process_move, 
+    load_game_data, perform_full_game_reset, save_game_state, is_move_valid, process_move, 
     check_and_advance_phase, process_intrigue,
-    calculate_reveal_stats, calculate_and_store_reveal_stats, perform_cleanup_and_new_round,    GAME_STATE_FILE,
+    calculate_reveal_stats, calculate_and_store_reveal_stats, perform_cleanup_and_new_round,
     process_pass_turn,
     process_buy_card,
     get_card_persuasion_cost,
@@ -15,18 +21,132 @@ from game_manager import (
     AI_PLAYER_NAME,
     process_conflict_set,
     process_conflict_resolve,
+    rank_conflict_results,
     save_json_file_from_text,
     manual_add_intrigue,
     get_intrigue_requirements,
     get_agent_move_requirements,
-    process_commit_troops
+    decision_map,
+    process_commit_troops,
+    legal_moves,
+    load_catalogs,
+    load_game_state,
+    game_state_version,
+    CATALOG,
+    DEFAULT_GAME_ID,
+    is_valid_game_id,
+    StaleStateError
 )
 
-from build_ai_prompt import generate_ai_prompt
+from compact_prompt import estimate_tokens, DEFAULT_TOKEN_BUDGET
+from prompt_cache import PROMPTS, PROMPT_FORMATS
+from state_view import hide, redacted_view, json_default, DERIVED_PLAYER_FIELDS
+from action_batch import apply_batch, ActionError
+from live_updates import LIVE, RELOAD_FRAME, HEARTBEAT_FRAME, page_state as live_page_state
+from monte_carlo import recommend_moves, DEFAULT_TIME_BUDGET
+from move_preview import PREVIEWS
+from simulator import POLICIES
+import metrics
+
+# Pomiar czasu żądań: każde wywołanie jest doliczane do fazy load/engine/render/save
+load_game_data = metrics.timed('load', load_game_data)
+load_game_state = metrics.timed('load', load_game_state)
+game_state_version = metrics.timed('load', game_state_version)
+save_game_state = metrics.timed('save', save_game_state)
+save_json_file_from_text = metrics.timed('save', save_json_file_from_text)
+render_template = metrics.timed('render', render_template)
+for _engine_fn in (
+    is_move_valid, process_move, check_and_advance_phase, process_intrigue, calculate_reveal_stats,
+    calculate_and_store_reveal_stats, perform_cleanup_and_new_round, process_pass_turn, process_buy_card,
+    add_card_to_market, set_player_hand, process_conflict_set, process_conflict_resolve, rank_conflict_results,
+    manual_add_intrigue, get_intrigue_requirements, get_agent_move_requirements, process_commit_troops,
+    legal_moves, perform_full_game_reset, recommend_moves, apply_batch,
+):
+    globals()[_engine_fn.__name__] = metrics.timed('engine', _engine_fn)
+# Generowanie promptów AI (pełny, zwarty, delta) idzie przez pamięć promptów
+PROMPTS.issue = metrics.timed('engine', PROMPTS.issue)
+PREVIEWS.preview = metrics.timed('engine', PREVIEWS.preview)
 
 app = Flask(__name__)
 app.secret_key = 'your_super_secret_dune_key' 
 
+@app.before_request
+def start_request_timer():
+    metrics.start_request()
+
+@app.after_request
+def record_request_timer(response):
+    route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    metrics.finish_request(route, request.method, response.status_code)
+    return response
+
+@app.route('/metrics')
+def prometheus_metrics():
+    return Response(metrics.export_prometheus(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/metrics/profile')
+def profile_stats():
+    """Zsumowane statystyki profilera (?sort=tottime&limit=50 albo ?format=prof - plik dla pstats)."""
+    if request.args.get('format') == 'prof':
+        fd, path = tempfile.mkstemp(suffix='.prof')
+        os.close(fd)
+        try:
+            if not metrics.dump_profile(path):
+                abort(404)
+            with open(path, 'rb') as f:
+                data = f.read()
+        finally:
+            os.remove(path)
+        return Response(data, mimetype='application/octet-stream',
+                        headers={'Content-Disposition': 'attachment; filename=dune.prof'})
+    report = metrics.profile_report(request.args.get('sort', 'cumulative'), request.args.get('limit', 50, type=int))
+    if report is None:
+        return Response("No profiled requests. Set DUNE_PROFILE_SAMPLE (e.g. 0.05) to enable sampling.\n",
+                        mimetype='text/plain', status=404)
+    return Response(report, mimetype='text/plain')
+
+# Każdy stół (gra) ma własny prefiks URL: /g/<game_id>/...
+# game_id trafia do `g.game_id` i jest automatycznie doklejany w url_for().
+@app.url_value_preprocessor
+def pull_game_id(endpoint, values):
+    if values and 'game_id' in values:
+        game_id = values.pop('game_id')
+        if not is_valid_game_id(game_id):
+            abort(404)
+        g.game_id = game_id
+
+@app.url_defaults
+def add_game_id(endpoint, values):
+    if 'game_id' in values or not app.url_map.is_endpoint_expecting(endpoint, 'game_id'):
+        return
+    values['game_id'] = getattr(g, 'game_id', DEFAULT_GAME_ID)
+
+# Ile razy trasa jest ponawiana, gdy ktoś inny zapisał stan gry w międzyczasie
+STATE_CONFLICT_RETRIES = 8
+
+def retry_on_conflict(view):
+    """
+    Optymistyczna współbieżność: jeśli zapis stanu się nie powiódł, bo inny
+    gracz zdążył zapisać nowszą wersję, cała trasa jest wykonywana ponownie
+    na świeżo wczytanym stanie. Po wyczerpaniu prób zwraca 409.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        flashes = list(session.get('_flashes', []))
+        for attempt in range(STATE_CONFLICT_RETRIES):
+            try:
+                return view(*args, **kwargs)
+            except StaleStateError:
+                # Komunikaty z nieudanej próby nie powinny trafić do gracza
+                session['_flashes'] = list(flashes)
+                time.sleep(random.uniform(0, 0.01 * (attempt + 1)))
+        return render_template('conflict.html'), 409
+    return wrapper
+
+@app.route('/')
+def root():
+    return redirect(url_for('index', game_id=DEFAULT_GAME_ID))
+
 def get_player_names(game_state):
     """Gets player names."""
     if game_state and "players" in game_state:
@@ -53,9 +173,64 @@ def get_available_locations(locations_db, game_state):
             })
     return sorted(available_locations, key=lambda x: x['name'])
 
-@app.route('/', methods=['GET', 'POST'])
+def build_table_view(game_state, locations_db, cards_db, intrigues_db, leaders_db):
+    """
+    Dane formularzy strony stołu: ręce, agenci, intrygi i legalne ruchy
+    graczy oraz wolne lokacje. Ten sam słownik trafia do szablonu index.html
+    i (jako widok "table") do łatek rozsyłanych przez /events.
+    """
+    player_card_map = {}
+    player_agent_map = {}
+    player_intrigue_map = {}
+    player_legal_moves = {}
+    
+    player_states = game_state.get("players", {})
+    
+    for player_name, player_data in player_states.items():
+        card_ids_list = player_data.get("hand", [])
+        player_card_list = []
+        for card_id in card_ids_list:
+            if card_id in cards_db:
+                player_card_list.append({
+                    "id": card_id,
+                    "name": cards_db[card_id].get("name", card_id)
+                })
+        player_card_map[player_name] = sorted(player_card_list, key=lambda x: x['name'])
+
+        # Legalne lokacje dla każdej karty z ręki (karta -> [lokacje])
+        legal_map = {}
+        for card_id, location_id in legal_moves(game_state, player_name, locations_db, cards_db, leaders_db):
+            legal_map.setdefault(card_id, []).append(location_id)
+        player_legal_moves[player_name] = legal_map
+    
+        player_agent_map[player_name] = {
+            "placed": player_data.get("agents_placed", 0),
+            "total": player_data.get("agents_total", 2),
+            "has_passed": player_data.get("has_passed", False),
+            "draw_deck_count": len(player_data.get("draw_deck", []))
+        }
+        
+        intrigue_list = []
+        for intrigue_id in player_data.get("intrigue_hand", []):
+            intrigue_data = intrigues_db.get(intrigue_id, {})
+            intrigue_list.append({
+                "id": intrigue_id,
+                "name": intrigue_data.get("name", intrigue_id)
+            })
+        player_intrigue_map[player_name] = sorted(intrigue_list, key=lambda x: x['name'])
+
+    return {
+        "player_card_map": player_card_map,
+        "player_agent_map": player_agent_map,
+        "player_intrigue_map": player_intrigue_map,
+        "player_legal_moves": player_legal_moves,
+        "locations": get_available_locations(locations_db, game_state),
+    }
+
+@app.route('/g/<game_id>/', methods=['GET', 'POST'])
+@retry_on_conflict
 def index():
-    game_state, locations_db, cards_db, intrigues_db, conflicts_db, leaders_db = load_game_data() 
+    game_state, locations_db, cards_db, intrigues_db, conflicts_db, leaders_db = load_game_data(g.game_id) 
 
     if not all([game_state, locations_db, cards_db, intrigues_db, conflicts_db, leaders_db]): 
         flash("CRITICAL ERROR: Cannot load core game data. Check JSON files.", "error")
@@ -78,25 +253,22 @@ def index():
             return redirect(url_for('index'))
 
         # 2. (NOWA LOGIKA) Sprawdź, czy ruch wymaga decyzji
-        card_data = cards_db.get(card_id_input, {})
-        location_data = locations_db.get(location_id_input, {})
         player_state = game_state.get("players", {}).get(player_name_input, {})
-        
-        requirements = get_agent_move_requirements(card_data, location_data, leaders_db, player_state)
+        requirements = get_agent_move_requirements(card_id_input, location_id_input, player_state,
+                                                   cards_db, locations_db, leaders_db)
 
         if requirements["type"] == "simple":
             # --- Ruch jest prosty, wykonaj natychmiast ---
             new_game_state = process_move(game_state, locations_db, cards_db, leaders_db, player_name_input, card_id_input, location_id_input) # kwargs nie są potrzebne
             final_game_state = check_and_advance_phase(new_game_state, cards_db)
             
-            if save_json_file(GAME_STATE_FILE, final_game_state):
+            if save_game_state(final_game_state, {"type": "agent_move", "player": player_name_input, "card": card_id_input, "location": location_id_input}, g.game_id):
                  flash(f"Success! Player {player_name_input}'s move has been played.", "success")
             else:
                  flash("CRITICAL ERROR: Cannot save game state to disk.", "error")
         else:
             # --- Ruch jest złożony, wymaga decyzji ---
-            # Zapisz stan na wszelki wypadek
-            save_json_file(GAME_STATE_FILE, game_state)
+            # Stan się jeszcze nie zmienił - zapis nastąpi po wyborze opcji
             flash(f"Move requires a decision for effect from: {requirements.get('source', 'Unknown')}", "success")
             # Przekieruj do nowego widoku decyzji
             return redirect(url_for('resolve_agent_move', 
@@ -110,46 +282,12 @@ def index():
     current_round = game_state.get("round", 1) 
     round_history = game_state.get("round_history", [])
     player_names = get_player_names(game_state)
-    available_locations = get_available_locations(locations_db, game_state)
     
     # Przekaż listę wszystkich intryg do szablonu
     all_intrigues = intrigues_db if intrigues_db else {}
     
     current_conflict = game_state.get("current_conflict_card", {"name": "N/A", "rewards_text": []})
-    
-    player_card_map = {}
-    player_agent_map = {}
-    player_intrigue_map = {}
-    
-    player_states = game_state.get("players", {})
-    
-    for player_name, player_data in player_states.items():
-        card_ids_list = player_data.get("hand", [])
-        player_card_list = []
-        for card_id in card_ids_list:
-            if card_id in cards_db:
-                player_card_list.append({
-                    "id": card_id,
-                    "name": cards_db[card_id].get("name", card_id)
-                })
-        player_card_map[player_name] = sorted(player_card_list, key=lambda x: x['name'])
-    
-        player_agent_map[player_name] = {
-            "placed": player_data.get("agents_placed", 0),
-            "total": player_data.get("agents_total", 2),
-            "has_passed": player_data.get("has_passed", False),
-            "draw_deck_count": len(player_data.get("draw_deck", []))
-        }
-        
-        intrigue_list = []
-        for intrigue_id in player_data.get("intrigue_hand", []):
-            intrigue_data = intrigues_db.get(intrigue_id, {})
-            intrigue_list.append({
-                "id": intrigue_id,
-                "name": intrigue_data.get("name", intrigue_id)
-            })
-        player_intrigue_map[player_name] = sorted(intrigue_list, key=lambda x: x['name'])
-
+    table_view = build_table_view(game_state, locations_db, cards_db, intrigues_db, leaders_db)
         
     return render_template('index.html', 
         current_player=current_player, 
@@ -157,28 +295,33 @@ def index():
         current_round=current_round, 
         round_history=round_history,
         player_names=player_names,
-        player_card_map=player_card_map,
-        player_agent_map=player_agent_map, 
-        player_intrigue_map=player_intrigue_map,
-        locations=available_locations,
+        player_card_map=table_view["player_card_map"],
+        player_agent_map=table_view["player_agent_map"], 
+        player_intrigue_map=table_view["player_intrigue_map"],
+        player_legal_moves=table_view["player_legal_moves"],
+        locations=table_view["locations"],
+        location_names={loc_id: loc_data.get("name", loc_id) for loc_id, loc_data in locations_db.items()},
+        decision_map=decision_map(game_state, cards_db, locations_db, leaders_db),
         ai_player_name=AI_PLAYER_NAME,
         current_conflict=current_conflict,
         all_conflicts=conflicts_db,
-        all_intrigues=all_intrigues
+        all_intrigues=all_intrigues,
+        live_state=live_page_state(game_state)
     )
 
-@app.route('/full_reset')
+@app.route('/g/<game_id>/full_reset')
 def full_reset():
-    success, message = perform_full_game_reset()
+    success, message = perform_full_game_reset(g.game_id)
     if success:
         flash(message, "success")
     else:
         flash(message, "error")
     return redirect(url_for('index'))
 
-@app.route('/set_conflict', methods=['POST'])
+@app.route('/g/<game_id>/set_conflict', methods=['POST'])
+@retry_on_conflict
 def set_conflict():
-    game_state, _, _, _, conflicts_db, _ = load_game_data()
+    game_state, _, _, _, conflicts_db, _ = load_game_data(g.game_id)
 
     if game_state.get("current_phase") != "AGENT_TURN":
         flash("Cannot set conflict: Not in AGENT_TURN phase.", "error")
@@ -194,7 +337,7 @@ def set_conflict():
     is_valid, message = process_conflict_set(game_state, conflicts_db, conflict_id)
     
     if is_valid:
-        if save_json_file(GAME_STATE_FILE, game_state):
+        if save_game_state(game_state, {"type": "set_conflict", "conflict": conflict_id}, g.game_id):
             flash(message, "success")
         else:
             flash("CRITICAL ERROR: Cannot save game state after setting conflict.", "error")
@@ -203,9 +346,10 @@ def set_conflict():
         
     return redirect(url_for('index'))
 
-@app.route('/play_intrigue', methods=['POST'])
+@app.route('/g/<game_id>/play_intrigue', methods=['POST'])
+@retry_on_conflict
 def play_intrigue():
-    game_state, _, cards_db, intrigues_db, _, leaders_db = load_game_data()
+    game_state, _, cards_db, intrigues_db, _, leaders_db = load_game_data(g.game_id)
 
     current_phase = game_state.get("current_phase", "AGENT_TURN")
     redirect_target = 'reveal_phase' if current_phase == "REVEAL" else 'index'
@@ -231,7 +375,7 @@ def play_intrigue():
         is_valid, message = process_intrigue(game_state, intrigues_db, cards_db, leaders_db, player_name_input, intrigue_id_input)
         
         if is_valid:
-            save_json_file(GAME_STATE_FILE, game_state)
+            save_game_state(game_state, {"type": "play_intrigue", "player": player_name_input, "intrigue": intrigue_id_input}, g.game_id)
             flash(f"Intrigue played: {message}", "success")
         else:
             flash(f"Invalid intrigue play: {message}", "error")
@@ -240,21 +384,20 @@ def play_intrigue():
         
     else:
         # Karta złożona -> Przekieruj do nowego widoku, aby podjąć decyzję
-        # Zapisz stan na wszelki wypadek (choć karta nie została jeszcze zagrana)
-        save_json_file(GAME_STATE_FILE, game_state)
+        # Stan się jeszcze nie zmienił - zapis nastąpi po wyborze opcji
         return redirect(url_for('resolve_intrigue', 
                                 player_name=player_name_input, 
                                 intrigue_id=intrigue_id_input))
 
 
 # DODAJ TĘ NOWĄ TRASĘ (GET)
-@app.route('/resolve_intrigue/<string:player_name>/<string:intrigue_id>')
+@app.route('/g/<game_id>/resolve_intrigue/<string:player_name>/<string:intrigue_id>')
 def resolve_intrigue(player_name, intrigue_id):
     """
     Wyświetla stronę, na której gracz może podjąć decyzję 
     dotyczącą złożonej karty intrygi.
     """
-    game_state, _, _, intrigues_db, _, _ = load_game_data()
+    game_state, _, _, intrigues_db, _, _ = load_game_data(g.game_id)
     
     card_data = intrigues_db.get(intrigue_id)
     if not card_data:
@@ -276,13 +419,14 @@ def resolve_intrigue(player_name, intrigue_id):
 
 
 # DODAJ TĘ NOWĄ TRASĘ (POST)
-@app.route('/execute_intrigue', methods=['POST'])
+@app.route('/g/<game_id>/execute_intrigue', methods=['POST'])
+@retry_on_conflict
 def execute_intrigue():
     """
     Odbiera decyzję gracza z formularza i wywołuje 
     "idealną" funkcję process_intrigue z odpowiednimi kwargs.
     """
-    game_state, _, cards_db, intrigues_db, _, leaders_db = load_game_data()    
+    game_state, _, cards_db, intrigues_db, _, leaders_db = load_game_data(g.game_id)    
 
     # Odczytaj dane z formularza
     player_name = request.form.get('player_name')
@@ -303,10 +447,10 @@ def execute_intrigue():
     is_valid, message = process_intrigue(game_state, intrigues_db, cards_db, leaders_db, player_name, intrigue_id, **kwargs)
 
     if is_valid:
-        save_json_file(GAME_STATE_FILE, game_state)
+        save_game_state(game_state, {"type": "play_intrigue", "player": player_name, "intrigue": intrigue_id, "kwargs": kwargs}, g.game_id)
         flash(f"Intrigue executed: {message}", "success")
     else:
-        save_json_file(GAME_STATE_FILE, game_state)
+        # Zagranie odrzucone - nie zapisujemy akcji, której nie było
         flash(f"Intrigue failed: {message}", "error")
 
     current_phase = game_state.get("current_phase", "AGENT_TURN")
@@ -315,9 +459,10 @@ def execute_intrigue():
     return redirect(url_for(redirect_target))
 
 
-@app.route('/pass_turn', methods=['POST'])
+@app.route('/g/<game_id>/pass_turn', methods=['POST'])
+@retry_on_conflict
 def pass_turn():
-    game_state, _, cards_db, _, _, _ = load_game_data()
+    game_state, _, cards_db, _, _, _ = load_game_data(g.game_id)
     
     if game_state.get("current_phase") != "AGENT_TURN":
         flash("Cannot pass: Not in AGENT_TURN phase.", "error")
@@ -333,21 +478,18 @@ def pass_turn():
     if is_valid:
         flash(message, "success")
         final_game_state = check_and_advance_phase(game_state, cards_db)
-        save_json_file(GAME_STATE_FILE, final_game_state)
+        save_game_state(final_game_state, {"type": "pass_turn", "player": player_name_input}, g.game_id)
     else:
         flash(f"Invalid pass: {message}", "error")
 
     return redirect(url_for('index'))
 
 
-@app.route('/reveal')
-def reveal_phase():
-    game_state, _, cards_db, intrigues_db, _, _ = load_game_data()
-    
-    current_phase = game_state.get("current_phase", "Unknown Phase")
-    if current_phase != "REVEAL":
-        return redirect(url_for('index'))
-        
+def build_reveal_view(game_state, cards_db, intrigues_db):
+    """
+    Dane strony Fazy Odkrycia: statystyki graczy, rynek i intrygi bitewne.
+    Trafiają do szablonu reveal.html i (jako widok "reveal") do łatek /events.
+    """
     all_player_stats = []
     player_states = game_state.get("players", {})
     all_alliances = game_state.get("alliances", {})
@@ -362,7 +504,7 @@ def reveal_phase():
                     "id": intrigue_id,
                     "name": intrigue_data.get("name", intrigue_id)
                 })
-    player_intrigue_map[player_name] = sorted(intrigue_list, key=lambda x: x['name'])
+        player_intrigue_map[player_name] = sorted(intrigue_list, key=lambda x: x['name'])
     for player_name, player_data in player_states.items():
         stats = calculate_reveal_stats(player_data, cards_db, player_name, all_alliances)
         stats["name"] = player_name
@@ -386,6 +528,22 @@ def reveal_phase():
             "name": card_data.get("name", card_id), 
             "cost": cost_display
         })
+
+    return {
+        "all_player_stats": all_player_stats,
+        "market_cards": market_cards_details,
+        "player_intrigue_map": player_intrigue_map,
+    }
+
+@app.route('/g/<game_id>/reveal')
+def reveal_phase():
+    game_state, _, cards_db, intrigues_db, _, _ = load_game_data(g.game_id)
+    
+    current_phase = game_state.get("current_phase", "Unknown Phase")
+    if current_phase != "REVEAL":
+        return redirect(url_for('index'))
+
+    reveal_view = build_reveal_view(game_state, cards_db, intrigues_db)
         
     all_buyable_cards = []
     for card_id, card_data in cards_db.items():
@@ -399,116 +557,91 @@ def reveal_phase():
 
     return render_template('reveal.html',
         current_round=game_state.get("round", 1),
-        all_player_stats=all_player_stats,
-        market_cards=market_cards_details,
+        all_player_stats=reveal_view["all_player_stats"],
+        market_cards=reveal_view["market_cards"],
         player_names=get_player_names(game_state),
         ai_player_name=AI_PLAYER_NAME,
         round_history=game_state.get("round_history", []),
         all_buyable_cards=all_buyable_cards,
-        player_intrigue_map=player_intrigue_map,
-        current_conflict=current_conflict
+        player_intrigue_map=reveal_view["player_intrigue_map"],
+        current_conflict=current_conflict,
+        live_state=live_page_state(game_state)
     )
 
-@app.route('/resolve_conflict_auto', methods=['POST'])
-def resolve_conflict_auto():
-    game_state, _, _, _, _, _ = load_game_data()
-
-    if game_state.get("current_phase") != "REVEAL":
-        flash("Cannot resolve conflict: Not in REVEAL phase.", "error")
-        return redirect(url_for('reveal_phase'))
+# --- Zmiany stanu na żywo (Server-Sent Events) ---
+# Po każdym zapisie LIVE liczy jedną łatkę i raz wylicza widoki stron;
+# otwarte strony stołu poprawiają się same zamiast przeładowywać.
 
-    player_stats = []
-    for player_name, player_data in game_state.get("players", {}).items():
-        stats = player_data.get("reveal_stats", {})
+def _live_table_view(game_state):
+    if game_state.get("current_phase") == "REVEAL":
+        return None
+    locations_db, cards_db, intrigues_db, _, leaders_db = load_catalogs()
+    return build_table_view(game_state, locations_db, cards_db, intrigues_db, leaders_db)
 
-        # 1. Siła z kart (z calculate_reveal_stats)
-        base_swords_from_cards = stats.get("base_swords", 0)
+def _live_reveal_view(game_state):
+    if game_state.get("current_phase") != "REVEAL":
+        return None
+    _, cards_db, intrigues_db, _, _ = load_catalogs()
+    return build_reveal_view(game_state, cards_db, intrigues_db)
 
-        # 2. Siła z intryg (np. Ambush)
-        bonus_swords_from_intrigues = player_data.get("active_effects", {}).get("fight_bonus_swords", 0)
+LIVE.register_view("table", _live_table_view)
+LIVE.register_view("reveal", _live_reveal_view)
 
-        # 3. (POPRAWKA) Siła z wysłanych wojsk (2 za jednostkę)
-        troops_committed = player_data.get("resources", {}).get("troops_in_conflict", 0)
-        swords_from_troops = troops_committed * 2
+@app.route('/g/<game_id>/events')
+def events():
+    """
+    Strumień SSE zmian stanu stołu. `?since=<wersja>` (albo nagłówek
+    Last-Event-ID po ponownym połączeniu) to wersja stanu, którą ma strona;
+    jeśli serwer nie może z niej kontynuować, wysyła "reload".
+    """
+    since = request.headers.get('Last-Event-ID', request.args.get('since'))
+    game_state = load_game_state(g.game_id)
+    if not game_state:
+        abort(404)
+    subscription = LIVE.subscribe(g.game_id, game_state)
 
-        # 4. Finalna siła
-        final_swords = base_swords_from_cards + bonus_swords_from_intrigues + swords_from_troops
+    def stream():
+        try:
+            if since is None or str(since) != str(subscription.version):
+                yield RELOAD_FRAME
+                return
+            # Przeglądarka po zerwaniu połączenia ponawia je po 2 s
+            yield "retry: 2000\n\n"
+            while True:
+                frame = subscription.next_frame()
+                if frame is None:
+                    yield HEARTBEAT_FRAME
+                    continue
+                yield frame
+                if frame is RELOAD_FRAME:
+                    return
+        finally:
+            LIVE.unsubscribe(subscription)
+
+    return Response(stream(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/g/<game_id>/resolve_conflict_auto', methods=['POST'])
+@retry_on_conflict
+def resolve_conflict_auto():
+    game_state, _, _, _, _, _ = load_game_data(g.game_id)
 
-        player_stats.append({
-            "name": player_name,
-            "swords": final_swords
-        })
-    
-    # 1.5 Pobierz całkowitą liczbę graczy w grze
-    num_players = len(game_state.get("players", {}))
+    if game_state.get("current_phase") != "REVEAL":
+        flash("Cannot resolve conflict: Not in REVEAL phase.", "error")
+        return redirect(url_for('reveal_phase'))
 
-    # 2. Pogrupuj graczy walczących (siła > 0) według ich wyników
-    contenders = [p for p in player_stats if p['swords'] > 0]
-    if not contenders:
+    first_place_list, second_place_list, third_place_list = rank_conflict_results(game_state)
+    if not any([first_place_list, second_place_list, third_place_list]):
         flash("Conflict resolved automatically: No one had any swords.", "success")
         is_valid, message = process_conflict_resolve(game_state, [], [], [])
-        save_json_file(GAME_STATE_FILE, game_state)
+        save_game_state(game_state, {"type": "resolve_conflict"}, g.game_id)
         return redirect(url_for('reveal_phase'))
 
-    scores_to_players = {}
-    for p in contenders:
-        score = p['swords']
-        if score not in scores_to_players:
-            scores_to_players[score] = []
-        scores_to_players[score].append(p['name'])
-
-    # 3. Pobierz posortowaną listę unikalnych wyników
-    unique_scores = sorted(scores_to_players.keys(), reverse=True)
-
-    # 4. Zainicjuj listy nagród
-    first_place_list = []
-    second_place_list = []
-    third_place_list = []
-
-    # 5. Przypisz grupy graczy do wyników
-    players_score1 = scores_to_players[unique_scores[0]]
-    players_score2 = scores_to_players[unique_scores[1]] if len(unique_scores) > 1 else []
-    players_score3 = scores_to_players[unique_scores[2]] if len(unique_scores) > 2 else []
-
-    # 6. Zastosuj oficjalne zasady przyznawania nagród
-    if len(players_score1) == 1:
-        # --- Przypadek A: Czysty zwycięzca 1. miejsca ---
-        first_place_list = players_score1
-        
-        if len(players_score2) == 1:
-            # A1: Czysty zwycięzca 2. miejsca
-            second_place_list = players_score2
-            
-            # Sprawdź 3. miejsce
-            if len(players_score3) == 1:
-                # A1a: Czysty zwycięzca 3. miejsca
-                third_place_list = players_score3
-            # else (remis o 3. miejsce): nikt nie dostaje 3. nagrody
-        
-        elif len(players_score2) > 1:
-            # A2: Remis o 2. miejsce
-            # Nikt nie dostaje 2. nagrody. Zremisowani dostają 3. nagrodę.
-            third_place_list = players_score2
-    
-    elif len(players_score1) > 1:
-        # --- Przypadek B: Remis o 1. miejsce ---
-        # Nikt nie dostaje 1. nagrody. Zremisowani dostają 2. nagrodę.
-        second_place_list = players_score1
-        
-        # Sprawdź 3. miejsce
-        # Następna grupa (players_score2) dostaje 3. nagrodę
-        if len(players_score2) == 1:
-            # B1: Czysty "następny" gracz
-            third_place_list = players_score2
-        # else (remis o "następne" miejsce): nikt nie dostaje 3. nagrody
-
-    # --- KONIEC NOWEJ LOGIKI ---
-    
     # Przekaż finalne listy do funkcji przetwarzającej nagrody
     is_valid, message = process_conflict_resolve(game_state, first_place_list, second_place_list, third_place_list)
     
     if is_valid:
-        if save_json_file(GAME_STATE_FILE, game_state):
+        if save_game_state(game_state, {"type": "resolve_conflict"}, g.game_id):
             flash(f"Conflict Resolved Automatically! {message}", "success")
         else:
             flash("CRITICAL ERROR: Cannot save game state after resolving conflict.", "error")
@@ -517,9 +650,10 @@ def resolve_conflict_auto():
         
     return redirect(url_for('reveal_phase'))
 
-@app.route('/buy_card', methods=['POST'])
+@app.route('/g/<game_id>/buy_card', methods=['POST'])
+@retry_on_conflict
 def buy_card():
-    game_state, _, cards_db, _, _, _ = load_game_data()
+    game_state, _, cards_db, _, _, _ = load_game_data(g.game_id)
     if game_state.get("current_phase") != "REVEAL":
         flash("Cannot buy cards: Not in REVEAL phase.", "error")
         return redirect(url_for('reveal_phase'))
@@ -530,7 +664,7 @@ def buy_card():
         return redirect(url_for('reveal_phase'))
     is_valid, message = process_buy_card(game_state, player_name, card_id, cards_db)
     if is_valid:
-        if save_json_file(GAME_STATE_FILE, game_state):
+        if save_game_state(game_state, {"type": "buy_card", "player": player_name, "card": card_id}, g.game_id):
             flash(message, "success")
         else:
             flash("CRITICAL ERROR: Cannot save game state after buying card.", "error")
@@ -538,9 +672,10 @@ def buy_card():
         flash(f"Invalid purchase: {message}", "error")
     return redirect(url_for('reveal_phase'))
 
-@app.route('/add_to_market', methods=['POST'])
+@app.route('/g/<game_id>/add_to_market', methods=['POST'])
+@retry_on_conflict
 def add_to_market():
-    game_state, _, cards_db, _, _, _ = load_game_data()
+    game_state, _, cards_db, _, _, _ = load_game_data(g.game_id)
     if game_state.get("current_phase") != "REVEAL":
         flash("Cannot modify market: Not in REVEAL phase.", "error")
         return redirect(url_for('reveal_phase'))
@@ -561,7 +696,7 @@ def add_to_market():
         return redirect(url_for('reveal_phase'))
     is_valid, message = add_card_to_market(game_state, card_id_to_add, cards_db)
     if is_valid:
-        if save_json_file(GAME_STATE_FILE, game_state):
+        if save_game_state(game_state, {"type": "add_to_market", "card": card_id_to_add}, g.game_id):
             flash(message, "success")
         else:
             flash("CRITICAL ERROR: Cannot save game state after modifying market.", "error")
@@ -570,9 +705,10 @@ def add_to_market():
     return redirect(url_for('reveal_phase'))
 
 
-@app.route('/commit_troops', methods=['POST'])
+@app.route('/g/<game_id>/commit_troops', methods=['POST'])
+@retry_on_conflict
 def commit_troops():
-    game_state, _, _, _, _, _ = load_game_data()
+    game_state, _, _, _, _, _ = load_game_data(g.game_id)
     if game_state.get("current_phase") != "REVEAL":
         flash("Cannot commit troops: Not in REVEAL phase.", "error")
         return redirect(url_for('reveal_phase'))
@@ -583,7 +719,7 @@ def commit_troops():
     is_valid, message = process_commit_troops(game_state, player_name, troop_amount)
 
     if is_valid:
-        if save_json_file(GAME_STATE_FILE, game_state):
+        if save_game_state(game_state, {"type": "commit_troops", "player": player_name, "amount": troop_amount}, g.game_id):
             flash(message, "success")
         else:
             flash("CRITICAL ERROR: Cannot save game state after committing troops.", "error")
@@ -593,42 +729,110 @@ def commit_troops():
     return redirect(url_for('reveal_phase'))
 
 
-@app.route('/ai_prompt')
+@app.route('/g/<game_id>/ai_prompt')
 def ai_prompt():
-    game_state, _, cards_db, _, _, _ = load_game_data()
-
-    calculate_and_store_reveal_stats(game_state, cards_db)
+    game_state, _, cards_db, intrigues_db, _, _ = load_game_data(g.game_id)
 
     if game_state is None or cards_db is None:
         flash("CRITICAL ERROR: Cannot load game data or cards data.", "error")
         return render_template('error.html'), 500
-        
-    # ZMIANA: Odbierz tylko jedną wartość
-    prompt_text = generate_ai_prompt(game_state, cards_db) 
-    
-    # ZMIANA: Przekaż tylko jedną wartość
+
+    calculate_and_store_reveal_stats(game_state, cards_db)
+
+    # ?format=compact - zwarty prompt z legendą kodów kart, ?format=delta - tylko zmiany
+    # od poprzedniego promptu, ?budget=N - limit tokenów. Ta sama wersja stanu -> tekst z pamięci.
+    prompt_format = request.args.get('format', 'full')
+    if prompt_format not in PROMPT_FORMATS:
+        prompt_format = 'full'
+    token_budget = request.args.get('budget', DEFAULT_TOKEN_BUDGET, type=int)
+    prompt_text, dropped_sections, is_delta, _ = PROMPTS.issue(
+        g.game_id, game_state, cards_db, intrigues_db, prompt_format, token_budget
+    )
+
     return render_template('ai_prompt.html', 
         prompt_text=prompt_text,
+        prompt_format=prompt_format,
+        is_delta=is_delta,
+        prompt_tokens=estimate_tokens(prompt_text),
+        dropped_sections=dropped_sections,
+        ai_player_name=AI_PLAYER_NAME
+    )
+    
+@app.route('/g/<game_id>/ai_recommend')
+def ai_recommend():
+    """Lokalny ranking ruchów agenta dla gracza AI (dogrywki Monte Carlo)."""
+    game_state, locations_db, cards_db, _, _, _ = load_game_data(g.game_id)
+    if game_state is None or cards_db is None:
+        flash("CRITICAL ERROR: Cannot load game data or cards data.", "error")
+        return render_template('error.html'), 500
+
+    try:
+        time_budget = min(30.0, max(0.1, float(request.args.get('budget', DEFAULT_TIME_BUDGET))))
+        workers = int(request.args['workers']) if request.args.get('workers') else None
+    except ValueError:
+        flash("Invalid budget or workers value.", "error")
+        return redirect(url_for('ai_recommend'))
+    policy_name = request.args.get('policy', 'random')
+    if policy_name not in POLICIES:
+        policy_name = 'random'
+
+    ranking, report = recommend_moves(game_state, AI_PLAYER_NAME, time_budget=time_budget,
+                                      workers=workers, policy_name=policy_name)
+    for item in ranking:
+        item["card_name"] = cards_db.get(item["card"], {}).get("name", item["card"])
+        item["location_name"] = locations_db.get(item["location"], {}).get("name", item["location"])
+
+    return render_template('ai_recommend.html',
+        ranking=ranking,
+        report=report,
+        time_budget=time_budget,
+        policy_name=policy_name,
+        policies=sorted(POLICIES),
+        current_phase=game_state.get("current_phase"),
         ai_player_name=AI_PLAYER_NAME
     )
     
-@app.route('/reset_board')
+@app.route('/g/<game_id>/preview/<string:player_name>')
+def preview(player_name):
+    """Skutki każdego legalnego ruchu agenta gracza - bez wykonywania ruchu."""
+    game_state, locations_db, cards_db, intrigues_db, _, leaders_db = load_game_data(g.game_id)
+    if game_state is None or cards_db is None:
+        flash("CRITICAL ERROR: Cannot load game data or cards data.", "error")
+        return render_template('error.html'), 500
+    if player_name not in game_state.get("players", {}):
+        flash(f"Error: Player {player_name} not found.", "error")
+        return redirect(url_for('index'))
+
+    rows, from_cache = PREVIEWS.preview(g.game_id, game_state, player_name,
+                                        (locations_db, cards_db, intrigues_db, leaders_db))
+    return render_template('preview.html',
+        rows=rows,
+        from_cache=from_cache,
+        player_name=player_name,
+        player_names=list(game_state.get("players", {})),
+        current_phase=game_state.get("current_phase"),
+        state_version=game_state.get("version", 0)
+    )
+
+@app.route('/g/<game_id>/reset_board')
+@retry_on_conflict
 def reset_board():
-    game_state, _, _, _, _, _ = load_game_data()
+    game_state, _, _, _, _, _ = load_game_data(g.game_id)
     if game_state:
         new_game_state = perform_cleanup_and_new_round(game_state)
-        if save_json_file(GAME_STATE_FILE, new_game_state):
+        if save_game_state(new_game_state, {"type": "new_round"}, g.game_id):
             flash("Board has been reset, new round started! Cards shuffled and drawn.", "success")
         else:
             flash("ERROR: Failed to save game state changes.", "error")
     return redirect(url_for('index'))
 
-@app.route('/manage_hand/<string:player_name>', methods=['GET', 'POST'])
+@app.route('/g/<game_id>/manage_hand/<string:player_name>', methods=['GET', 'POST'])
+@retry_on_conflict
 def manage_hand(player_name):
     """
     Dynamiczna strona do zarządzania ręką DOWOLNEGO gracza.
     """
-    game_state, _, cards_db, _, _, _ = load_game_data()
+    game_state, _, cards_db, _, _, _ = load_game_data(g.game_id)
     if game_state is None or cards_db is None:
         flash("CRITICAL ERROR: Cannot load core game data. Check JSON files.", "error")
         return render_template('error.html'), 500
@@ -639,7 +843,7 @@ def manage_hand(player_name):
         is_valid, message = set_player_hand(game_state, player_name, card_ids, cards_db)
         
         if is_valid:
-            if save_json_file(GAME_STATE_FILE, game_state):
+            if save_game_state(game_state, {"type": "set_hand", "player": player_name, "cards": card_ids}, g.game_id):
                 flash(message, "success")
             else:
                 flash("CRITICAL ERROR: Cannot save game state after setting hand.", "error")
@@ -672,17 +876,17 @@ def manage_hand(player_name):
         current_hand=current_hand_ids
     )
 
-@app.route('/debug_json')
+@app.route('/g/<game_id>/debug_json')
 def debug_json():
-    game_state, _, _, _, _, _ = load_game_data()
+    game_state, _, _, _, _, _ = load_game_data(g.game_id)
     if game_state is None:
         flash("CRITICAL ERROR: Cannot load game_stat.json.", "error")
         return render_template('error.html'), 500
     json_text = json.dumps(game_state, indent=2, ensure_ascii=False)
-    return render_template('debug_json.html', json_text=json_text)
+    return render_template('debug_json.html', json_text=json_text, catalog_stats=CATALOG.stats())
 
 
-@app.route('/save_debug_json', methods=['POST'])
+@app.route('/g/<game_id>/save_debug_json', methods=['POST'])
 def save_debug_json():
     """
     Zapisuje stan gry z edytora debugowania JSON.
@@ -693,7 +897,7 @@ def save_debug_json():
         return redirect(url_for('debug_json'))
 
     # Użyj funkcji z game_manager do walidacji i zapisu
-    is_valid, message = save_json_file_from_text(text_data)
+    is_valid, message = save_json_file_from_text(text_data, g.game_id)
     
     if is_valid:
         flash(message, "success")
@@ -704,9 +908,10 @@ def save_debug_json():
     return redirect(url_for('debug_json'))
 
 
-@app.route('/add_intrigue', methods=['POST'])
+@app.route('/g/<game_id>/add_intrigue', methods=['POST'])
+@retry_on_conflict
 def add_intrigue():
-    game_state, _, _, intrigues_db, _, _ = load_game_data()
+    game_state, _, _, intrigues_db, _, _ = load_game_data(g.game_id)
 
     player_name_input = request.form.get('player_name')
     intrigue_id_input = request.form.get('intrigue_id')
@@ -718,7 +923,7 @@ def add_intrigue():
     is_valid, message = manual_add_intrigue(game_state, player_name_input, intrigue_id_input, intrigues_db)
     
     if is_valid:
-        if save_json_file(GAME_STATE_FILE, game_state):
+        if save_game_state(game_state, {"type": "add_intrigue", "player": player_name_input, "intrigue": intrigue_id_input}, g.game_id):
             flash(message, "success")
         else:
             flash("CRITICAL ERROR: Cannot save game state after adding intrigue.", "error")
@@ -730,13 +935,13 @@ def add_intrigue():
 
 # === NOWE TRASY DLA ZŁOŻONYCH RUCHÓW AGENTA ===
 
-@app.route('/resolve_agent_move/<string:player_name>/<string:card_id>/<string:location_id>')
+@app.route('/g/<game_id>/resolve_agent_move/<string:player_name>/<string:card_id>/<string:location_id>')
 def resolve_agent_move(player_name, card_id, location_id):
     """
     (NOWA TRASA) Wyświetla stronę, na której gracz podejmuje decyzję
     dotyczącą złożonego ruchu agenta (karty lub lokacji).
     """
-    game_state, locations_db, cards_db, intrigues_db, conflicts_db, leaders_db = load_game_data()
+    game_state, locations_db, cards_db, intrigues_db, conflicts_db, leaders_db = load_game_data(g.game_id)
     
     card_data = cards_db.get(card_id)
     location_data = locations_db.get(location_id)
@@ -745,9 +950,15 @@ def resolve_agent_move(player_name, card_id, location_id):
     if not card_data or not location_data:
         flash("Error: Card or Location data not found for decision.", "error")
         return redirect(url_for('index'))
+
+    # Strona stołu przechodzi tu od razu (mapa decyzji), więc ruch sprawdzamy tutaj
+    is_valid, message = is_move_valid(game_state, locations_db, leaders_db, cards_db, player_name, card_id, location_id)
+    if not is_valid:
+        flash(f"Invalid move: {message}", "error")
+        return redirect(url_for('index'))
         
     # Ponownie sprawdzamy wymagania, aby uzyskać dane do wyświetlenia
-    requirements = get_agent_move_requirements(card_data, location_data, leaders_db, player_state)
+    requirements = get_agent_move_requirements(card_id, location_id, player_state, cards_db, locations_db, leaders_db)
     
     # Używamy tego samego szablonu co intrygi, ale przekazujemy dodatkowe dane
     return render_template('resolve_intrigue.html',
@@ -760,13 +971,14 @@ def resolve_agent_move(player_name, card_id, location_id):
         location_id=location_id 
     )
 
-@app.route('/execute_agent_move', methods=['POST'])
+@app.route('/g/<game_id>/execute_agent_move', methods=['POST'])
+@retry_on_conflict
 def execute_agent_move():
     """
     (NOWA TRASA) Odbiera decyzję gracza z formularza
     i wywołuje process_move z odpowiednimi kwargs.
     """
-    game_state, locations_db, cards_db, _, _, leaders_db = load_game_data()
+    game_state, locations_db, cards_db, _, _, leaders_db = load_game_data(g.game_id)
     
     # Odczytaj wszystkie dane ruchu z formularza
     player_name = request.form.get('player_name')
@@ -785,6 +997,13 @@ def execute_agent_move():
             flash("Invalid choice index received.", "error")
             return redirect(url_for('index'))
 
+    # Stan mógł się zmienić od wyświetlenia strony decyzji (inny gracz zajął
+    # pole, ponowienie po konflikcie wersji) - sprawdź ruch na wczytanym stanie
+    is_valid, message = is_move_valid(game_state, locations_db, leaders_db, cards_db, player_name, card_id, location_id)
+    if not is_valid:
+        flash(f"Invalid move: {message}", "error")
+        return redirect(url_for('index'))
+
     # Wywołaj silnik ruchu agenta, przekazując zebrane decyzje
     new_game_state = process_move(
         game_state, locations_db, cards_db, leaders_db, 
@@ -794,7 +1013,7 @@ def execute_agent_move():
     
     final_game_state = check_and_advance_phase(new_game_state, cards_db)
     
-    if save_json_file(GAME_STATE_FILE, final_game_state):
+    if save_game_state(final_game_state, {"type": "agent_move", "player": player_name, "card": card_id, "location": location_id, "kwargs": kwargs}, g.game_id):
          flash(f"Success! Player {player_name}'s complex move has been executed.", "success")
     else:
          flash("CRITICAL ERROR: Cannot save game state after complex move.", "error")
@@ -804,12 +1023,13 @@ def execute_agent_move():
 
 
 from game_manager import process_manual_override
+process_manual_override = metrics.timed('engine', process_manual_override)
 
-@app.route('/manual_override', methods=['GET'])
+@app.route('/g/<game_id>/manual_override', methods=['GET'])
 def manual_override():
     """Wyświetla stronę do ręcznej korekty stanu gry."""
     # Wczytujemy teraz wszystkie bazy danych
-    game_state, _, cards_db, intrigues_db, _, _ = load_game_data()
+    game_state, _, cards_db, intrigues_db, _, _ = load_game_data(g.game_id)
     if not game_state:
         flash("CRITICAL ERROR: Cannot load game state.", "error")
         return redirect(url_for('index'))
@@ -855,11 +1075,12 @@ def manual_override():
         deck_pool_legend=deck_pool_legend # Nowe
     )
 
-@app.route('/apply_override', methods=['POST'])
+@app.route('/g/<game_id>/apply_override', methods=['POST'])
+@retry_on_conflict
 def apply_override():
     """Przetwarza formularz ręcznej korekty."""
     # Musimy załadować cards_db do walidacji kart
-    game_state, _, cards_db, _, _, _ = load_game_data()
+    game_state, _, cards_db, _, _, _ = load_game_data(g.game_id)
     if not game_state:
         flash("CRITICAL ERROR: Cannot load game state.", "error")
         return redirect(url_for('index'))
@@ -873,7 +1094,7 @@ def apply_override():
     is_valid, message = process_manual_override(game_state, cards_db, player_name, request.form)
 
     if is_valid:
-        if save_json_file(GAME_STATE_FILE, game_state):
+        if save_game_state(game_state, {"type": "manual_override", "player": player_name, "form": request.form.to_dict(flat=False)}, g.game_id):
             flash(f"Zastosowano korektę dla {player_name}: {message}", "success")
         else:
             flash("CRITICAL ERROR: Cannot save game state after override.", "error")
@@ -885,7 +1106,143 @@ def apply_override():
     return redirect(url_for('manual_override', player_name=player_name))
 
 
+# --- API JSON (tylko odczyt) ---
+# Zwarty JSON stanu stołu. ETag to wersja stanu (i sygnatury użytych plików
+# katalogów), więc zapytanie z If-None-Match przy niezmienionym stanie
+# dostaje 304 bez wczytywania i serializacji stanu.
+
+# Liczniki reveal_counters to wewnętrzny cache silnika - nie wysyłamy ich
+API_STATE_MASK = {"players": {"*": hide(*DERIVED_PLAYER_FIELDS)}}
+API_PLAYER_MASK = hide(*DERIVED_PLAYER_FIELDS)
+
+def _api_error(message, status, **details):
+    return Response(json.dumps(dict({"error": message}, **details), ensure_ascii=False), status=status,
+                    mimetype='application/json')
+
+def _api_etag(version, catalogs):
+    parts = [g.game_id, str(version)]
+    for name in catalogs:
+        signature = CATALOG.signature(name)
+        parts.append(f"{signature[0]:x}-{signature[1]:x}" if signature else "none")
+    return ".".join(parts)
+
+def api_resource(*catalogs):
+    """
+    Trasa API zwracająca dane JSON z ETagiem. Widok dostaje wczytany stan gry
+    i zwraca dane do serializacji (albo gotową odpowiedź, np. błąd).
+    `catalogs` to nazwy katalogów, od których zależy odpowiedź.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            version = game_state_version(g.game_id)
+            if version is None:
+                return _api_error(f"Game '{g.game_id}' has no saved state.", 404)
+            tag = _api_etag(version, catalogs)
+            if request.if_none_match.contains(tag):
+                response = Response(status=304)
+            else:
+                game_state = load_game_state(g.game_id)
+                if game_state is None:
+                    return _api_error(f"Cannot load game '{g.game_id}'.", 500)
+                # Stan mógł zostać zapisany między odczytem wersji a wczytaniem
+                tag = _api_etag(game_state.get("version", 0), catalogs)
+                result = view(game_state, *args, **kwargs)
+                if isinstance(result, Response):
+                    return result
+                response = Response(json.dumps(result, ensure_ascii=False, separators=(',', ':'), default=json_default),
+                                    mimetype='application/json')
+            response.set_etag(tag)
+            # Klient może trzymać odpowiedź, ale przed użyciem pyta o ETag
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        return wrapper
+    return decorator
+
+@app.route('/g/<game_id>/api/state')
+@api_resource()
+def api_state(game_state):
+    return redacted_view(game_state, API_STATE_MASK)
+
+@app.route('/g/<game_id>/api/players/<string:player_name>')
+@api_resource()
+def api_player(game_state, player_name):
+    player_data = game_state.get("players", {}).get(player_name)
+    if player_data is None:
+        return _api_error(f"Player '{player_name}' not found.", 404)
+    return redacted_view(player_data, API_PLAYER_MASK)
+
+@app.route('/g/<game_id>/api/locations')
+@api_resource("locations")
+def api_locations(game_state):
+    """Lokacje z katalogu z bieżącym stanem pól (zajętość, bonusy)."""
+    locations_db = CATALOG.get("locations") or {}
+    locations_state = game_state.get("locations_state", {})
+    locations = {}
+    for loc_id, loc_data in locations_db.items():
+        if loc_id.endswith("_influence_path"):
+            continue
+        location = {"name": loc_data.get("name", loc_id), "occupied_by": None}
+        location.update(locations_state.get(loc_id, {}))
+        locations[loc_id] = location
+    return locations
+
+@app.route('/g/<game_id>/api/preview/<string:player_name>')
+@api_resource("locations", "cards", "intrigues", "leaders")
+def api_preview(game_state, player_name):
+    """Podgląd skutków legalnych ruchów agenta gracza (jak /preview)."""
+    if player_name not in game_state.get("players", {}):
+        return _api_error(f"Player '{player_name}' not found.", 404)
+    locations_db, cards_db, intrigues_db, _, leaders_db = load_catalogs()
+    rows, _ = PREVIEWS.preview(g.game_id, game_state, player_name, (locations_db, cards_db, intrigues_db, leaders_db))
+    return {"version": game_state.get("version", 0), "player": player_name, "moves": rows}
+
+
+@app.route('/g/<game_id>/api/actions', methods=['POST'])
+def api_actions():
+    """
+    Wykonuje listę akcji ({"actions": [...], "version": opcjonalnie}) na
+    jednym stanie i zapisuje go raz. Błąd dowolnej akcji odrzuca całą listę
+    (400). Podana "version" musi być wersją stanu, na której klient oparł
+    decyzje (inaczej 409); bez niej lista jest ponawiana na świeżym stanie,
+    jeśli ktoś zapisał grę w międzyczasie.
+    """
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict):
+        return _api_error("Expected a JSON object with an 'actions' list.", 400)
+    expected_version = body.get("version")
+    locations_db, cards_db, intrigues_db, _, leaders_db = load_catalogs()
+    dbs = (locations_db, cards_db, intrigues_db, leaders_db)
+
+    for attempt in range(STATE_CONFLICT_RETRIES):
+        game_state = load_game_state(g.game_id)
+        if game_state is None:
+            return _api_error(f"Cannot load game '{g.game_id}'.", 500)
+        current_version = game_state.get("version", 0)
+        if expected_version is not None and expected_version != current_version:
+            return _api_error(f"Game is at version {current_version}, not {expected_version}.", 409)
+        try:
+            new_state, messages, logged = apply_batch(game_state, body.get("actions"), dbs)
+        except ActionError as e:
+            return _api_error(e.message, 400, index=e.index, action=e.action)
+        try:
+            if not save_game_state(new_state, {"type": "batch", "actions": logged}, g.game_id):
+                return _api_error("Cannot save game state.", 500)
+        except StaleStateError:
+            if expected_version is not None:
+                return _api_error("Game state changed while applying the actions.", 409)
+            time.sleep(random.uniform(0, 0.01 * (attempt + 1)))
+            continue
+        return Response(json.dumps({"version": new_state.get("version", 0), "applied": len(messages),
+                                    "results": messages, "phase": new_state.get("current_phase")},
+                                   ensure_ascii=False, separators=(',', ':')),
+                        mimetype='application/json')
+    return _api_error("Game state kept changing; try again.", 409)
+
+
 if __name__ == '__main__':
+    # SIGTERM kończy proces zwykłym wyjściem, żeby atexit zapisał zmiany czekające w tle
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
     print("Starting server at http://0.0.0.0:5000")
     print("To access from other computers, use your computer's IP address, e.g., http://192.168.1.10:5000")
     app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
@@ -1,8 +1,13 @@
 # app/build_ai_prompt.py
-import json
-import copy # Needed for deep copy
-
 from game_manager import get_card_persuasion_cost, AI_PLAYER_NAME 
+from state_view import dumps_view, hide, merge_masks, player_mask
+
+# AI widzi swoją rękę, talię i intrygi (bez stosu dobierania); historia rundy
+# jest już opisana w treści promptu
+AI_VIEW_MASK = merge_masks(
+    player_mask(AI_PLAYER_NAME, visible_fields=("hand", "deck_pool", "intrigue_hand")),
+    hide("round_history"),
+)
 
 def generate_ai_prompt(game_state_data, cards_db):
     """
@@ -22,7 +27,8 @@ def generate_ai_prompt(game_state_data, cards_db):
     if not cards_db:
         return "CRITICAL ERROR: Cards DB was not provided."
 
-    game_state = copy.deepcopy(game_state_data)
+    # Tylko odczyt - ukryte pola pomija widok przy serializacji (bez kopii stanu)
+    game_state = game_state_data
     current_phase = game_state.get('current_phase', 'Unknown')
     
     prompt_lines = []
@@ -43,7 +49,7 @@ def generate_ai_prompt(game_state_data, cards_db):
         prompt_lines.append("(No conflict rewards set for this round)")
 
     prompt_lines.append("\n### Move History (This Round) ###")
-    history_to_display = game_state.pop("round_history", []) 
+    history_to_display = game_state.get("round_history", []) 
     if history_to_display :
         for move in history_to_display:
             prompt_lines.append(f"- {move.get('summary', 'Unknown history item')}")
@@ -134,17 +140,7 @@ def generate_ai_prompt(game_state_data, cards_db):
         prompt_lines.append("Analyze which cards to buy with your Persuasion. List the IDs of the cards you want to buy.")
 
 
-    if "players" in game_state:
-        for player_name, player_data in game_state["players"].items():
-            if player_name == AI_PLAYER_NAME:
-                player_data.pop("draw_deck", None)
-            else:
-                player_data.pop("hand", None)
-                player_data.pop("deck_pool", None)
-                player_data.pop("draw_deck", None)
-                player_data.pop("intrigue_hand", None)
-                
-    game_state_json_string = json.dumps(game_state, indent=2, ensure_ascii=False)
+    game_state_json_string = dumps_view(game_state, AI_VIEW_MASK, indent=2, ensure_ascii=False)
     
     # === ZJEDNOCZENIE PROMPTU ===
     # Łączymy instrukcje i JSON z powrotem w jeden ciąg
@@ -0,0 +1,191 @@
+# app/card_zones.py
+"""
+Zwarte strefy kart gracza (deck_pool, hand, discard_pile, draw_deck).
+
+Identyfikatory kart są internowane do małych liczb (CardTable, budowana raz
+na wczytanie katalogu kart). CardZone to `array('H')` numerów kart (2 bajty
+na kartę zamiast 8 na wskaźnik w liście), więc kopia strefy to kopia jednego
+bufora - bez przechodzenia po kartach. `in` i `.count()` przeglądają bufor w
+C; strefa ma kilkanaście kart, więc osobne liczniki kopii kosztowałyby więcej
+pamięci, niż oszczędzają czasu.
+
+CardZone zachowuje się jak lista identyfikatorów (iteracja, indeksy, append,
+remove, pop, ...), więc silnik gry działa na niej bez zmian. Stan z
+pliku/bazy nadal ma zwykłe listy; strefy zwarte włącza compact_state (np.
+symulator), a expand_state przywraca dokładnie ten sam kształt JSON.
+"""
+from array import array
+
+from catalog import compiled
+
+ZONE_KEYS = ("deck_pool", "hand", "discard_pile", "draw_deck")
+
+
+class CardTable:
+    """Dwukierunkowe mapowanie identyfikator karty <-> mała liczba."""
+    __slots__ = ("ids", "index")
+
+    def __init__(self, card_ids):
+        self.ids = []
+        self.index = {}
+        for card_id in card_ids:
+            self.intern(card_id)
+
+    def intern(self, card_id):
+        """Zwraca numer karty; nieznane identyfikatory są dopisywane na końcu."""
+        number = self.index.get(card_id)
+        if number is None:
+            number = self.index[card_id] = len(self.ids)
+            self.ids.append(card_id)
+        return number
+
+
+def card_table(cards_db):
+    return compiled("card_table", CardTable, cards_db)
+
+
+class CardZone(array):
+    """
+    Uporządkowany multizbiór kart: `array('H')` numerów kart z tabeli `table`.
+
+    Metody tablicy przyjmujące i zwracające elementy są nadpisane tak, by
+    działały na identyfikatorach kart, jak lista.
+    """
+    __slots__ = ("table",)
+
+    def __new__(cls, table, card_ids=()):
+        try:
+            zone = array.__new__(cls, 'H', map(table.index.__getitem__, card_ids))
+        except KeyError:
+            zone = array.__new__(cls, 'H', [table.intern(card_id) for card_id in card_ids])
+        zone.table = table
+        return zone
+
+    # --- Odczyt ---
+
+    def __iter__(self):
+        return map(self.table.ids.__getitem__, array.__iter__(self))
+
+    def __contains__(self, card_id):
+        number = self.table.index.get(card_id)
+        return number is not None and array.__contains__(self, number)
+
+    def count(self, card_id):
+        number = self.table.index.get(card_id)
+        return array.count(self, number) if number is not None else 0
+
+    def __getitem__(self, index):
+        ids = self.table.ids
+        if isinstance(index, slice):
+            return [ids[number] for number in array.__getitem__(self, index)]
+        return ids[array.__getitem__(self, index)]
+
+    def index(self, card_id, start=0, stop=None):
+        number = self.table.index.get(card_id)
+        if number is None:
+            raise ValueError(f"{card_id!r} is not in zone")
+        return array.index(self, number, start, len(self) if stop is None else stop)
+
+    def __eq__(self, other):
+        if type(other) is CardZone:
+            if other.table is self.table:
+                return array.__eq__(self, other)
+            return list(self) == list(other)
+        if isinstance(other, (list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    __hash__ = None
+
+    def __add__(self, other):
+        return list(self) + list(other)
+
+    def __repr__(self):
+        return f"CardZone({list(self)!r})"
+
+    # --- Zapis ---
+
+    def __setitem__(self, index, card_id):
+        if isinstance(index, slice):
+            raise TypeError("CardZone does not support slice assignment")
+        array.__setitem__(self, index, self.table.intern(card_id))
+
+    def insert(self, index, card_id):
+        array.insert(self, index, self.table.intern(card_id))
+
+    def append(self, card_id):
+        number = self.table.index.get(card_id)
+        array.append(self, number if number is not None else self.table.intern(card_id))
+
+    def extend(self, card_ids):
+        array.extend(self, [self.table.intern(card_id) for card_id in card_ids])
+
+    def __iadd__(self, card_ids):
+        self.extend(card_ids)
+        return self
+
+    def remove(self, card_id):
+        if card_id not in self:
+            raise ValueError(f"{card_id!r} is not in zone")
+        array.remove(self, self.table.index[card_id])
+
+    def pop(self, index=-1):
+        return self.table.ids[array.pop(self, index)]
+
+    def clear(self):
+        del self[:]
+
+    def copy(self):
+        zone = array.__new__(CardZone, 'H', self)   # kopia bufora, bez przechodzenia po kartach
+        zone.table = self.table
+        return zone
+
+    __copy__ = copy
+
+    def __deepcopy__(self, memo):
+        return self.copy()
+
+    def __reduce_ex__(self, protocol):
+        return CardZone, (self.table, list(self))
+
+    def to_json(self):
+        """Lista identyfikatorów - dokładnie to, co było w stanie przed compact_state."""
+        return list(self)
+
+
+# Sprawdzamy `type(...) is CardZone`, bo isinstance z klasą ABC jest wyraźnie wolniejsze
+
+def new_zone_like(zone, card_ids=()):
+    """Nowa strefa tego samego rodzaju co `zone` (CardZone albo lista)."""
+    if type(zone) is CardZone:
+        return CardZone(zone.table, card_ids)
+    return list(card_ids)
+
+
+def copy_zone(zone):
+    return zone.copy() if type(zone) is CardZone else list(zone)
+
+
+def compact_state(game_state, cards_db):
+    """Zamienia (w miejscu) listy kart wszystkich graczy na CardZone."""
+    table = card_table(cards_db)
+    for player_state in game_state.get("players", {}).values():
+        for key in ZONE_KEYS:
+            zone = player_state.get(key)
+            if zone is not None and type(zone) is not CardZone:
+                player_state[key] = CardZone(table, zone)
+    return game_state
+
+
+def expand_state(game_state):
+    """Przywraca (w miejscu) zwykłe listy identyfikatorów - kształt JSON stanu."""
+    for player_state in game_state.get("players", {}).values():
+        for key in ZONE_KEYS:
+            zone = player_state.get(key)
+            if type(zone) is CardZone:
+                player_state[key] = zone.to_json()
+    return game_state
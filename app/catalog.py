@@ -0,0 +1,109 @@
+# app/catalog.py
+"""
+Procesowy cache katalogów gry (karty, lokacje, intrygi, konflikty, liderzy).
+
+Pliki katalogów zmieniają się tylko przy edycji danych, więc wczytujemy je raz
+na proces i udostępniamy jako widoki tylko do odczytu. Przy każdym dostępie
+porównujemy (mtime, rozmiar) pliku - ponowne parsowanie następuje wyłącznie,
+gdy plik faktycznie się zmienił.
+"""
+import json
+import operator
+import os
+import threading
+from types import MappingProxyType
+
+
+class Catalog:
+    """
+    Cache plików JSON kluczowany nazwą katalogu.
+
+    Zwracane widoki (MappingProxyType) blokują modyfikację najwyższego poziomu.
+    Zagnieżdżone słowniki są współdzielone między żądaniami - silnik gry
+    traktuje je jako dane tylko do odczytu i nie wolno ich modyfikować.
+    """
+
+    def __init__(self, files):
+        self._files = dict(files)
+        self._entries = {}   # nazwa -> (sygnatura, widok)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _signature(path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    @staticmethod
+    def _load(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            print(f"Error: File not found {path}")
+            return None
+        except json.JSONDecodeError:
+            print(f"Error: JSON decode error in {path}")
+            return None
+        return MappingProxyType(data) if isinstance(data, dict) else data
+
+    def get(self, name):
+        """Zwraca widok katalogu `name` (lub None, jeśli pliku nie da się wczytać)."""
+        path = self._files[name]
+        signature = self._signature(path)
+        entry = self._entries.get(name)
+        if entry is not None and signature is not None and entry[0] == signature:
+            self.hits += 1
+            return entry[1]
+
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None and signature is not None and entry[0] == signature:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            view = self._load(path)
+            if view is None or signature is None:
+                self._entries.pop(name, None)
+                return None
+            self._entries[name] = (signature, view)
+            return view
+
+    def signature(self, name):
+        """(mtime_ns, rozmiar) pliku katalogu `name` - zmienia się przy każdej edycji pliku."""
+        return self._signature(self._files[name])
+
+    def clear(self):
+        """Wymusza ponowne wczytanie wszystkich katalogów przy następnym dostępie."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Zwraca liczniki trafień/chybień cache."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "cached": sorted(self._entries.keys()),
+        }
+
+
+_compiled = {}
+
+
+def compiled(key, builder, *sources):
+    """
+    Zwraca `builder(*sources)`, budowany ponownie tylko wtedy, gdy zmieni się
+    któryś z obiektów źródłowych. Widoki katalogu są stałe do czasu
+    przeładowania pliku, więc dane pochodne (plany efektów, indeksy) powstają
+    raz na wczytanie katalogu.
+    """
+    entry = _compiled.get(key)
+    if entry is not None and len(entry[0]) == len(sources) and all(map(operator.is_, entry[0], sources)):
+        return entry[1]
+    result = builder(*sources)
+    _compiled[key] = (sources, result)
+    return result
@@ -0,0 +1,433 @@
+# app/compact_prompt.py
+"""
+Zwarty prompt dla gracza AI z budżetem tokenów.
+
+Zamiast całego stanu jako JSON z wcięciami prompt składa się z sekcji:
+    - legenda kodów kart ("c3") i intryg ("i5") - tylko kody użyte w
+      pozostałych sekcjach, każdy raz,
+    - stan w zminifikowanym JSON: strefy kart jako kody z krotnością
+      ("c3x2"), pola puste/zerowe/fałszywe pominięte, plansza tylko z zajętymi
+      polami,
+    - historia rundy jako kody ruchów ("Tymon:c3@arrakeen", "Damian:PASS").
+Kody są stałe dla katalogu (kolejność kart w cards.json), więc nie zmieniają
+się między turami.
+
+Każda sekcja ma priorytet. Jeśli szacowana liczba tokenów (znaki / 4)
+przekracza budżet, odrzucane są sekcje o najniższym priorytecie (najpierw
+starsza historia, stosy, plansza, ...), aż prompt się zmieści; sekcje
+REQUIRED (zadanie, stan AI, legenda) zostają zawsze.
+Domyślny budżet: DUNE_AI_PROMPT_TOKEN_BUDGET (0 - bez limitu).
+"""
+import json
+import os
+import re
+from collections import Counter
+
+from catalog import compiled
+from card_zones import card_table
+from game_manager import get_card_persuasion_cost, AI_PLAYER_NAME
+from state_view import json_default, redacted_view, hide, merge_masks, player_mask
+
+DEFAULT_TOKEN_BUDGET = int(os.environ.get('DUNE_AI_PROMPT_TOKEN_BUDGET', '0') or 0)
+CHARS_PER_TOKEN = 4
+REQUIRED = 100
+RECENT_HISTORY = 6
+
+# Ten sam zakres informacji co w pełnym prompcie (build_ai_prompt.AI_VIEW_MASK),
+# bez reveal_stats - sumy trafiają do sekcji fazy Odkrycia
+COMPACT_VIEW_MASK = merge_masks(
+    player_mask(AI_PLAYER_NAME, visible_fields=("hand", "deck_pool", "intrigue_hand")),
+    hide("round_history"),
+    {"players": {"*": hide("reveal_stats"), AI_PLAYER_NAME: hide("reveal_stats")}},
+)
+CARD_ZONE_FIELDS = ("hand", "deck_pool", "discard_pile")
+_PASS_PATTERN = re.compile(r"^Player (\S+) passed")
+
+
+def estimate_tokens(text):
+    """Przybliżona liczba tokenów (ok. 4 znaki na token dla tekstu angielskiego i JSON)."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+class PromptSection:
+    """Fragment promptu: nazwa, priorytet, tekst i użyte kody ({kod: (rodzaj, id)})."""
+    __slots__ = ("name", "priority", "text", "codes")
+
+    def __init__(self, name, priority, text, codes=None):
+        self.name = name
+        self.priority = priority
+        self.text = text
+        self.codes = codes or {}
+
+
+# --- Kody kart i intryg ---
+
+def _build_name_index(db):
+    index = {}
+    for item_id, item_data in db.items():
+        index.setdefault(item_data.get("name", item_id), item_id)
+    return index
+
+
+def _build_intrigue_codes(intrigues_db):
+    return {intrigue_id: f"i{number}" for number, intrigue_id in enumerate(intrigues_db)}
+
+
+class Codebook:
+    """Zamienia identyfikatory na kody i zapamiętuje, które kody są w użyciu."""
+
+    def __init__(self, cards_db, intrigues_db):
+        self.cards_db = cards_db
+        self.intrigues_db = intrigues_db or {}
+        self.card_numbers = card_table(cards_db).index
+        self.intrigue_codes = compiled("intrigue_codes", _build_intrigue_codes, self.intrigues_db)
+        self.card_names = compiled("card_name_index", _build_name_index, cards_db)
+        self.used = {}
+
+    def card(self, card_id):
+        number = self.card_numbers.get(card_id)
+        if number is None or card_id not in self.cards_db:
+            return card_id
+        code = f"c{number}"
+        self.used[code] = ("card", card_id)
+        return code
+
+    def intrigue(self, intrigue_id):
+        code = self.intrigue_codes.get(intrigue_id)
+        if code is None:
+            return intrigue_id
+        self.used[code] = ("intrigue", intrigue_id)
+        return code
+
+    def zone(self, card_ids, code_fn=None):
+        """Strefa kart jako napis kodów z krotnością, np. "c3x2 c7"."""
+        code_fn = code_fn or self.card
+        return " ".join(
+            code if copies == 1 else f"{code}x{copies}"
+            for code, copies in Counter(code_fn(card_id) for card_id in card_ids).items()
+        )
+
+    def take(self):
+        """Zwraca kody użyte od ostatniego wywołania (dla bieżącej sekcji)."""
+        used, self.used = self.used, {}
+        return used
+
+    def legend_line(self, code, kind, item_id):
+        if kind == "intrigue":
+            return f"{code}={self.intrigues_db[item_id].get('name', item_id)}"
+        card_data = self.cards_db[item_id]
+        cost = get_card_persuasion_cost(card_data)
+        reveal_effect = card_data.get("reveal_effect", {})
+        symbols = "/".join(card_data.get("agent_symbols", []))
+        return (f"{code}={card_data.get('name', item_id)} [{symbols}] "
+                f"cost:{cost if cost != 999 else '-'} P{reveal_effect.get('persuasion', 0)} S{reveal_effect.get('swords', 0)}")
+
+
+# --- Minifikacja ---
+
+def _prune(value):
+    """Usuwa puste/zerowe/fałszywe pola słowników (rekurencyjnie)."""
+    if isinstance(value, dict):
+        pruned = {}
+        for key, item in value.items():
+            item = _prune(item)
+            if item is None or item is False or item == 0 or item == [] or item == {} or item == "":
+                continue
+            pruned[key] = item
+        return pruned
+    if isinstance(value, list):
+        return [_prune(item) for item in value]
+    return value
+
+
+def _minify(value):
+    return json.dumps(_prune(value), separators=(',', ':'), ensure_ascii=False, default=json_default)
+
+
+def _json_section(sections, name, priority, title, value, codebook):
+    """Dodaje sekcję z minifikowanym JSON (pomija sekcje puste)."""
+    text = _minify(value)
+    codes = codebook.take()
+    if text not in ("{}", "[]"):
+        sections.append(PromptSection(name, priority, f"## {title}\n{text}", codes))
+
+
+def _compact_player(player_data, codebook):
+    player = dict(player_data)
+    for key in CARD_ZONE_FIELDS:
+        if key in player:
+            player[key] = codebook.zone(player[key])
+    if "intrigue_hand" in player:
+        player["intrigue_hand"] = codebook.zone(player["intrigue_hand"], codebook.intrigue)
+    # Zdobyte premie frakcji jako lista nazw zamiast słownika wartości logicznych
+    for key in ("faction_bonus_claimed", "faction_vp_claimed_2pts"):
+        if key in player:
+            player[key] = [faction for faction, claimed in player[key].items() if claimed]
+    return player
+
+
+def _history_code(entry, codebook):
+    if "player" in entry and "card" in entry:
+        card_id = codebook.card_names.get(entry["card"], entry["card"])
+        location = entry.get("location", "?")
+        return f"{entry['player']}:{codebook.card(card_id)}@{location}"
+    summary = entry.get("summary", "")
+    match = _PASS_PATTERN.match(summary)
+    if match:
+        return f"{match.group(1)}:PASS"
+    return summary if len(summary) <= 80 else summary[:77] + "..."
+
+
+# --- Sekcje ---
+
+def _phase_sections(game_state, cards_db, codebook):
+    """Sekcje zależne od fazy: opis zadania (REQUIRED) i dane do decyzji."""
+    phase = game_state.get("current_phase", "Unknown")
+    players = game_state.get("players", {})
+    sections = []
+    if phase == "AGENT_TURN":
+        opponents = {}
+        for player_name, player_data in players.items():
+            if player_name == AI_PLAYER_NAME:
+                continue
+            swords = sum(cards_db.get(card_id, {}).get("reveal_effect", {}).get("swords", 0)
+                         for card_id in player_data.get("discard_pile", []))
+            agents_left = player_data.get("agents_total", 2) - player_data.get("agents_placed", 0)
+            opponents[player_name] = "PASSED" if player_data.get("has_passed") else f"S{swords} agents_left:{agents_left}"
+        sections.append(PromptSection("opponents_played", 80, "## Opponents (swords from played cards)\n" + _minify(opponents)))
+        task = "TASK: choose your agent move (card code + location id) or pass."
+    elif phase == "REVEAL":
+        stats = {}
+        for player_name, player_data in players.items():
+            reveal_stats = player_data.get("reveal_stats", {})
+            swords = reveal_stats.get("base_swords", 0) + player_data.get("active_effects", {}).get("fight_bonus_swords", 0)
+            stats[player_name] = f"P{reveal_stats.get('total_persuasion', 0)} S{swords}"
+        sections.append(PromptSection("reveal_stats", 90, "## Reveal stats (P=persuasion, S=swords)\n" + _minify(stats)))
+        market = codebook.zone(game_state.get("imperium_row", []))
+        sections.append(PromptSection("market", 95, "## Imperium Row\n" + market, codebook.take()))
+        task = "TASK: choose cards to buy from the Imperium Row with your persuasion (list card codes)."
+    else:
+        task = "TASK: analyze the game state."
+    sections.append(PromptSection("task", REQUIRED, task))
+    return sections
+
+
+def build_sections(game_state, cards_db, intrigues_db=None):
+    """Dzieli stan na sekcje promptu. Zwraca (sekcje, codebook)."""
+    codebook = Codebook(cards_db, intrigues_db)
+    view = redacted_view(game_state, COMPACT_VIEW_MASK)
+    players = view.get("players", {})
+    sections = [PromptSection(
+        "header", REQUIRED,
+        f"You are player {AI_PLAYER_NAME} in Dune: Imperium. Round {game_state.get('round', 1)}, "
+        f"phase {game_state.get('current_phase', 'Unknown')}.\n"
+        "Format: minified JSON; card/intrigue codes are explained in LEGEND; "
+        "zones list codes (xN = copies); missing fields are 0/empty/false."
+    )]
+
+    conflict_card = view.get("current_conflict_card", {})
+    conflict = {"name": conflict_card.get("name", "N/A"), "rewards": conflict_card.get("rewards_text", [])}
+    _json_section(sections, "conflict", 90, "Conflict", conflict, codebook)
+
+    if AI_PLAYER_NAME in players:
+        you = _minify(_compact_player(players[AI_PLAYER_NAME], codebook))
+        sections.append(PromptSection("you", REQUIRED, f"## You ({AI_PLAYER_NAME})\n{you}", codebook.take()))
+    opponents = {name: _compact_player(data, codebook) for name, data in players.items() if name != AI_PLAYER_NAME}
+    _json_section(sections, "opponents", 60, "Opponents", opponents, codebook)
+
+    sections.extend(_phase_sections(game_state, cards_db, codebook))
+
+    board = {
+        "occupied": {location_id: data.get("occupied_by")
+                     for location_id, data in view.get("locations_state", {}).items() if data.get("occupied_by")},
+        "alliances": view.get("alliances", {}),
+    }
+    if "imperium_row" in view and game_state.get("current_phase") != "REVEAL":
+        board["imperium_row"] = codebook.zone(view["imperium_row"])
+    _json_section(sections, "board", 50, "Board", board, codebook)
+
+    history = [_history_code(entry, codebook) for entry in game_state.get("round_history", [])]
+    recent, older = history[-RECENT_HISTORY:], history[:-RECENT_HISTORY]
+    if older:
+        sections.append(PromptSection("history_old", 20, "## Earlier moves\n" + "; ".join(older), codebook.take()))
+    if recent:
+        sections.append(PromptSection("history", 40, "## Recent moves (player:card@location)\n" + "; ".join(recent),
+                                      codebook.take()))
+
+    known = {"round", "currentPlayer", "current_phase", "players", "current_conflict_card", "locations_state",
+             "alliances", "imperium_row"}
+    rest = {key: value for key, value in view.items() if key not in known}
+    for key in ("destroyed_pile",):
+        if key in rest:
+            rest[key] = codebook.zone(rest[key])
+    _json_section(sections, "piles", 10, "Other", rest, codebook)
+    return sections, codebook
+
+
+def _legend(kept, codebook):
+    entries = {}
+    for section in kept:
+        entries.update(section.codes)
+    if not entries:
+        return None
+    lines = [codebook.legend_line(code, kind, item_id) for code, (kind, item_id) in
+             sorted(entries.items(), key=lambda item: (item[0][0], int(item[0][1:])))]
+    return PromptSection("legend", REQUIRED, "## LEGEND\n" + "\n".join(lines))
+
+
+def _assemble(kept, codebook):
+    legend = _legend(kept, codebook)
+    # Legenda zaraz po nagłówku, zadanie na końcu
+    ordered = [section for section in kept if section.name != "task"]
+    if legend is not None:
+        ordered.insert(1, legend)
+    ordered += [section for section in kept if section.name == "task"]
+    return "\n".join(section.text for section in ordered)
+
+
+def generate_compact_ai_prompt(game_state, cards_db, intrigues_db=None, token_budget=None):
+    """
+    Zwarty prompt dla gracza AI. `token_budget` (domyślnie
+    DEFAULT_TOKEN_BUDGET; 0 - bez limitu) ogranicza szacowaną długość.
+    Zwraca (tekst, lista odrzuconych sekcji).
+    """
+    if not game_state:
+        return "CRITICAL ERROR: Cannot load game state.", []
+    if not cards_db:
+        return "CRITICAL ERROR: Cards DB was not provided.", []
+    if token_budget is None:
+        token_budget = DEFAULT_TOKEN_BUDGET
+
+    sections, codebook = build_sections(game_state, cards_db, intrigues_db)
+    return _fit_to_budget(sections, codebook, token_budget)
+
+
+def _fit_to_budget(sections, codebook, token_budget):
+    """Odrzuca sekcje o najniższym priorytecie, aż tekst zmieści się w budżecie."""
+    kept = list(sections)
+    dropped = []
+    text = _assemble(kept, codebook)
+    while token_budget and estimate_tokens(text) > token_budget:
+        droppable = [section for section in kept if section.priority < REQUIRED]
+        if not droppable:
+            break
+        # Najniższy priorytet; przy remisie - sekcja późniejsza
+        victim = min(reversed(droppable), key=lambda section: section.priority)
+        kept.remove(victim)
+        dropped.append(victim.name)
+        text = _assemble(kept, codebook)
+    return text, dropped
+
+
+# --- Prompt przyrostowy ---
+
+def prompt_snapshot(game_state):
+    """
+    To, co widział gracz AI w prompcie: wersja stanu, runda, faza, długość
+    historii, liczniki graczy, zajęte pola, rynek, konflikt i sojusze.
+    Małe (bez talii), więc może być pamiętane dla każdego stołu.
+    """
+    players = {}
+    for player_name, player_data in game_state.get("players", {}).items():
+        values = {"VP": player_data.get("victory_points", 0),
+                  "agents_placed": player_data.get("agents_placed", 0),
+                  "intrigues": len(player_data.get("intrigue_hand", []))}
+        for resource, amount in player_data.get("resources", {}).items():
+            values[resource] = amount
+        for faction, amount in player_data.get("influence", {}).items():
+            values[f"{faction} influence"] = amount
+        players[player_name] = {"values": values, "passed": bool(player_data.get("has_passed")),
+                                "control": list(player_data.get("control", []))}
+    return {
+        "version": game_state.get("version", 0),
+        "round": game_state.get("round", 1),
+        "phase": game_state.get("current_phase"),
+        "history": len(game_state.get("round_history", [])),
+        "players": players,
+        "occupied": {location_id: data.get("occupied_by")
+                     for location_id, data in game_state.get("locations_state", {}).items() if data.get("occupied_by")},
+        "imperium_row": list(game_state.get("imperium_row", [])),
+        "conflict": game_state.get("current_conflict_card", {}).get("name"),
+        "alliances": dict(game_state.get("alliances", {}) or {}),
+    }
+
+
+def delta_possible(base, game_state):
+    """Prompt przyrostowy ma sens tylko w tej samej rundzie i fazie i dla starszej wersji stanu."""
+    return (base is not None
+            and base["round"] == game_state.get("round", 1)
+            and base["phase"] == game_state.get("current_phase")
+            and base["version"] <= game_state.get("version", 0)
+            and base["history"] <= len(game_state.get("round_history", [])))
+
+
+def _value_changes(before, after):
+    changes = []
+    for key in after:
+        difference = after[key] - before.get(key, 0)
+        if difference:
+            changes.append(f"{key} {difference:+d}")
+    return changes
+
+
+def generate_delta_prompt(base, game_state, cards_db, intrigues_db=None, token_budget=None):
+    """
+    Prompt z samymi zmianami od migawki `base` (prompt_snapshot poprzedniego
+    promptu): nowe wpisy historii, zmiany zasobów/VP/wpływów, nowo zajęte pola,
+    zmiany rynku, konfliktu i sojuszy, plus bieżąca ręka AI i zadanie.
+    Gdy delta nie ma sensu (delta_possible), zwraca pełny zwarty prompt.
+    Zwraca (tekst, odrzucone sekcje, czy_delta).
+    """
+    if not delta_possible(base, game_state):
+        text, dropped = generate_compact_ai_prompt(game_state, cards_db, intrigues_db, token_budget)
+        return text, dropped, False
+    if token_budget is None:
+        token_budget = DEFAULT_TOKEN_BUDGET
+
+    codebook = Codebook(cards_db, intrigues_db)
+    current = prompt_snapshot(game_state)
+    sections = [PromptSection(
+        "header", REQUIRED,
+        f"You are player {AI_PLAYER_NAME} in Dune: Imperium. Round {current['round']}, phase {current['phase']}.\n"
+        f"UPDATE since your previous prompt (state v{base['version']} -> v{current['version']}): "
+        "only changes are listed, everything else is unchanged. Codes as before; LEGEND lists codes used here."
+    )]
+
+    history = game_state.get("round_history", [])[base["history"]:]
+    if history:
+        moves = "; ".join(_history_code(entry, codebook) for entry in history)
+        sections.append(PromptSection("history", 90, "## New moves (player:card@location)\n" + moves, codebook.take()))
+
+    changes = []
+    for player_name, player in current["players"].items():
+        before = base["players"].get(player_name, {"values": {}, "passed": False, "control": []})
+        player_changes = _value_changes(before["values"], player["values"])
+        if player["passed"] and not before["passed"]:
+            player_changes.append("PASSED")
+        player_changes += [f"controls {location}" for location in player["control"] if location not in before["control"]]
+        if player_changes:
+            changes.append(f"{player_name}: {', '.join(player_changes)}")
+    if changes:
+        sections.append(PromptSection("changes", 85, "## Changes\n" + "\n".join(changes)))
+
+    occupied = {location_id: player_name for location_id, player_name in current["occupied"].items()
+                if base["occupied"].get(location_id) != player_name}
+    board = {"newly_occupied": occupied}
+    if current["alliances"] != base["alliances"]:
+        board["alliances"] = current["alliances"]
+    if current["conflict"] != base["conflict"]:
+        board["conflict"] = current["conflict"]
+    if current["imperium_row"] != base["imperium_row"]:
+        board["imperium_row"] = codebook.zone(current["imperium_row"])
+    _json_section(sections, "board", 80, "Board", board, codebook)
+
+    players = redacted_view(game_state, COMPACT_VIEW_MASK).get("players", {})
+    if AI_PLAYER_NAME in players:
+        ai_player = players[AI_PLAYER_NAME]
+        you = {"hand": codebook.zone(ai_player.get("hand", [])),
+               "intrigue_hand": codebook.zone(ai_player.get("intrigue_hand", []), codebook.intrigue)}
+        sections.append(PromptSection("you", REQUIRED, f"## You ({AI_PLAYER_NAME})\n{_minify(you)}", codebook.take()))
+
+    sections.extend(section for section in _phase_sections(game_state, cards_db, codebook) if section.name == "task")
+    text, dropped = _fit_to_budget(sections, codebook, token_budget)
+    return text, dropped, True
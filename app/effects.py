@@ -0,0 +1,688 @@
+# app/effects.py
+"""
+Kompilacja efektów kart, lokacji, intryg i sygnetów do planów wykonywalnych.
+
+Surowe listy akcji z plików JSON są interpretowane raz (przy wczytaniu
+katalogu) i zamieniane na krotki typowanych operacji. Silnik (process_move,
+process_intrigue) wykonuje gotowe plany - bez szukania klucza operacji,
+dopasowywania nazw zasobów po podciągach czy opisów wymagań.
+"""
+from catalog import compiled
+from game_rng import game_random
+
+
+class EffectContext:
+    """Stan pojedynczego wykonania planu (gracz, log i decyzje z formularza)."""
+    __slots__ = ("player_state", "game_state", "log", "location_id", "leader", "pay_cost", "choice_index")
+
+    def __init__(self, player_state, game_state, log, location_id=None, leader=None, pay_cost=False, choice_index=-1, **_ignored):
+        self.player_state = player_state
+        self.game_state = game_state
+        self.log = log
+        self.location_id = location_id
+        self.leader = leader    # leader_hooks.LeaderHooks gracza albo None
+        self.pay_cost = pay_cost
+        self.choice_index = choice_index
+
+
+# --- Sojusze -----------------------------------------------------------------
+
+def check_and_update_alliances(player_state, game_state, faction, log_summary):
+    """
+    Sprawdza i aktualizuje stan sojuszy dla danej frakcji po zdobyciu wpływów.
+    Przyznaje 1 VP nowemu sojusznikowi i odbiera 1 VP staremu sojusznikowi.
+    """
+    player_name = player_state.get("name", "Unknown Player") # Upewnij się, że player_state ma "name" lub pobierz go inaczej
+    if player_name == "Unknown Player" and "leader" in player_state: # Hack, aby znaleźć nazwę gracza
+        for name, p_data in game_state.get("players", {}).items():
+            if p_data.get("leader") == player_state.get("leader"):
+                player_name = name
+                player_state["name"] = name # Zapisz na przyszłość
+                break
+
+    player_influence = player_state.get("influence", {}).get(faction, 0)
+
+    # --- START POPRAWKI (PRZYWRÓCENIE POPRAWNEGO PROGU) ---
+    # Gracz musi mieć co najmniej 4 wpływy, aby kwalifikować się do sojuszu
+    if player_influence < 4:
+        return # Gracz nie ma wystarczająco wpływów
+    # --- KONIEC POPRAWKI ---
+
+    if "alliances" not in game_state:
+        game_state["alliances"] = {"emperor": None, "guild": None, "fremen": None, "bene_gesserit": None}
+
+    current_ally_name = game_state["alliances"].get(faction)
+
+    # Jeśli gracz już ma ten sojusz, nic się nie zmienia
+    if current_ally_name == player_name:
+        return
+
+    # Sprawdź, czy gracz ma więcej wpływów niż obecny sojusznik
+    if current_ally_name:
+        current_ally_state = game_state.get("players", {}).get(current_ally_name)
+        if current_ally_state:
+            current_ally_influence = current_ally_state.get("influence", {}).get(faction, 0)
+            # Gracz musi mieć ŚCIŚLE WIĘCEJ wpływów, aby przejąć sojusz
+            if player_influence <= current_ally_influence:
+                return # Nie udało się przejąć sojuszu
+
+            # Odbierz VP staremu sojusznikowi
+            current_ally_state["victory_points"] = current_ally_state.get("victory_points", 1) - 1
+            log_summary.append(f"Gracz {current_ally_name} stracił sojusz z {faction} (i 1 VP).")
+
+    # Przyznaj sojusz i VP nowemu graczowi
+    game_state["alliances"][faction] = player_name
+    player_state["victory_points"] = player_state.get("victory_points", 0) + 1
+    log_summary.append(f"Gracz {player_name} zdobył sojusz z {faction} i zyskał 1 VP!")
+
+
+# --- Zyski -------------------------------------------------------------------
+
+class GainCardDraw:
+    __slots__ = ("amount",)
+
+    def __init__(self, amount):
+        self.amount = amount
+
+    def apply(self, ctx):
+        ctx.log.append(f"MANUAL ACTION: Draw {self.amount} card(s) (use 'Manage Hand')")
+
+
+DRAW_ONE_CARD = GainCardDraw(1)
+
+
+class GainInfluence:
+    __slots__ = ("faction", "amount", "bonus")
+
+    def __init__(self, faction, amount, bonus):
+        self.faction = faction
+        self.amount = amount
+        self.bonus = bonus
+
+    def apply(self, ctx):
+        player_state = ctx.player_state
+        faction = self.faction
+        amount = self.amount
+        if "influence" not in player_state: player_state["influence"] = {}
+        player_state["influence"][faction] = player_state["influence"].get(faction, 0) + amount
+        ctx.log.append(f"Zyskano {amount} wpływu {faction}.")
+
+        new_influence = player_state["influence"][faction]
+
+        if "faction_vp_claimed_2pts" not in player_state:
+            player_state["faction_vp_claimed_2pts"] = {"emperor": False, "guild": False, "fremen": False, "bene_gesserit": False}
+
+        if new_influence >= 2 and not player_state["faction_vp_claimed_2pts"].get(faction, False):
+            player_state["faction_vp_claimed_2pts"][faction] = True
+            player_state["victory_points"] = player_state.get("victory_points", 0) + 1
+            ctx.log.append(f"Osiągnięto 2 pkt. wpływu w {faction}! Zyskano 1 VP (nowa mechanika).")
+
+        if "faction_bonus_claimed" not in player_state:
+            player_state["faction_bonus_claimed"] = {"emperor": False, "guild": False, "fremen": False, "bene_gesserit": False}
+
+        if new_influence >= 4 and not player_state["faction_bonus_claimed"].get(faction, False):
+            player_state["faction_bonus_claimed"][faction] = True
+            ctx.log.append(f"Osiągnięto 4 pkt. wpływu! Odbieranie jednorazowej nagrody...")
+            for op in self.bonus:
+                op.apply(ctx)
+
+        check_and_update_alliances(player_state, ctx.game_state, faction, ctx.log)
+
+
+class GainVictoryPoints:
+    __slots__ = ("amount",)
+
+    def __init__(self, amount):
+        self.amount = amount
+
+    def apply(self, ctx):
+        ctx.player_state["victory_points"] = ctx.player_state.get("victory_points", 0) + self.amount
+        ctx.log.append(f"Zyskano {self.amount} VP!")
+
+
+class GainFightPoints:
+    __slots__ = ("amount",)
+
+    def __init__(self, amount):
+        self.amount = amount
+
+    def apply(self, ctx):
+        player_state = ctx.player_state
+        if "active_effects" not in player_state: player_state["active_effects"] = {}
+        current = player_state["active_effects"].get("fight_bonus_swords", 0)
+        player_state["active_effects"]["fight_bonus_swords"] = current + self.amount
+        ctx.log.append(f"Zyskano {self.amount} punktów walki (miecza).")
+
+
+class GainPersuasion:
+    __slots__ = ("amount",)
+
+    def __init__(self, amount):
+        self.amount = amount
+
+    def apply(self, ctx):
+        player_state = ctx.player_state
+        if "reveal_stats" not in player_state: player_state["reveal_stats"] = {}
+        current = player_state["reveal_stats"].get("total_persuasion", 0)
+        player_state["reveal_stats"]["total_persuasion"] = current + self.amount
+        ctx.log.append(f"Zyskano {self.amount} perswazji (do Fazy Odkrycia).")
+
+
+class GainTroops:
+    __slots__ = ("amount",)
+
+    def __init__(self, amount):
+        self.amount = amount
+
+    def apply(self, ctx):
+        player_resources = ctx.player_state.get("resources", {})
+        player_resources["troops_garrison"] = player_resources.get("troops_garrison", 0) + self.amount
+        ctx.log.append(f"Zyskano {self.amount} troops (do garnizonu).")
+
+
+class GainIntrigue:
+    __slots__ = ("amount",)
+
+    def __init__(self, amount):
+        self.amount = amount
+
+    def apply(self, ctx):
+        player_state = ctx.player_state
+        if "intrigue_hand" not in player_state:
+            player_state["intrigue_hand"] = []
+        rng = game_random(ctx.game_state)
+        for _ in range(self.amount):
+            player_state["intrigue_hand"].append(f"Intrigue_Card_{rng.randint(100,999)}")
+        ctx.log.append(f"Zyskano {self.amount} kartę Intrygi (placeholder).")
+
+
+class GainResource:
+    """Zasób z puli gracza (solari, water, Spice, ...)."""
+    __slots__ = ("resource", "amount")
+
+    def __init__(self, resource, amount):
+        self.resource = resource
+        self.amount = amount
+
+    def apply(self, ctx):
+        amount = self.amount
+        leader = ctx.leader
+        if leader is not None and leader.gain_modifier is not None:
+            amount = leader.gain_modifier(ctx, self.resource, amount, False)
+
+        player_resources = ctx.player_state.get("resources", {})
+        if self.resource in player_resources:
+            player_resources[self.resource] = player_resources.get(self.resource, 0) + amount
+            ctx.log.append(f"Zyskano {amount} {self.resource}.")
+        else:
+            ctx.log.append(f"Nieznany zasób: {self.resource}.")
+
+
+class GainLocationBonus:
+    """'extra gain' - bonusowa Przyprawa zgromadzona na lokacji."""
+    __slots__ = ()
+
+    def apply(self, ctx):
+        location_id = ctx.location_id
+        if location_id and location_id in ctx.game_state.get("locations_state", {}):
+            loc_state = ctx.game_state["locations_state"][location_id]
+            bonus_spice = loc_state.get("bonus_spice", 0)
+
+            leader = ctx.leader
+            if leader is not None and leader.gain_modifier is not None:
+                bonus_spice = leader.gain_modifier(ctx, "Spice", bonus_spice, True)
+
+            player_resources = ctx.player_state.get("resources", {})
+            player_resources["Spice"] = player_resources.get("Spice", 0) + bonus_spice
+            loc_state["bonus_spice"] = 0 # Zresetuj bonus
+
+            ctx.log.append(f"Zyskano {bonus_spice} bonusowej Przyprawy z lokacji (bonus zresetowany do 0).")
+        else:
+            ctx.log.append(f"Efekt manualny: 'extra gain' (nie można było zidentyfikować location_id={location_id})")
+
+
+class LogOnly:
+    """Efekt, który silnik tylko odnotowuje (do wykonania ręcznie)."""
+    __slots__ = ("message",)
+
+    def __init__(self, message):
+        self.message = message
+
+    def apply(self, ctx):
+        ctx.log.append(self.message)
+
+
+# --- Wymagania ---------------------------------------------------------------
+
+class RequireWonConflict:
+    __slots__ = ()
+
+    def check(self, ctx, log):
+        if not ctx.player_state.get("active_effects", {}).get("won_conflict", False):
+            log.append("Wymaganie 'wygrania konfliktu' niespełnione.")
+            return False
+        return True
+
+
+class RequireCardCount:
+    __slots__ = ("card_id", "name", "amount")
+
+    def __init__(self, card_id, name, amount):
+        self.card_id = card_id
+        self.name = name
+        self.amount = amount
+
+    def check(self, ctx, log):
+        count = ctx.player_state.get("deck_pool", []).count(self.card_id)
+        if count < self.amount:
+            log.append(f"Wymaganie 'min. {self.amount} {self.name}' niespełnione (Ma: {count}).")
+            return False
+        return True
+
+
+class RequireInfluenceTracks:
+    __slots__ = ("tracks",)
+
+    def __init__(self, tracks):
+        self.tracks = tracks
+
+    def check(self, ctx, log):
+        influence = ctx.player_state.get("influence", {})
+        count = sum(1 for v in influence.values() if v >= 3)
+        if count < self.tracks:
+            log.append(f"Wymaganie 'min. 3 wpływu na {self.tracks} ścieżkach' niespełnione.")
+            return False
+        return True
+
+
+class RequireHighCouncil:
+    __slots__ = ()
+
+    def check(self, ctx, log):
+        occupant = ctx.game_state.get("locations_state", {}).get("high_council", {}).get("occupied_by")
+        if occupant != ctx.player_state.get("name", ""):
+            log.append("Wymaganie 'miejsce w High Council' niespełnione.")
+            return False
+        return True
+
+
+class RequireManual:
+    __slots__ = ("message",)
+
+    def __init__(self, description):
+        self.message = f"Wymaganie '{description}' sprawdzane manualnie (założono TRUE)."
+
+    def check(self, ctx, log):
+        log.append(self.message)
+        return True
+
+
+class RequireNothing:
+    __slots__ = ()
+
+    def check(self, ctx, log):
+        return True
+
+
+# --- Operacje planu (elementy listy akcji) -----------------------------------
+# Każda operacja zwraca True, jeśli łańcuch akcji ma być kontynuowany.
+
+class Requirement:
+    __slots__ = ("checks",)
+
+    def __init__(self, checks):
+        self.checks = checks
+
+    def run(self, ctx):
+        log = []
+        all_met = True
+        for check in self.checks:
+            if not check.check(ctx, log):
+                all_met = False
+        if log:
+            ctx.log.append(" ".join(log))
+        return all_met
+
+
+class Gain:
+    __slots__ = ("gains",)
+
+    def __init__(self, gains):
+        self.gains = gains
+
+    def run(self, ctx):
+        for gain in self.gains:
+            gain.apply(ctx)
+        return True
+
+
+class Pay:
+    __slots__ = ("costs",)
+
+    def __init__(self, costs):
+        self.costs = costs
+
+    def run(self, ctx):
+        if not ctx.pay_cost: # Wymaga jawnej zgody
+            ctx.log.append("Gracz odrzucił opcjonalny koszt.")
+            return False
+        return apply_costs(ctx.player_state, self.costs, ctx.log)
+
+
+class Exchange:
+    __slots__ = ("costs", "gains")
+
+    def __init__(self, costs, gains):
+        self.costs = costs
+        self.gains = gains
+
+    def run(self, ctx):
+        if not ctx.pay_cost: # Wymaga jawnej zgody na wymianę
+            ctx.log.append("Gracz odrzucił opcjonalną wymianę.")
+        elif apply_costs(ctx.player_state, self.costs, ctx.log):
+            for gain in self.gains:
+                gain.apply(ctx)
+        else:
+            ctx.log.append("Wymiana nieudana (brak środków).")
+        return True
+
+
+class Choice:
+    __slots__ = ("options",)
+
+    def __init__(self, options):
+        self.options = options
+
+    def run(self, ctx):
+        choice_index = ctx.choice_index
+        if choice_index is None: choice_index = -1
+        if choice_index < 0 or choice_index >= len(self.options):
+            ctx.log.append(f"Wymagany wybór (0-{len(self.options)-1}), ale nie podano lub jest błędny. Karta odrzucona bez efektu.")
+            return False
+        ctx.log.append(f"Wybrano opcję {choice_index + 1}.")
+        run_plan(self.options[choice_index], ctx)
+        return True
+
+
+class Note:
+    __slots__ = ("message",)
+
+    def __init__(self, message):
+        self.message = message
+
+    def run(self, ctx):
+        ctx.log.append(self.message)
+        return True
+
+
+def run_plan(plan, ctx):
+    """Wykonuje skompilowaną listę operacji. Zwraca False, jeśli łańcuch przerwano."""
+    all_reqs_met = True
+    for op in plan:
+        if not all_reqs_met:
+            ctx.log.append("Akcja przerwana z powodu niespełnienia wymagań.")
+            break
+        all_reqs_met = op.run(ctx)
+    return all_reqs_met
+
+
+def apply_costs(player_state, costs, log_summary):
+    """Próbuje pobrać koszt (lista par zasób/ilość) od gracza. Zwraca True/False."""
+    player_resources = player_state.get("resources", {})
+
+    # Krok 1: Sprawdź, czy gracza stać
+    for resource, amount in costs:
+        if resource == "troops in conflict":
+            if player_state.get("troops_in_conflict", 0) < amount:
+                log_summary.append(f"Niepowodzenie: brak {amount} wojsk w konflikcie.")
+                return False
+        elif player_resources.get(resource, 0) < amount:
+            log_summary.append(f"Niepowodzenie: brak {amount} {resource}.")
+            return False
+
+    # Krok 2: Pobierz zasoby
+    for resource, amount in costs:
+        if resource == "troops in conflict":
+            player_state["troops_in_conflict"] = player_state.get("troops_in_conflict", 0) - amount
+            log_summary.append(f"Usunięto {amount} wojsk z konfliktu.")
+        else:
+            player_resources[resource] = player_resources.get(resource, 0) - amount
+            log_summary.append(f"Zapłacono {amount} {resource}.")
+    return True
+
+
+# --- Kompilator --------------------------------------------------------------
+
+FACTION_BONUS_REWARDS = {
+    "emperor": {"type": "resource", "resource": "troops_garrison", "amount": 2},
+    "guild": {"type": "resource", "resource": "solari", "amount": 3},
+    "fremen": {"type": "resource", "resource": "water", "amount": 1},
+    "bene_gesserit": {"type": "resource", "resource": "intrigue", "amount": 1},
+}
+
+
+def _as_list(data):
+    if data is None:
+        return []
+    return data if isinstance(data, list) else [data]
+
+
+def compile_gain(gain):
+    """Zamienia pojedynczy opis zysku na operację."""
+    gain_type = gain.get("type")
+
+    if gain_type in ("resource", "gain"):
+        resource = gain.get("resource")
+        amount = gain.get("amount", 0)
+        if resource == "card from unplayed pile":
+            return GainCardDraw(amount)
+        if "influence point" in resource:
+            faction = resource.split(" ")[0]
+            bonus = FACTION_BONUS_REWARDS.get(faction)
+            return GainInfluence(faction, amount, (compile_gain(bonus),) if bonus else ())
+        if resource == "vp":
+            return GainVictoryPoints(amount)
+        if resource == "fight points":
+            return GainFightPoints(amount)
+        if resource == "persuasion":
+            return GainPersuasion(amount)
+        if resource == "troops":
+            return GainTroops(amount)
+        if resource == "intrigue":
+            return GainIntrigue(amount)
+        return GainResource(resource, amount)
+
+    if gain_type == "extra gain":
+        return GainLocationBonus()
+    if gain_type == "action":
+        return LogOnly(f"Efekt manualny: {gain.get('description')}")
+    return LogOnly(f"Manualny zysk: {gain.get('description', 'nieznany')}")
+
+
+def compile_gains(gain_data):
+    return tuple(compile_gain(gain) for gain in _as_list(gain_data))
+
+
+def compile_costs(pay_data):
+    return tuple((cost.get("resource"), cost.get("amount", 0)) for cost in _as_list(pay_data))
+
+
+def compile_requirement(req):
+    req_type = req.get("type")
+    description = req.get("description", "")
+
+    if req_type == "action" and "win the conflict" in description:
+        return RequireWonConflict()
+    if req_type == "resource" and req.get("resource") == "The Spice Must Flow":
+        return RequireCardCount("the_spice_must_flow", "The Spice Must Flow", req.get("amount", 2))
+    if req_type == "influence":
+        if "3 influence on 3 faction tracks" in description:
+            return RequireInfluenceTracks(3)
+        if "3 influence on 4 faction tracks" in description:
+            return RequireInfluenceTracks(4)
+        return RequireNothing()
+    if req_type == "action" and "place in high council" in description:
+        return RequireHighCouncil()
+    return RequireManual(req.get("description", "nieznane"))
+
+
+def _compile_exchange(exchange_data):
+    if isinstance(exchange_data, dict):
+        # Forma skrócona: {"pay": {...}, "gain": {...}}
+        exchange_data = [{key: value} for key, value in exchange_data.items()]
+    pay_data = next((d for d in exchange_data if "pay" in d), {}).get("pay")
+    gain_items = [d for d in exchange_data if "pay" not in d]
+    if not pay_data or not gain_items:
+        return Note("Błąd struktury wymiany.")
+
+    gains = []
+    for gain_item in gain_items:
+        if "gain" in gain_item:
+            gains.extend(compile_gains(gain_item["gain"]))
+        elif gain_item.get("type") == "action":
+            gains.append(compile_gain(gain_item))
+    return Exchange(compile_costs(pay_data), tuple(gains))
+
+
+def _compile_choice_option(option):
+    first_key = next(iter(option))
+    # Struktura A: {"action1": [...]}; Struktura B: bezpośrednio {"gain": {...}}
+    if first_key.startswith("action") or isinstance(option[first_key], list):
+        return compile_actions(option[first_key])
+    return compile_actions([option])
+
+
+def compile_action(item):
+    """Zamienia pojedynczy element listy akcji na operację planu."""
+    operation_key = next(iter(item))
+
+    if operation_key == "type":
+        item_type = item["type"]
+        if item_type == "requirement":
+            requirement = item.get("requirement", item)
+            return Requirement(tuple(compile_requirement(req) for req in _as_list(requirement)))
+        if item_type == "action":
+            return Gain((compile_gain(item),))
+        if item_type == "choice" and "choice" in item:
+            return Choice(tuple(_compile_choice_option(option) for option in item["choice"]))
+        if item_type == "gain":
+            return Gain((compile_gain(item),))
+        return Note(f"Nieznany typ operacji: {item_type}")
+
+    if operation_key == "gain":
+        return Gain(compile_gains(item["gain"]))
+    if operation_key == "pay":
+        return Pay(compile_costs(item["pay"]))
+    if operation_key == "exchange":
+        return _compile_exchange(item["exchange"])
+    if operation_key == "choice":
+        return Choice(tuple(_compile_choice_option(option) for option in item["choice"]))
+    return Note(f"Nieobsługiwany klucz operacji: {operation_key}")
+
+
+def compile_actions(action_list):
+    """Kompiluje listę akcji z JSON do krotki operacji."""
+    plan = []
+    for item in _as_list(action_list):
+        if not item:
+            continue
+        if isinstance(item, list):
+            plan.extend(compile_actions(item))
+            continue
+        plan.append(compile_action(item))
+    return tuple(plan)
+
+
+# --- Plany dla katalogów -----------------------------------------------------
+
+class CardPlan:
+    __slots__ = ("agent", "destroys_card")
+
+    def __init__(self, agent, destroys_card):
+        self.agent = agent
+        self.destroys_card = destroys_card
+
+
+class LocationPlan:
+    __slots__ = ("cost", "actions")
+
+    def __init__(self, cost, actions):
+        self.cost = cost
+        self.actions = actions
+
+
+class IntriguePlan:
+    """
+    Plan intrygi: `gain`, `flag` (set_flag) albo `steps` (listy akcji
+    wykonywane niezależnie, np. action1/action2 w 'Market Manopoly').
+    """
+    __slots__ = ("gain", "flag", "steps", "header")
+
+    def __init__(self, gain=None, flag=None, steps=(), header=None):
+        self.gain = gain
+        self.flag = flag
+        self.steps = steps
+        self.header = header
+
+
+def _compile_card_plans(cards_db):
+    plans = {}
+    for card_id, card_data in cards_db.items():
+        agent_actions = card_data.get("agent_effect", {}).get("actions", [])
+        destroys_card = any(isinstance(item, dict) and item.get("type") == "destroy this card" for item in agent_actions)
+        plans[card_id] = CardPlan(compile_actions(agent_actions), destroys_card)
+    return plans
+
+
+def _compile_location_plans(locations_db):
+    plans = {}
+    for loc_id, location_data in locations_db.items():
+        cost = tuple(
+            (item.get("resource"), item.get("amount", 0))
+            for item in location_data.get("cost", [])
+            if item.get("type") == "resource"
+        )
+        plans[loc_id] = LocationPlan(cost, compile_actions(location_data.get("actions", [])))
+    return plans
+
+
+def _compile_intrigue_plans(intrigues_db):
+    plans = {}
+    for intrigue_id, intrigue_data in intrigues_db.items():
+        actions_object = intrigue_data.get("actions", {})
+        if "gain" in actions_object:
+            plans[intrigue_id] = IntriguePlan(gain=compile_gains(actions_object["gain"]))
+        elif "set_flag" in actions_object:
+            plans[intrigue_id] = IntriguePlan(flag=actions_object["set_flag"])
+        elif "action" in actions_object:
+            plans[intrigue_id] = IntriguePlan(steps=(compile_actions(actions_object["action"]),))
+        elif "action1" in actions_object:
+            # Specjalny przypadek dla "market_manopoly" - dwie niezależne akcje
+            plans[intrigue_id] = IntriguePlan(
+                steps=(compile_actions(actions_object["action1"]), compile_actions(actions_object.get("action2", []))),
+                header="Sprawdzanie efektów 'Market Manopoly':",
+            )
+    return plans
+
+
+def _compile_leader_plans(leaders_db):
+    signets = {}
+    for leader_id, leader_data in leaders_db.items():
+        signets[leader_id] = compile_actions(leader_data.get("ability_signet", {}).get("action", []))
+    return {"signets": signets}
+
+
+def card_plans(cards_db):
+    return compiled("card_plans", _compile_card_plans, cards_db)
+
+
+def location_plans(locations_db):
+    return compiled("location_plans", _compile_location_plans, locations_db)
+
+
+def intrigue_plans(intrigues_db):
+    return compiled("intrigue_plans", _compile_intrigue_plans, intrigues_db)
+
+
+def leader_plans(leaders_db):
+    return compiled("leader_plans", _compile_leader_plans, leaders_db)
@@ -1,8 +1,25 @@
 # app/game_manager.py
+import atexit
 import json
 import os
-import random 
 import copy
+import re
+from collections import Counter
+
+from catalog import Catalog, compiled
+from state_store import (
+    JsonFileStore, EventLogStore, SqliteDatabase, SqliteStore, WriteBehindStore, StaleStateError,
+    write_json_atomic
+)
+from effects import (
+    EffectContext, run_plan, check_and_update_alliances,
+    card_plans, location_plans, intrigue_plans, leader_plans
+)
+from leader_hooks import leader_hooks
+import reveal_counters
+from card_zones import new_zone_like
+from game_rng import game_random, seed_game
+from live_updates import LIVE
 
 APP_DIR = os.path.dirname(os.path.abspath(__file__))
 
@@ -16,6 +33,39 @@ GAME_STATE_DEFAULT_FILE = os.path.join(APP_DIR, 'game_stat.DEFAULT.json')
 
 AI_PLAYER_NAME = 'Peter'
 
+# Sposób przechowywania stanu gry:
+#   "json"   - cały stan przepisywany do game_stat.json przy każdej akcji
+#   "events" - dziennik zdarzeń + migawki w katalogu game_stat.events/
+#   "sqlite" - wszystkie gry w jednej bazie SQLite (games.db, tryb WAL)
+STATE_BACKEND = os.environ.get('DUNE_STATE_BACKEND', 'json')
+EVENT_SNAPSHOT_EVERY = int(os.environ.get('DUNE_SNAPSHOT_EVERY', '100'))
+STATE_DB_FILE = os.environ.get('DUNE_STATE_DB', os.path.join(APP_DIR, 'games.db'))
+# Zapis w tle (write-behind): stan w pamięci jest źródłem prawdy, a na dysk
+# trafia najpóźniej po tylu milisekundach od pierwszej niezapisanej zmiany
+# (seria akcji = jeden zapis). 0 - każda akcja zapisywana od razu.
+WRITE_BEHIND_SECONDS = int(os.environ.get('DUNE_WRITE_BEHIND_MS', '0') or 0) / 1000.0
+# fsync każdego zapisu (plik JSON, migawka i dziennik zdarzeń, SQLite synchronous=FULL)
+STATE_FSYNC = os.environ.get('DUNE_FSYNC', '') == '1'
+
+# Tryb weryfikacji liczników Odkrycia: każdy odczyt sum porównywany jest z
+# pełnym przeliczeniem ręki i stosu odrzuconych (rozbieżność -> AssertionError).
+REVEAL_STATS_VERIFY = os.environ.get('DUNE_VERIFY_REVEAL_STATS', '') == '1'
+
+# Gra "default" to dotychczasowy game_stat.json; pozostałe stoły mają własne
+# identyfikatory (w trybie "json" - osobne pliki w katalogu games/).
+DEFAULT_GAME_ID = 'default'
+GAME_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+# Katalogi (karty, lokacje, ...) są wczytywane raz na proces i przeładowywane
+# tylko po zmianie pliku na dysku.
+CATALOG = Catalog({
+    "locations": LOCATIONS_DB_FILE,
+    "cards": CARDS_DB_FILE,
+    "intrigues": INTRIGUES_DB_FILE,
+    "conflicts": CONFLICTS_DB_FILE,
+    "leaders": LEADERS_DB_FILE,
+})
+
 def load_json_file(filename):
     """Wczytuje plik JSON i zwraca jego zawartość."""
     try:
@@ -29,23 +79,116 @@ def load_json_file(filename):
         return None
 
 def save_json_file(filename, data):
-    """Zapisuje dane (słownik) do pliku JSON."""
+    """Zapisuje dane (słownik) do pliku JSON (atomowo - plik tymczasowy + os.replace)."""
     try:
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        write_json_atomic(filename, data, fsync=STATE_FSYNC, indent=2)
         return True 
     except IOError:
         print(f"Error: Could not write to file {filename}")
         return False
 
-def load_game_data():
+_state_stores = {}
+_databases = {}
+
+def is_valid_game_id(game_id):
+    return bool(game_id) and GAME_ID_PATTERN.match(game_id) is not None
+
+def _new_state_store(game_id):
+    # Tylko gra domyślna startuje z istniejącego game_stat.json
+    bootstrap_file = GAME_STATE_FILE if game_id == DEFAULT_GAME_ID else None
+    if STATE_BACKEND == 'events':
+        events_dir = os.path.splitext(GAME_STATE_FILE)[0] + '.events'
+        return EventLogStore(events_dir, game_id, snapshot_every=EVENT_SNAPSHOT_EVERY, bootstrap_file=bootstrap_file,
+                             fsync=STATE_FSYNC)
+    if STATE_BACKEND == 'sqlite':
+        database = _databases.get(STATE_DB_FILE)
+        if database is None:
+            database = _databases[STATE_DB_FILE] = SqliteDatabase(STATE_DB_FILE, fsync=STATE_FSYNC)
+        return SqliteStore(database, game_id, bootstrap_file=bootstrap_file)
+    if game_id == DEFAULT_GAME_ID:
+        return JsonFileStore(GAME_STATE_FILE, game_id, fsync=STATE_FSYNC)
+    # Katalog games/ powstaje przy pierwszym zapisie (blokada pliku stołu)
+    games_dir = os.path.join(os.path.dirname(GAME_STATE_FILE), 'games')
+    return JsonFileStore(os.path.join(games_dir, f'{game_id}.json'), game_id, fsync=STATE_FSYNC, missing_ok=True)
+
+def get_state_store(game_id=DEFAULT_GAME_ID, create=True):
+    """
+    Zwraca magazyn stanu gry `game_id` dla bieżącego backendu. Magazyny są
+    pamiętane od pierwszego zapisu albo odczytu istniejącego stołu; odczyt
+    (create=False) stołu bez zapisanego stanu dostaje magazyn jednorazowy,
+    więc dowolne identyfikatory z URL nie zostają w pamięci procesu.
+    """
+    key = (STATE_BACKEND, GAME_STATE_FILE, STATE_DB_FILE, WRITE_BEHIND_SECONDS, game_id)
+    store = _state_stores.get(key)
+    if store is None:
+        store = _new_state_store(game_id)
+        if not create and game_id != DEFAULT_GAME_ID and store.version() is None:
+            return store
+        if WRITE_BEHIND_SECONDS > 0:
+            store = WriteBehindStore(store, WRITE_BEHIND_SECONDS)
+        _state_stores[key] = store
+    return store
+
+def flush_state_stores():
+    """Zapisuje na dysk niezapisane zmiany wszystkich stołów (tryb write-behind)."""
+    for store in list(_state_stores.values()):
+        if isinstance(store, WriteBehindStore):
+            store.flush()
+
+# Zamknięcie serwera (także Ctrl+C) nie gubi zmian czekających na zapis w tle
+atexit.register(flush_state_stores)
+
+def load_game_state(game_id=DEFAULT_GAME_ID):
+    """
+    Wczytuje bieżący stan gry z magazynu. Nowy stół (brak zapisanego stanu)
+    dostaje świeży stan startowy z game_stat.DEFAULT.json.
+    """
+    game_state = get_state_store(game_id, create=False).load()
+    if game_state is None and game_id != DEFAULT_GAME_ID:
+        game_state = build_new_game_state()
+    return game_state
+
+def game_state_version(game_id=DEFAULT_GAME_ID):
+    """
+    Wersja zapisanego stanu gry bez jego wczytywania (None - stół nie ma
+    jeszcze zapisanego stanu). Do tanich zapytań warunkowych (ETag).
+    """
+    return get_state_store(game_id, create=False).version()
+
+def save_game_state(game_state, action=None, game_id=DEFAULT_GAME_ID):
+    """
+    Utrwala stan gry. `action` to krótki opis akcji (słownik), który trafia
+    do dziennika zdarzeń; pozostałe backendy go ignorują.
+    Rzuca StaleStateError, jeśli od wczytania stanu ktoś inny zapisał nowszą
+    wersję (pole "version") - wtedy akcję trzeba powtórzyć na świeżym stanie.
+    """
+    saved = get_state_store(game_id).save(game_state, action)
+    if saved:
+        # Otwarte strony stołu dostają łatkę przez /events
+        LIVE.publish(game_id, game_state)
+    return saved
+
+def replace_game_state(game_state, action=None, game_id=DEFAULT_GAME_ID):
+    """Zastępuje cały stan gry (reset, ręczna edycja JSON)."""
+    saved = get_state_store(game_id).replace(game_state, action)
+    if saved:
+        LIVE.publish(game_id, game_state)
+    return saved
+
+def load_catalogs():
+    """Zwraca widoki katalogów (tylko do odczytu) z procesowego cache."""
+    return (
+        CATALOG.get("locations"),
+        CATALOG.get("cards"),
+        CATALOG.get("intrigues"),
+        CATALOG.get("conflicts"),
+        CATALOG.get("leaders"),
+    )
+
+def load_game_data(game_id=DEFAULT_GAME_ID):
     """Wczytuje i zwraca kluczowe dane gry."""
-    game_state = load_json_file(GAME_STATE_FILE)
-    locations_db = load_json_file(LOCATIONS_DB_FILE)
-    cards_db = load_json_file(CARDS_DB_FILE)
-    intrigues_db = load_json_file(INTRIGUES_DB_FILE)
-    conflicts_db = load_json_file(CONFLICTS_DB_FILE)
-    leaders_db = load_json_file(LEADERS_DB_FILE) # <-- NOWA LINIA
+    game_state = load_game_state(game_id)
+    locations_db, cards_db, intrigues_db, conflicts_db, leaders_db = load_catalogs()
     if not all([game_state, locations_db, cards_db, intrigues_db, conflicts_db, leaders_db]): # <--
         return None, None, None, None, None, None 
     
@@ -104,9 +247,7 @@ def is_move_valid(game_state, locations_db, leaders_db, cards_db, player_name, c
     if not player_state:
         return False, f"Player {player_name} not found."
     
-    player_leader_id = player_state.get("leader")
-    leader_data = leaders_db.get(player_leader_id, {})
-    passive_ability_name = leader_data.get("ability_passive", {}).get("name")
+    hooks = leader_hooks(player_state, leaders_db)
     
     if player_state.get("agents_placed", 0) >= player_state.get("agents_total", 2):
         return False, f"Player {player_name} has no more agents to place this round."
@@ -124,15 +265,11 @@ def is_move_valid(game_state, locations_db, leaders_db, cards_db, player_name, c
 
     location_state = game_state.get("locations_state", {}).get(location_id, {})
     if location_state.get("occupied_by") is not None:
-        # Sprawdź zdolność Heleny
-        if passive_ability_name == "Knows Everything":
-            location_symbol = location_data.get("symbol_required")
-            if location_symbol in ["populated areas", "Landsraad"]:
-                pass # Zdolność Heleny pozwala zignorować zajęte pole
-            else:
-                return False, f"Location is already occupied. (Helena's ability only works on 'populated areas' and 'Landsraad' spaces)."
-        else:
+        # Zdolność lidera może pozwolić zignorować zajęte pole (Helena)
+        if hooks.occupancy_override is None:
             return False, f"Location is already occupied by player {location_state['occupied_by']}."
+        if not hooks.occupancy_override(location_data.get("symbol_required")):
+            return False, f"Location is already occupied. ({hooks.ability_name} does not apply to this space.)"
 
     player_hand = player_state.get("hand", [])
     if card_id not in player_hand:
@@ -155,10 +292,9 @@ def is_move_valid(game_state, locations_db, leaders_db, cards_db, player_name, c
             player_has = player_resources.get(resource_name, 0)
             
             effective_required_amount = required_amount
-            if passive_ability_name == "Popularity in Landsraad" and resource_name == "solari":
-                location_symbol = location_data.get("symbol_required")
-                if location_symbol == "Landsraad":
-                    effective_required_amount = max(0, required_amount - 1)
+            if hooks.cost_modifier is not None:
+                effective_required_amount = hooks.cost_modifier(resource_name, required_amount,
+                                                                location_data.get("symbol_required"))
             
             if player_has < effective_required_amount:
                 return False, f"Player {player_name} does not have enough resources. Required: {effective_required_amount} {resource_name} (Original: {required_amount}), Has: {player_has}."
@@ -176,6 +312,121 @@ def is_move_valid(game_state, locations_db, leaders_db, cards_db, player_name, c
     return True, "Move is valid."
 
 
+class MoveIndex:
+    """
+    Indeksy do generowania legalnych ruchów (budowane raz na wczytanie katalogów):
+      symbol_locations - symbol -> lokacje wymagające tego symbolu
+      open_locations   - lokacje bez wymaganego symbolu (dowolna karta)
+      card_symbols     - karta -> krotka jej symboli agenta (bez powtórzeń, w
+                         kolejności z katalogu - kolejność ruchów nie zależy
+                         od PYTHONHASHSEED)
+      location_costs   - lokacja -> ((zasób, ilość), ...)
+      location_symbol  - lokacja -> wymagany symbol
+      fremen_required  - lokacja -> minimalny wpływ Fremenów (extra_requirement)
+    """
+    __slots__ = ("symbol_locations", "open_locations", "card_symbols", "location_costs",
+                 "location_symbol", "fremen_required")
+
+    def __init__(self, locations_db, cards_db):
+        self.symbol_locations = {}
+        self.open_locations = []
+        self.location_costs = {}
+        self.location_symbol = {}
+        self.fremen_required = {}
+        for location_id, location_data in locations_db.items():
+            symbol = location_data.get("symbol_required")
+            self.location_symbol[location_id] = symbol
+            if symbol:
+                self.symbol_locations.setdefault(symbol, []).append(location_id)
+            else:
+                self.open_locations.append(location_id)
+
+            costs = []
+            for cost_item in location_data.get("cost", []):
+                if cost_item.get("type") == "resource":
+                    costs.append((cost_item.get("resource"), cost_item.get("amount", 0)))
+            self.location_costs[location_id] = tuple(costs)
+
+            if location_data.get("extra_requirement") == "2 fremen influence points":
+                self.fremen_required[location_id] = 2
+
+        self.card_symbols = {
+            card_id: tuple(dict.fromkeys(card_data.get("agent_symbols", [])))
+            for card_id, card_data in cards_db.items()
+        }
+
+    def reachable_locations(self, card_id):
+        """Lokacje, których wymaganie symbolu spełnia karta (bez zajętości i kosztów)."""
+        locations = list(self.open_locations)
+        for symbol in self.card_symbols.get(card_id, ()):
+            locations.extend(self.symbol_locations.get(symbol, ()))
+        return locations
+
+
+def move_index(locations_db, cards_db):
+    return compiled("move_index", MoveIndex, locations_db, cards_db)
+
+
+def legal_moves(game_state, player_name, locations_db=None, cards_db=None, leaders_db=None):
+    """
+    Zwraca listę wszystkich legalnych par (card_id, location_id) dla gracza -
+    te same reguły co is_move_valid, ale w jednym przebiegu: dostępność
+    lokacji (zajętość, koszt, dodatkowe wymagania) liczona jest raz na
+    lokację, a nie raz na parę.
+    """
+    if locations_db is None:
+        locations_db, cards_db, _, _, leaders_db = load_catalogs()
+
+    if game_state.get("current_phase") != "AGENT_TURN":
+        return []
+    player_state = game_state.get("players", {}).get(player_name, {})
+    if not player_state:
+        return []
+    if player_state.get("agents_placed", 0) >= player_state.get("agents_total", 2):
+        return []
+    if player_state.get("has_passed", False):
+        return []
+
+    index = move_index(locations_db, cards_db)
+    hooks = leader_hooks(player_state, leaders_db)
+    occupancy_override = hooks.occupancy_override
+    cost_modifier = hooks.cost_modifier
+    player_resources = player_state.get("resources", {})
+    fremen_influence = player_state.get("influence", {}).get("fremen", 0)
+    locations_state = game_state.get("locations_state", {})
+
+    # 1. Które lokacje są w ogóle osiągalne dla tego gracza (niezależnie od karty)
+    open_to_player = set()
+    for location_id, costs in index.location_costs.items():
+        if locations_state.get(location_id, {}).get("occupied_by") is not None:
+            if occupancy_override is None or not occupancy_override(index.location_symbol[location_id]):
+                continue
+        affordable = True
+        for resource_name, amount in costs:
+            if cost_modifier is not None:
+                amount = cost_modifier(resource_name, amount, index.location_symbol[location_id])
+            if player_resources.get(resource_name, 0) < amount:
+                affordable = False
+                break
+        if not affordable:
+            continue
+        if fremen_influence < index.fremen_required.get(location_id, 0):
+            continue
+        open_to_player.add(location_id)
+
+    # 2. Karty z ręki x lokacje pasujące symbolem
+    moves = []
+    seen_cards = set()
+    for card_id in player_state.get("hand", []):
+        if card_id in seen_cards or card_id not in cards_db:
+            continue
+        seen_cards.add(card_id)
+        for location_id in index.reachable_locations(card_id):
+            if location_id in open_to_player:
+                moves.append((card_id, location_id))
+    return moves
+
+
 def process_move(game_state, locations_db, cards_db, leaders_db, player_name, card_id, location_id, **kwargs):    
     """
     Przetwarza ruch ORAZ implementuje efekty agenta, lokacji i sygnetu.
@@ -184,14 +435,15 @@ def process_move(game_state, locations_db, cards_db, leaders_db, player_name, ca
     card_name = cards_db.get(card_id, {}).get("name", card_id)
     location_name = locations_db.get(location_id, {}).get("name", location_id)
     location_data = locations_db.get(location_id, {})
-    card_data = cards_db.get(card_id, {})
+    location_plan = location_plans(locations_db).get(location_id)
+    card_plan = card_plans(cards_db).get(card_id)
     
     player_state = game_state.get("players", {}).get(player_name, {})
     player_resources = player_state.get("resources", {})
 
     player_leader_id = player_state.get("leader")
-    leader_data = leaders_db.get(player_leader_id, {})
-    passive_ability_name = leader_data.get("ability_passive", {}).get("name")
+    hooks = leader_hooks(player_state, leaders_db)
+    ctx_kwargs = dict(kwargs, location_id=location_id, leader=hooks)
 
     # --- 1. Ustawienie lokacji ---
     if location_id not in game_state["locations_state"]:
@@ -201,70 +453,45 @@ def process_move(game_state, locations_db, cards_db, leaders_db, player_name, ca
     move_summary = f"{player_name} played '{card_name}' on '{location_name}'."
 
     # --- 2. Zapłać koszt lokacji ---
-    location_cost = location_data.get("cost", [])
-    for cost_item in location_cost:
-        if cost_item.get("type") == "resource":
-            resource_name = cost_item.get("resource")
-            resource_amount = cost_item.get("amount", 0)
-            
-            # Oblicz efektywny koszt (Zdolność Leto)
-            effective_resource_amount = resource_amount
-            if passive_ability_name == "Popularity in Landsraad" and resource_name == "solari":
-                location_symbol = location_data.get("symbol_required")
-                if location_symbol == "Landsraad":
-                    effective_resource_amount = max(0, resource_amount - 1)
-            
-            # Zapłać koszt
-            current_amount = player_resources.get(resource_name, 0)
-            player_resources[resource_name] = current_amount - effective_resource_amount
-            move_summary += f" (Paid {effective_resource_amount} {resource_name})"
-            
-            # Sprawdź zdolność Ilbana
-            if passive_ability_name == "Ruthless Negotiator" and resource_name == "solari" and effective_resource_amount > 0:
-                # Zamiast losowego dociągania, dodajemy instrukcję manualną
-                draw_summary_parts = []
-                _apply_gain(player_state, [{"type": "resource", "resource": "card from unplayed pile", "amount": 1}], draw_summary_parts, game_state)
-                move_summary += f" | Ilban's Ability: {', '.join(draw_summary_parts)}"
+    for resource_name, resource_amount in (location_plan.cost if location_plan else ()):
+        # Oblicz efektywny koszt (zdolność lidera, np. Leto)
+        effective_resource_amount = resource_amount
+        if hooks.cost_modifier is not None:
+            effective_resource_amount = hooks.cost_modifier(resource_name, resource_amount,
+                                                            location_data.get("symbol_required"))
+        
+        # Zapłać koszt
+        current_amount = player_resources.get(resource_name, 0)
+        player_resources[resource_name] = current_amount - effective_resource_amount
+        move_summary += f" (Paid {effective_resource_amount} {resource_name})"
+        
+        # Zdolność lidera po zapłaceniu kosztu (Ilban)
+        if hooks.post_pay is not None:
+            move_summary += hooks.post_pay(EffectContext(player_state, game_state, []), resource_name, effective_resource_amount)
             
     # --- 3. Zastosuj efekty lokacji ---
-    location_actions_list = location_data.get("actions", [])
     loc_summary_parts = [] # Lista na podsumowanie efektów lokacji
-    
-    # Wywołujemy "mądrą" funkcję, przekazując jej game_state
-    _process_action_list(player_state, location_actions_list, loc_summary_parts, game_state, location_id=location_id, cards_db=cards_db, leaders_db=leaders_db, **kwargs)    
+    if location_plan:
+        run_plan(location_plan.actions, EffectContext(player_state, game_state, loc_summary_parts, **ctx_kwargs))
     if loc_summary_parts:
         move_summary += f" | Location: {', '.join(loc_summary_parts)}"
     else:
         move_summary += " | Location: (No effect)"
 
-    # --- POCZĄTEK NOWEJ LOGIKI (EARL) ---
-    # Sprawdź zdolność Earla po zajęciu High Council
-    if passive_ability_name == "Connections" and location_id == "high_council":
-        # Ręcznie stwórz akcję "gain intrigue" i przetwórz ją
-        intrigue_action = [{"gain": {"type": "resource", "resource": "intrigue", "amount": 1}}] # Lekko zmieniona struktura, aby pasowała do _process_action_list
-        intrigue_summary_parts = []
-        
-        # Używamy "mądrej" funkcji, przekazując kwargs na wypadek przyszłych zmian
-        _process_action_list(player_state, intrigue_action, intrigue_summary_parts, game_state, cards_db=cards_db, location_id=location_id,leaders_db=leaders_db **kwargs) 
-        
-        if intrigue_summary_parts:
-            move_summary += f" | Earl's Ability: {', '.join(intrigue_summary_parts)}"
-    # --- KONIEC NOWEJ LOGIKI ---
+    # Zdolność lidera po zajęciu pola (Earl na High Council)
+    if hooks.occupy_trigger is not None:
+        move_summary += hooks.occupy_trigger(EffectContext(player_state, game_state, [], **ctx_kwargs))
     
     # --- 4. Zastosuj efekty karty (Agent lub Signet) ---
     is_destroyed = False
     
     # === OBSŁUGA SIGNET RING ===
     if card_id == 'signet_ring':
-        player_leader_id = player_state.get("leader") # To już mamy
-        if player_leader_id and player_leader_id in leaders_db:
-            leader_data_signet = leaders_db[player_leader_id] # Użyj innej zmiennej
-            signet_ability = leader_data_signet.get("ability_signet", {})
-            signet_actions = signet_ability.get("action", [])
-            
-            # Przekaż dane lidera również tutaj (na wypadek, gdyby sygnet dawał przyprawę Arianie)
+        signet_plan = leader_plans(leaders_db)["signets"].get(player_leader_id) if player_leader_id else None
+        if signet_plan is not None:
+            signet_ability = leaders_db[player_leader_id].get("ability_signet", {})
             signet_summary_parts = []
-            _process_action_list(player_state, signet_actions, signet_summary_parts, game_state, location_id=location_id, cards_db=cards_db,leaders_db=leaders_db, **kwargs)
+            run_plan(signet_plan, EffectContext(player_state, game_state, signet_summary_parts, **ctx_kwargs))
             if signet_summary_parts:
                 move_summary += f" | Signet ({signet_ability.get('name', 'Ability')}): {', '.join(signet_summary_parts)}"
             else:
@@ -274,27 +501,21 @@ def process_move(game_state, locations_db, cards_db, leaders_db, player_name, ca
     
     # === OBSŁUGA STANDARDOWEGO EFEKTU AGENTA ===
     else:
-        agent_effect = card_data.get("agent_effect", {})
-        agent_actions_list = agent_effect.get("actions", [])
-        
         card_summary_parts = [] # Lista na podsumowanie efektów karty
-        _process_action_list(player_state, agent_actions_list, card_summary_parts, game_state, cards_db=cards_db, location_id=location_id,leaders_db=leaders_db, **kwargs)
+        if card_plan:
+            run_plan(card_plan.agent, EffectContext(player_state, game_state, card_summary_parts, **ctx_kwargs))
+            is_destroyed = card_plan.destroys_card
         
         if card_summary_parts:
             move_summary += f" | Card: {', '.join(card_summary_parts)}"
         else:
             move_summary += " | Card: (No effect)"
-        
-        # Sprawdź, czy karta ma być zniszczona
-        for item in agent_actions_list:
-            if item.get("type") == "destroy this card":
-                is_destroyed = True
-                break
             
     # --- 5. Przenieś kartę (do odrzuconych lub zniszczonych) ---
     if is_destroyed:
         if card_id in player_state.get("hand", []):
             player_state["hand"].remove(card_id)
+            reveal_counters.remove_card(player_state, "hand", card_id, cards_db)
         if card_id in player_state.get("deck_pool", []):
             player_state["deck_pool"].remove(card_id)
         if "destroyed_pile" not in game_state:
@@ -305,13 +526,16 @@ def process_move(game_state, locations_db, cards_db, leaders_db, player_name, ca
         # Przenieś z ręki (AI) lub z puli (Człowiek) na stos odrzuconych
         if card_id in player_state.get("hand", []):
             player_state["hand"].remove(card_id)
+            reveal_counters.remove_card(player_state, "hand", card_id, cards_db)
             if "discard_pile" not in player_state:
                 player_state["discard_pile"] = []
             player_state["discard_pile"].append(card_id)
+            reveal_counters.add_card(player_state, "played", card_id, cards_db)
         elif player_name != AI_PLAYER_NAME:
              if "discard_pile" not in player_state:
                 player_state["discard_pile"] = []
              player_state["discard_pile"].append(card_id)
+             reveal_counters.add_card(player_state, "played", card_id, cards_db)
 
     # --- 6. Zaktualizuj stan agentów gracza ---
     player_state["agents_placed"] = player_state.get("agents_placed", 0) + 1
@@ -342,31 +566,32 @@ def process_move(game_state, locations_db, cards_db, leaders_db, player_name, ca
     return game_state
 
 
-def get_intrigue_requirements(intrigue_id, intrigues_db):
-    """
-    Sprawdza, czy karta intrygi wymaga interakcji z graczem (wyboru lub opłaty).
-    Zwraca słownik opisujący wymaganą decyzję.
-    """
-    card_data = intrigues_db.get(intrigue_id)
-    if not card_data:
-        return {"type": "not_found"}
+# Tabele decyzji: czy karta, lokacja, sygnet lidera lub intryga wymaga od
+# gracza wyboru (choice), wymiany (exchange) albo opcjonalnej opłaty
+# (conditional_pay). Liczone raz na wczytanie katalogu (compiled), więc
+# sprawdzenie ruchu to dwa odczyty ze słownika zamiast przeglądania akcji.
+# Zwracane słowniki decyzji są wspólne - tylko do odczytu.
+SIMPLE_DECISION = {"type": "simple"}
+NOT_FOUND_DECISION = {"type": "not_found"}
+
 
+def _intrigue_decision(card_data):
+    """Wymóg decyzji karty intrygi (na podstawie pierwszej operacji akcji)."""
     actions = card_data.get("actions", {})
     
     # Proste karty, które nie wymagają decyzji (tylko 'gain' lub 'set_flag')
     if "gain" in actions or "set_flag" in actions:
-        return {"type": "simple"} #
+        return SIMPLE_DECISION
 
     if "action" in actions:
         action_list = actions["action"]
         if not action_list or not isinstance(action_list, list):
-            return {"type": "simple"} # Karta ma pustą akcję lub jest tylko opisem
+            return SIMPLE_DECISION # Karta ma pustą akcję lub jest tylko opisem
 
         first_op = action_list[0]
         
         if "choice" in first_op:
             # Karta wymaga wyboru (np. "master_tactitian", "bypass_protocol")
-            #
             return {
                 "type": "choice",
                 "data": first_op["choice"] # Przekaż listę opcji do app.py
@@ -374,7 +599,6 @@ def get_intrigue_requirements(intrigue_id, intrigues_db):
             
         if "exchange" in first_op:
             # Karta wymaga wymiany (np. "bribery", "personal_army")
-            #
             return {
                 "type": "exchange",
                 "data": first_op["exchange"] # Przekaż dane wymiany do app.py
@@ -382,15 +606,13 @@ def get_intrigue_requirements(intrigue_id, intrigues_db):
             
         if "pay" in first_op:
             # Karta wymaga opcjonalnej opłaty (np. "calculated_recruitment")
-            #
             return {
                 "type": "conditional_pay",
                 "data": first_op["pay"] # Przekaż dane opłaty do app.py
             }
 
     # Domyślnie, jeśli struktura jest nieznana lub to tylko opis (np. "infiltration")
-    #
-    return {"type": "simple"}
+    return SIMPLE_DECISION
 
 
 def _find_decision_in_actions(actions_list):
@@ -427,41 +649,97 @@ def _find_decision_in_actions(actions_list):
     return {"type": "simple"}
 
 
-def get_agent_move_requirements(card_data, location_data, leaders_db, player_state):
+def _sourced_decision(actions_list, source):
+    """Decyzja z listy akcji z nazwą źródła albo None, jeśli akcje są proste."""
+    decision = _find_decision_in_actions(actions_list)
+    if decision["type"] == "simple":
+        return None
+    decision["source"] = source
+    return decision
+
+
+def _compile_move_decisions(cards_db, locations_db, leaders_db):
+    cards = {}
+    signet_cards = set()
+    for card_id, card_data in cards_db.items():
+        if card_data.get("name") == "Signet Ring":
+            # Efekt sygnetu zależy od lidera gracza ("signets")
+            signet_cards.add(card_id)
+            continue
+        decision = _sourced_decision(card_data.get("agent_effect", {}).get("actions", []), card_data.get("name", "Card"))
+        if decision is not None:
+            cards[card_id] = decision
+
+    signets = {}
+    for leader_id, leader_data in (leaders_db or {}).items():
+        signet_ability = leader_data.get("ability_signet", {})
+        decision = _sourced_decision(signet_ability.get("action", []), signet_ability.get("name", "Signet Ring"))
+        if decision is not None:
+            signets[leader_id] = decision
+
+    locations = {}
+    for location_id, location_data in locations_db.items():
+        decision = _sourced_decision(location_data.get("actions", []), location_data.get("name", "Location"))
+        if decision is not None:
+            locations[location_id] = decision
+
+    return {"cards": cards, "signet_cards": frozenset(signet_cards), "signets": signets, "locations": locations}
+
+
+def _compile_intrigue_decisions(intrigues_db):
+    return {intrigue_id: _intrigue_decision(card_data) for intrigue_id, card_data in intrigues_db.items() if card_data}
+
+
+def move_decisions(cards_db, locations_db, leaders_db):
     """
-    (NOWA FUNKCJA) Sprawdza, czy ruch agenta (karta + lokacja + sygnet) wymaga interakcji.
+    Decyzje ruchów agenta (bez prostych): {"cards": {karta: decyzja},
+    "signet_cards": karty-sygnety, "signets": {lider: decyzja}, "locations": {lokacja: decyzja}}.
     """
-    
-    # 1. Sprawdź efekty Karty Agenta
-    if card_data.get("name") == "Signet Ring":
-        # === Specjalny przypadek: Sygnet ===
-        player_leader_id = player_state.get("leader")
-        if player_leader_id and player_leader_id in leaders_db:
-            leader_data_signet = leaders_db[player_leader_id]
-            signet_ability = leader_data_signet.get("ability_signet", {})
-            signet_actions = signet_ability.get("action", [])
-            
-            sygnet_decision = _find_decision_in_actions(signet_actions)
-            if sygnet_decision["type"] != "simple":
-                sygnet_decision["source"] = leader_data_signet.get("ability_signet", {}).get("name", "Signet Ring")
-                return sygnet_decision
+    return compiled("move_decisions", _compile_move_decisions, cards_db, locations_db, leaders_db)
+
+
+def intrigue_decisions(intrigues_db):
+    return compiled("intrigue_decisions", _compile_intrigue_decisions, intrigues_db)
+
+
+def get_intrigue_requirements(intrigue_id, intrigues_db):
+    """
+    Sprawdza, czy karta intrygi wymaga interakcji z graczem (wyboru lub opłaty).
+    Zwraca słownik opisujący wymaganą decyzję.
+    """
+    return intrigue_decisions(intrigues_db).get(intrigue_id, NOT_FOUND_DECISION)
+
+
+def get_agent_move_requirements(card_id, location_id, player_state, cards_db, locations_db, leaders_db):
+    """
+    Sprawdza, czy ruch agenta (karta + lokacja + sygnet) wymaga interakcji.
+    Decyzja karty (albo sygnetu lidera gracza) ma pierwszeństwo przed decyzją lokacji.
+    """
+    decisions = move_decisions(cards_db, locations_db, leaders_db)
+    if card_id in decisions["signet_cards"]:
+        decision = decisions["signets"].get(player_state.get("leader"))
     else:
-        # === Standardowa Karta Agenta ===
-        agent_actions = card_data.get("agent_effect", {}).get("actions", [])
-        card_decision = _find_decision_in_actions(agent_actions)
-        if card_decision["type"] != "simple":
-            card_decision["source"] = card_data.get("name", "Card")
-            return card_decision
-
-    # 2. Sprawdź efekty Lokacji
-    location_actions = location_data.get("actions", [])
-    loc_decision = _find_decision_in_actions(location_actions)
-    if loc_decision["type"] != "simple":
-        loc_decision["source"] = location_data.get("name", "Location")
-        return loc_decision
-        
-    # 3. Jeśli nigdzie nie znaleziono decyzji
-    return {"type": "simple"}
+        decision = decisions["cards"].get(card_id)
+    return decision or decisions["locations"].get(location_id) or SIMPLE_DECISION
+
+
+def decision_map(game_state, cards_db, locations_db, leaders_db):
+    """
+    Typy decyzji dla strony stołu (bez decyzji "simple"): strona łączy je tak
+    jak get_agent_move_requirements i od razu wie, który ruch wymaga ekranu wyboru.
+    """
+    decisions = move_decisions(cards_db, locations_db, leaders_db)
+    signets = decisions["signets"]
+    return {
+        "cards": {card_id: decision["type"] for card_id, decision in decisions["cards"].items()},
+        "signet_cards": sorted(decisions["signet_cards"]),
+        "signets": {
+            player_name: signets[player_state.get("leader")]["type"]
+            for player_name, player_state in game_state.get("players", {}).items()
+            if player_state.get("leader") in signets
+        },
+        "locations": {location_id: decision["type"] for location_id, decision in decisions["locations"].items()},
+    }
 
 
 def process_pass_turn(game_state, player_name):
@@ -507,369 +785,6 @@ def check_and_advance_phase(game_state, cards_db):
     return game_state
 
 
-def _check_requirement(player_state, requirement_list, game_state):
-    """(Helper) Sprawdza, czy gracz spełnia wymagania."""
-    log_summary = []
-    all_met = True
-    
-    if not isinstance(requirement_list, list):
-        requirement_list = [requirement_list]
-
-    for req in requirement_list:
-        req_type = req.get("type")
-        
-        if req_type == "action" and "win the conflict" in req.get("description", ""):
-            # Wymagałoby to flagi ustawionej po rozwiązaniu konfliktu
-            if not player_state.get("active_effects", {}).get("won_conflict", False):
-                log_summary.append("Wymaganie 'wygrania konfliktu' niespełnione.")
-                all_met = False
-        
-        elif req_type == "resource" and req.get("resource") == "The Spice Must Flow":
-            # Dla "market_manopoly"
-            count = player_state.get("deck_pool", []).count("the_spice_must_flow")
-            min_amount = req.get("amount", 2) # Domyślnie 2 z opisu
-            if count < min_amount:
-                log_summary.append(f"Wymaganie 'min. {min_amount} The Spice Must Flow' niespełnione (Ma: {count}).")
-                all_met = False
-        
-        elif req_type == "influence":
-             # Dla "plans_within_plans"
-            influence = player_state.get("influence", {})
-            min_level = 3 # Z opisu
-            count = sum(1 for v in influence.values() if v >= min_level)
-            
-            if "3 influence on 3 faction tracks" in req.get("description", ""):
-                if count < 3:
-                    log_summary.append("Wymaganie 'min. 3 wpływu na 3 ścieżkach' niespełnione.")
-                    all_met = False
-            elif "3 influence on 4 faction tracks" in req.get("description", ""):
-                if count < 4:
-                    log_summary.append("Wymaganie 'min. 3 wpływu na 4 ścieżkach' niespełnione.")
-                    all_met = False
-                    
-        elif req_type == "action" and "place in high council" in req.get("description", ""):
-            # Dla "agreement_from_high_council"
-            # Zakładamy, że lokacja "high_council" jest zajęta przez gracza
-            if game_state.get("locations_state", {}).get("high_council", {}).get("occupied_by") != player_state.get("name", ""):
-                 log_summary.append("Wymaganie 'miejsce w High Council' niespełnione.")
-                 all_met = False
-
-        else:
-            log_summary.append(f"Wymaganie '{req.get('description', 'nieznane')}' sprawdzane manualnie (założono TRUE).")
-            
-    return all_met, " ".join(log_summary)
-
-def _apply_cost(player_state, pay_data, log_summary):
-    """(Helper) Próbuje pobrać koszt od gracza. Zwraca True/False."""
-    if not isinstance(pay_data, list):
-        pay_data = [pay_data]
-        
-    player_resources = player_state.get("resources", {})
-    
-    # Krok 1: Sprawdź, czy gracza stać
-    for cost in pay_data:
-        resource = cost.get("resource")
-        amount = cost.get("amount", 0)
-        
-        # Specjalna obsługa dla "feigned_incident"
-        if resource == "troops in conflict":
-            # To musiałoby być obsługiwane przez stan konfliktu, tu symulujemy
-            if player_state.get("troops_in_conflict", 0) < amount:
-                 log_summary.append(f"Niepowodzenie: brak {amount} wojsk w konflikcie.")
-                 return False
-        elif player_resources.get(resource, 0) < amount:
-            log_summary.append(f"Niepowodzenie: brak {amount} {resource}.")
-            return False
-            
-    # Krok 2: Pobierz zasoby
-    for cost in pay_data:
-        resource = cost.get("resource")
-        amount = cost.get("amount", 0)
-        
-        if resource == "troops in conflict":
-            player_state["troops_in_conflict"] = player_state.get("troops_in_conflict", 0) - amount
-            log_summary.append(f"Usunięto {amount} wojsk z konfliktu.")
-        else:
-            player_resources[resource] -= amount
-            log_summary.append(f"Zapłacono {amount} {resource}.")
-        
-    return True
-
-
-def _apply_gain(player_state, gain_data, log_summary, game_state, location_id=None, leaders_db=None, **kwargs):
-    """(Helper) Stosuje zysk dla gracza, uwzględniając pasywne zdolności liderów."""
-    if not isinstance(gain_data, list):
-        gain_data = [gain_data]
-
-    player_resources = player_state.get("resources", {})
-
-    # --- NOWA LOGIKA: Sprawdź pasywne zdolności Lidera ---
-    leader_id = player_state.get("leader")
-    leader_passive_name = ""
-    if leaders_db and leader_id:
-        leader_passive_name = leaders_db.get(leader_id, {}).get("ability_passive", {}).get("name", "")
-    # --- KONIEC NOWEJ LOGIKI ---
-
-    for gain in gain_data:
-        gain_type = gain.get("type")
-
-        if gain_type == "resource":
-            resource = gain.get("resource")
-            amount = gain.get("amount", 0)
-
-            # --- NOWA LOGIKA: Zdolność Pasywna Ariany ---
-            if resource == "Spice" and leader_passive_name == "Spice Addiction":
-                if amount > 0: # Zdolność działa tylko, gdy zbierasz przyprawę
-                    original_amount = amount
-                    amount = max(0, amount - 1) # Otrzymujesz o 1 mniej
-                    log_summary.append(f"Zdolność Ariany: Zmieniono {original_amount} Spice na {amount} Spice.")
-                    # I dociągasz kartę (używamy naszej logiki manualnej)
-                    _apply_gain(player_state, [{"type": "resource", "resource": "card from unplayed pile", "amount": 1}], log_summary, game_state, location_id, leaders_db, **kwargs)
-            # --- KONIEC NOWEJ LOGIKI ---
-
-            if resource == "card from unplayed pile":
-                log_summary.append(f"MANUAL ACTION: Draw {amount} card(s) (use 'Manage Hand')")
-
-            elif "influence point" in resource:
-                faction = resource.split(" ")[0]
-                if "influence" not in player_state: player_state["influence"] = {}
-                player_state["influence"][faction] = player_state["influence"].get(faction, 0) + amount
-                log_summary.append(f"Zyskano {amount} wpływu {faction}.")
-
-                new_influence = player_state["influence"][faction]
-
-                if "faction_vp_claimed_2pts" not in player_state:
-                    player_state["faction_vp_claimed_2pts"] = {"emperor": False, "guild": False, "fremen": False, "bene_gesserit": False}
-
-                if new_influence >= 2 and not player_state["faction_vp_claimed_2pts"].get(faction, False):
-                    player_state["faction_vp_claimed_2pts"][faction] = True
-                    player_state["victory_points"] = player_state.get("victory_points", 0) + 1
-                    log_summary.append(f"Osiągnięto 2 pkt. wpływu w {faction}! Zyskano 1 VP (nowa mechanika).")
-
-                if "faction_bonus_claimed" not in player_state:
-                    player_state["faction_bonus_claimed"] = {"emperor": False, "guild": False, "fremen": False, "bene_gesserit": False}
-
-                if new_influence >= 4 and not player_state["faction_bonus_claimed"].get(faction, False):
-                    player_state["faction_bonus_claimed"][faction] = True
-                    log_summary.append(f"Osiągnięto 4 pkt. wpływu! Odbieranie jednorazowej nagrody...")
-
-                    bonus_reward = []
-                    if faction == "emperor":
-                        bonus_reward = [{"type": "resource", "resource": "troops_garrison", "amount": 2}]
-                    elif faction == "guild":
-                        bonus_reward = [{"type": "resource", "resource": "solari", "amount": 3}]
-                    elif faction == "fremen":
-                        bonus_reward = [{"type": "resource", "resource": "water", "amount": 1}]
-                    elif faction == "bene_gesserit":
-                        bonus_reward = [{"type": "resource", "resource": "intrigue", "amount": 1}]
-
-                    if bonus_reward:
-                        # Wywołujemy samych siebie, przekazując dalej leaders_db
-                        _apply_gain(player_state, bonus_reward, log_summary, game_state, location_id, leaders_db, **kwargs) 
-
-                check_and_update_alliances(player_state, game_state, faction, log_summary)
-
-            elif resource == "vp":
-                player_state["victory_points"] = player_state.get("victory_points", 0) + amount
-                log_summary.append(f"Zyskano {amount} VP!")
-            elif resource == "fight points":
-                if "active_effects" not in player_state: player_state["active_effects"] = {}
-                current = player_state["active_effects"].get("fight_bonus_swords", 0)
-                player_state["active_effects"]["fight_bonus_swords"] = current + amount
-                log_summary.append(f"Zyskano {amount} punktów walki (miecza).")
-            elif resource == "persuasion":
-                if "reveal_stats" not in player_state: player_state["reveal_stats"] = {}
-                current = player_state["reveal_stats"].get("total_persuasion", 0)
-                player_state["reveal_stats"]["total_persuasion"] = current + amount
-                log_summary.append(f"Zyskano {amount} perswazji (do Fazy Odkrycia).")
-
-            # Ten blok MUSI być po logice Ariany
-            elif resource in player_resources:
-                player_resources[resource] = player_resources.get(resource, 0) + amount
-                log_summary.append(f"Zyskano {amount} {resource}.")
-            elif resource == "troops":
-                player_resources["troops_garrison"] = player_resources.get("troops_garrison", 0) + amount
-                log_summary.append(f"Zyskano {amount} troops (do garnizonu).")
-            elif resource == "intrigue":
-                if "intrigue_hand" not in player_state:
-                    player_state["intrigue_hand"] = []
-                for _ in range(amount):
-                    player_state["intrigue_hand"].append(f"Intrigue_Card_{random.randint(100,999)}")
-                log_summary.append(f"Zyskano {amount} kartę Intrygi (placeholder).")
-            else:
-                log_summary.append(f"Nieznany zasób: {resource}.")
-
-        elif gain_type == "extra gain":
-            if location_id and location_id in game_state.get("locations_state", {}):
-                loc_state = game_state["locations_state"][location_id]
-                bonus_spice = loc_state.get("bonus_spice", 0)
-
-                # --- NOWA LOGIKA: Zdolność Pasywna Ariany (dla bonusu) ---
-                if bonus_spice > 0 and leader_passive_name == "Spice Addiction":
-                    original_bonus = bonus_spice
-                    bonus_spice = max(0, bonus_spice - 1)
-                    log_summary.append(f"Zdolność Ariany: Zmieniono {original_bonus} bonusowej Spice na {bonus_spice}.")
-                    _apply_gain(player_state, [{"type": "resource", "resource": "card from unplayed pile", "amount": 1}], log_summary, game_state, location_id, leaders_db, **kwargs)
-                # --- KONIEC NOWEJ LOGIKI ---
-
-                player_resources["Spice"] = player_resources.get("Spice", 0) + bonus_spice
-                loc_state["bonus_spice"] = 0 # Zresetuj bonus
-
-                log_summary.append(f"Zyskano {bonus_spice} bonusowej Przyprawy z lokacji (bonus zresetowany do 0).")
-            else:
-                log_summary.append(f"Efekt manualny: 'extra gain' (nie można było zidentyfikować location_id={location_id})")
-
-        elif gain_type == "action":
-            log_summary.append(f"Efekt manualny: {gain.get('description')}")
-
-        else:
-            log_summary.append(f"Manualny zysk: {gain.get('description', 'nieznany')}")
-
-def check_and_update_alliances(player_state, game_state, faction, log_summary):
-    """
-    Sprawdza i aktualizuje stan sojuszy dla danej frakcji po zdobyciu wpływów.
-    Przyznaje 1 VP nowemu sojusznikowi i odbiera 1 VP staremu sojusznikowi.
-    """
-    player_name = player_state.get("name", "Unknown Player") # Upewnij się, że player_state ma "name" lub pobierz go inaczej
-    if player_name == "Unknown Player" and "leader" in player_state: # Hack, aby znaleźć nazwę gracza
-        for name, p_data in game_state.get("players", {}).items():
-            if p_data.get("leader") == player_state.get("leader"):
-                player_name = name
-                player_state["name"] = name # Zapisz na przyszłość
-                break
-
-    player_influence = player_state.get("influence", {}).get(faction, 0)
-
-    # --- START POPRAWKI (PRZYWRÓCENIE POPRAWNEGO PROGU) ---
-    # Gracz musi mieć co najmniej 4 wpływy, aby kwalifikować się do sojuszu
-    if player_influence < 4:
-        return # Gracz nie ma wystarczająco wpływów
-    # --- KONIEC POPRAWKI ---
-
-    if "alliances" not in game_state:
-        game_state["alliances"] = {"emperor": None, "guild": None, "fremen": None, "bene_gesserit": None}
-
-    current_ally_name = game_state["alliances"].get(faction)
-
-    # Jeśli gracz już ma ten sojusz, nic się nie zmienia
-    if current_ally_name == player_name:
-        return
-
-    # Sprawdź, czy gracz ma więcej wpływów niż obecny sojusznik
-    if current_ally_name:
-        current_ally_state = game_state.get("players", {}).get(current_ally_name)
-        if current_ally_state:
-            current_ally_influence = current_ally_state.get("influence", {}).get(faction, 0)
-            # Gracz musi mieć ŚCIŚLE WIĘCEJ wpływów, aby przejąć sojusz
-            if player_influence <= current_ally_influence:
-                return # Nie udało się przejąć sojuszu
-
-            # Odbierz VP staremu sojusznikowi
-            current_ally_state["victory_points"] = current_ally_state.get("victory_points", 1) - 1
-            log_summary.append(f"Gracz {current_ally_name} stracił sojusz z {faction} (i 1 VP).")
-
-    # Przyznaj sojusz i VP nowemu graczowi
-    game_state["alliances"][faction] = player_name
-    player_state["victory_points"] = player_state.get("victory_points", 0) + 1
-    log_summary.append(f"Gracz {player_name} zdobył sojusz z {faction} i zyskał 1 VP!")
-    
-
-def _process_action_list(player_state, action_list, log_summary, game_state, location_id=None, cards_db=None, leaders_db=None, **kwargs):
-    """(Helper) Przetwarza złożoną listę akcji, wymagań, wyborów i wymian."""
-    
-    all_reqs_met = True
-    
-    for item in action_list:
-        if not all_reqs_met:
-            log_summary.append("Akcja przerwana z powodu niespełnienia wymagań.")
-            break
-        
-        if not item: continue
-        # Znajdź kluczowy typ operacji (np. "type", "exchange", "choice", "gain", "pay")
-        operation_key = list(item.keys())[0]
-
-        if operation_key == "type":
-            if item["type"] == "requirement":
-                all_reqs_met, req_log = _check_requirement(player_state, item["requirement"], game_state, cards_db)
-                if req_log: log_summary.append(req_log)
-            elif item["type"] == "action":
-                _apply_gain(player_state, item, log_summary, game_state, **kwargs)
-            else:
-                log_summary.append(f"Nieznany typ operacji: {item['type']}")
-
-        elif operation_key == "gain":
-            _apply_gain(player_state, item["gain"], log_summary, game_state, location_id=location_id, leaders_db=leaders_db, **kwargs)
-
-        elif operation_key == "pay":
-            # Dla "calculated_recruitment"
-            if kwargs.get("pay_cost", False): # Wymaga jawnej zgody
-                if not _apply_cost(player_state, item["pay"], log_summary):
-                    all_reqs_met = False # Nie udało się zapłacić, zatrzymaj dalsze akcje
-            else:
-                log_summary.append("Gracz odrzucił opcjonalny koszt.")
-                all_reqs_met = False # Odrzucenie kosztu zatrzymuje łańcuch
-
-        elif operation_key == "exchange":
-            # Dla "bribery", "personal_army", "trick", "sleeping_must_wake_up", "khoam_shares"
-            exchange_data = item["exchange"]
-            pay_data = next((d for d in exchange_data if "pay" in d), {}).get("pay")
-            gain_data_list = [d for d in exchange_data if "pay" not in d] 
-            
-            if not pay_data or not gain_data_list:
-                log_summary.append("Błąd struktury wymiany.")
-                continue
-
-            if kwargs.get("pay_cost", False): # Wymaga jawnej zgody na wymianę
-                if _apply_cost(player_state, pay_data, log_summary):
-                    for gain_item in gain_data_list:
-                        if "gain" in gain_item:
-                             _apply_gain(player_state, gain_item["gain"], log_summary, game_state,location_id=location_id, leaders_db=leaders_db, **kwargs)
-                        elif "type" in gain_item and gain_item["type"] == "action":
-                             _apply_gain(player_state, gain_item, log_summary, game_state, location_id=location_id, leaders_db=leaders_db, **kwargs)
-                else:
-                    log_summary.append("Wymiana nieudana (brak środków).")
-            else:
-                log_summary.append("Gracz odrzucił opcjonalną wymianę.")
-                
-        elif operation_key == "choice":
-            # Dla "master_tactitian", "bypass_protocol", "demand_for_a_respect", "firm_grip"
-            choice_index = kwargs.get("choice_index", -1)
-            choices = item["choice"]
-
-            if choice_index < 0 or choice_index >= len(choices):
-                log_summary.append(f"Wymagany wybór (0-{len(choices)-1}), ale nie podano lub jest błędny. Karta odrzucona bez efektu.")
-                all_reqs_met = False
-            else:
-                log_summary.append(f"Wybrano opcję {choice_index + 1}.")
-
-                # --- START POPRAWKI (Problem 1) ---
-                chosen_item = choices[choice_index] # To jest obiekt, np. {"action1": [...]} LUB {"gain": {...}}
-
-                # Sprawdź, czy to Struktura A (z kluczem "actionX")
-                first_key = list(chosen_item.keys())[0]
-
-                # Sprawdzamy, czy klucz zaczyna się od "action" (np. action1, action2, action_fight)
-                # LUB czy wartość pod tym kluczem JEST listą (co jest typowe dla Struktury A)
-                if first_key.startswith("action") or isinstance(chosen_item[first_key], list):
-                    # To jest Struktura A, np. z "plans_within_plans"
-                    chosen_action_list = chosen_item[first_key]
-                    _process_action_list(player_state, chosen_action_list, log_summary, game_state, location_id=location_id, cards_db=cards_db, leaders_db=leaders_db, **kwargs)
-                else:
-                    # To jest Struktura B (bezpośrednia), np. z "firm_grip"
-                    # Klucz to "gain", "pay", "exchange" itp.
-                    # Musimy przekazać sam obiekt jako listę jednoelementową
-                    chosen_action_list = [chosen_item] 
-                    _process_action_list(player_state, chosen_action_list, log_summary, game_state, location_id=location_id, cards_db=cards_db, leaders_db=leaders_db, **kwargs)
-                # --- KONIEC POPRAWKI ---
-        
-        else:
-             log_summary.append(f"Nieobsługiwany klucz operacji: {operation_key}")
-
-    return all_reqs_met
-
-# --- KONIEC SEKCJI POMOCNICZEJ ---
-
-
 def process_intrigue(game_state, intrigues_db, cards_db, leaders_db, player_name, intrigue_id, **kwargs):
     """
     Przetwarza zagranie intrygi z ręki i automatyzuje wszystkie efekty
@@ -898,18 +813,17 @@ def process_intrigue(game_state, intrigues_db, cards_db, leaders_db, player_name
     
     log_summary = [f"Gracz {player_name} zagrał intrygę: '{intrigue_data.get('name')}'."]
     
-    actions_object = intrigue_data.get("actions", {})
-    card_type = intrigue_data.get("type", "conspiracy")
+    intrigue_plan = intrigue_plans(intrigues_db).get(intrigue_id)
+    ctx = EffectContext(player_state, game_state, log_summary, leader=leader_hooks(player_state, leaders_db), **kwargs)
 
-    # --- NOWA, SOLIDNA OBSŁUGA ---
-    
-    if "gain" in actions_object:
+    if intrigue_plan is not None and intrigue_plan.gain is not None:
         # 1. Prosty GAIN (np. "occasion", "learn_their_path")
-        _apply_gain(player_state, actions_object["gain"], log_summary, game_state, **kwargs)
+        for gain in intrigue_plan.gain:
+            gain.apply(ctx)
         
-    elif "set_flag" in actions_object:
+    elif intrigue_plan is not None and intrigue_plan.flag is not None:
         # 2. Ustawienie FLAGI (np. "ambush")
-        flag_data = actions_object["set_flag"]
+        flag_data = intrigue_plan.flag
         flag_name = flag_data.get("name")
         
         if "active_effects" not in player_state:
@@ -925,17 +839,13 @@ def process_intrigue(game_state, intrigues_db, cards_db, leaders_db, player_name
              player_state["active_effects"][flag_name] = value_to_set
              log_summary.append(f"Efekt: Zyskano tymczasową zdolność '{flag_name}'.")
 
-    elif "action" in actions_object:
-        # 3. Złożona lista AKCJI (np. "bribery", "master_tactitian", "plans_within_plans")
-        # Przekazujemy player_state, listę akcji, log, cały stan gry (dla _check_requirement) i decyzje
-        _process_action_list(player_state, actions_object["action"], log_summary, game_state, leaders_db=leaders_db, cards_db=cards_db, **kwargs)
-    
-    elif "action1" in actions_object:
-         # 4. Specjalny przypadek dla "market_manopoly"
-         # Ta karta ma dwie oddzielne, niezależne akcje
-        log_summary.append("Sprawdzanie efektów 'Market Manopoly':")
-        _process_action_list(player_state, [actions_object["action1"]], log_summary, game_state, leaders_db=leaders_db, cards_db=cards_db, **kwargs)
-        _process_action_list(player_state, [actions_object["action2"]], log_summary, game_state, leaders_db=leaders_db, cards_db=cards_db, **kwargs)
+    elif intrigue_plan is not None and intrigue_plan.steps:
+        # 3. Złożone listy AKCJI (np. "bribery", "master_tactitian", "plans_within_plans")
+        # oraz niezależne akcje action1/action2 ("market_manopoly")
+        if intrigue_plan.header:
+            log_summary.append(intrigue_plan.header)
+        for step in intrigue_plan.steps:
+            run_plan(step, ctx)
 
     else:
         # 5. Fallback dla nieznanych struktur lub kart tylko z opisem
@@ -961,107 +871,50 @@ def calculate_and_store_reveal_stats(game_state, cards_db):
     return game_state
 
 
+def reveal_totals(player_state, cards_db, player_name, all_alliances):
+    """
+    Zwraca (total_persuasion, base_swords) gracza z bieżących liczników
+    (reveal_counters) - bez przeglądania ręki i stosu odrzuconych.
+    """
+    has_emperor_alliance = (all_alliances.get("emperor") == player_name)
+    counters = reveal_counters.get_counters(player_state, cards_db)
+    totals = reveal_counters.totals_from_counters(counters, cards_db, has_emperor_alliance)
+    if REVEAL_STATS_VERIFY:
+        expected = reveal_counters.scan_reveal_totals(player_state, cards_db, has_emperor_alliance)
+        if totals != expected or counters != reveal_counters.build_counters(player_state, cards_db):
+            raise AssertionError(
+                f"Reveal counters out of sync for {player_name}: incremental {totals}, full recompute {expected}."
+            )
+    return totals
+
+
 def calculate_reveal_stats(player_state, cards_db, player_name, all_alliances):
     """
     Oblicza sumę Perswazji i BAZOWEJ Siły dla gracza.
-    TERAZ OBSŁUGUJE KLUCZOWE EFEKTY WARUNKOWE.
+    Sumy pochodzą z liczników (reveal_totals); premie warunkowe kart są
+    zadeklarowane w cards.json (reveal_effect.bonus) i oceniane na wektorze
+    liczników. Przegląd ręki buduje tylko opisy kart dla widoku Odkrycia.
     """
-    total_persuasion = 0
-    base_swords = 0  
-    
-    cards_in_hand_ids = player_state.get("hand", [])
-    cards_played_ids = player_state.get("discard_pile", [])
+    total_persuasion, base_swords = reveal_totals(player_state, cards_db, player_name, all_alliances)
     
     cards_in_hand_details = []
     cards_played_details = [] 
 
-    # --- Krok 0: Przygotuj dane do warunków ---
-    
-    # Zbuduj listę ID kart fremenów zagranych w tej rundzie (w discard_pile)
-    played_fremen_card_ids = []
-    for card_id in cards_played_ids:
-        card_data = cards_db.get(card_id, {})
-        # Sprawdzamy tagi "agent_symbols" LUB "type" (na wszelki wypadek)
-        if "fremen" in card_data.get("agent_symbols", []):
-            played_fremen_card_ids.append(card_id)
-    
-    # Sprawdź sojusz z Cesarzem
-    # Sprawdź sojusz z Cesarzem (POPRAWIONA LOGIKA)
-    player_influence = player_state.get("influence", {})
-    has_emperor_alliance = (all_alliances.get("emperor") == player_name)
-
-    # --- Krok 1: Przetwórz karty W RĘCE (dają Perswazję i Siłę) ---
-    for card_id in cards_in_hand_ids:
-        card_data = cards_db.get(card_id)
-        if not card_data: continue
-            
-        reveal_effect = card_data.get("reveal_effect", {})
-        
-        # --- Logika bazowa ---
-        persuasion = reveal_effect.get("persuasion", 0)
-        swords = reveal_effect.get("swords", 0)
-        
-        possible_actions = reveal_effect.get("possible actions", {}).get("actions", [])
-        description = reveal_effect.get("possible actions", {}).get("description", "No effect.")
-        
-        # === POCZĄTEK NOWEJ LOGIKI WARUNKOWEJ (POPRAWKA 11) ===
-        
-        # --- A. Efekty warunkowe (automatyczne) ---
-        if card_id == "sietch_reverend_mother":
-            if len(played_fremen_card_ids) > 0:
-                persuasion += 3
-                description = f"BONUS AKTYWOWANY: +3 Perswazji (za zagraną kartę Fremenów)."
-        elif card_id == "fedaykin_death_commando":
-            if len(played_fremen_card_ids) > 0:
-                swords += 3
-                description = f"BONUS AKTYWOWANY: +3 Miecza (za zagraną kartę Fremenów)."
-        elif card_id == "firm_grip":
-            if has_emperor_alliance:
-                persuasion += 4
-                description = f"BONUS AKTYWOWANY: +4 Perswazji (za sojusz z Cesarzem)."
-        elif card_id == "liet_kynes":
-            fremen_count = len(played_fremen_card_ids)
-            for hand_card_id in cards_in_hand_ids:
-                if hand_card_id == "liet_kynes": continue
-                hand_card_data = cards_db.get(hand_card_id, {})
-                if "fremen" in hand_card_data.get("agent_symbols", []):
-                    fremen_count += 1
-            
-            bonus_persuasion = fremen_count * 2
-            if bonus_persuasion > 0:
-                persuasion += bonus_persuasion
-                description = f"BONUS AKTYWOWANY: +{bonus_persuasion} Perswazji (2 za każdą z {fremen_count} kart Fremenów)."
-        
-        # --- B. Obsługa CHOICE (automatyczne założenie) ---
-        elif card_id == "bene_gesserit_sister":
-            # Karta ma wybór: 2 Perswazji lub 2 Miecza.
-            # Automatycznie zakładamy wybór Perswazji, bo jest Faza Odkrycia (kupowanie).
-            persuasion += 2
-            description = "BONUS (Założono): +2 Perswazji (zamiast 2 Mieczy)."
-
-        # --- C. Obsługa PAY/EXCHANGE (instrukcje manualne) ---
-        elif card_id == "gurney_halleck":
-            description = f"[MANUAL ACTION] {description} (Użyj 'Ręczna Korekta', aby zapłacić 3 Solari i dodać 2 Wojska)."
-        elif card_id == "guild_ambassador":
-            description = f"[MANUAL ACTION] {description} (Użyj 'Ręczna Korekta', aby zapłacić 3 Przyprawy za 1 VP, jeśli masz sojusz)."
-        elif card_id == "opulence":
-            description = f"[MANUAL ACTION] {description} (Użyj 'Ręczna Korekta', aby zapłacić 6 Solari za 1 VP)."
-        
-        # --- D. Inne efekty manualne ---
-        elif "deploy" in description or "retreat" in description:
-            description = f"[MANUAL ACTION] {description} (Pamiętaj, aby dostosować wojsko w konflikcie)."
-        
-        # === KONIEC NOWEJ LOGIKI WARUNKOWEJ ===
+    counters = reveal_counters.get_counters(player_state, cards_db)
+    vector = reveal_counters.counter_vector(counters, all_alliances.get("emperor") == player_name)
+    bonus_copies = counters["hand"]["bonus"]
+    profiles = reveal_counters.card_profiles(cards_db)
 
-        total_persuasion += persuasion
-        base_swords += swords
-        
+    for card_id in player_state.get("hand", []):
+        profile = profiles.get(card_id)
+        if profile is None: continue
+        persuasion, swords, description = reveal_counters.evaluate_card(profile, vector, bonus_copies.get(card_id, 0))
         cards_in_hand_details.append({
             "id": card_id,
-            "name": card_data.get("name", card_id),
+            "name": cards_db[card_id].get("name", card_id),
             "persuasion": persuasion,
             "swords": swords,
-            "description": description # Zaktualizowany opis
+            "description": description
         })
     
     # Usunęliśmy stąd logikę liczenia wojsk (przeniesiona do app.py, Poprawka 5)
@@ -1095,10 +948,9 @@ def process_buy_card(game_state, player_name, card_id, cards_db):
     player_persuasion = player_state.get("reveal_stats", {}).get("total_persuasion", 0)
     
         # === NOWA POPRAWKA: Oblicz perswazję na żywo ===
-    # Użyj funkcji, którą już mamy, aby pobrać Prawdziwą wartość
+    # Sumy z liczników (reveal_counters) - bez przeliczania ręki
     all_alliances = game_state.get("alliances", {}) # Pobierz stan sojuszy
-    live_stats = calculate_reveal_stats(player_state, cards_db, player_name, all_alliances)
-    player_persuasion = live_stats.get("total_persuasion", 0)
+    player_persuasion, _ = reveal_totals(player_state, cards_db, player_name, all_alliances)
     # === KONIEC POPRAWKI ===
     
     if player_persuasion < card_cost:
@@ -1116,6 +968,7 @@ def process_buy_card(game_state, player_name, card_id, cards_db):
     if "discard_pile" not in player_state:
         player_state["discard_pile"] = []
     player_state["discard_pile"].append(card_id)
+    reveal_counters.add_card(player_state, "played", card_id, cards_db)
     
     if "deck_pool" not in player_state:
         player_state["deck_pool"] = []
@@ -1217,13 +1070,17 @@ def process_commit_troops(game_state, player_name, amount_to_commit_str):
     return True, summary
 
 
-def perform_full_game_reset():
-    """Kasuje game_stat.json i zastępuje go zawartością z game_stat.DEFAULT.json."""
+def build_new_game_state(seed=None):
+    """
+    Stan startowy z game_stat.DEFAULT.json z bonusami startowymi liderów.
+    `seed` - ziarno strumienia losowego gry (domyślnie losowe).
+    """
     default_state = load_json_file(GAME_STATE_DEFAULT_FILE)
     if default_state is None:
-        return False, f"Error: Default state file '{GAME_STATE_DEFAULT_FILE}' not found."
+        return None
+    seed_game(default_state, seed)
     
-    leaders_db = load_json_file(LEADERS_DB_FILE)
+    leaders_db = CATALOG.get("leaders")
     if leaders_db and "players" in default_state:
         print("Applying passive leader start bonuses...")
         for player_name, player_data in default_state["players"].items():
@@ -1231,30 +1088,30 @@ def perform_full_game_reset():
             if not leader_id:
                 continue
                 
-            leader_data = leaders_db.get(leader_id, {})
-            passive_ability = leader_data.get("ability_passive", {})
-            
-            # Specjalna obsługa dla "Fief of Arrakis" Rabbana
-            if passive_ability.get("name") == "Fief of Arrakis":
-                start_bonus = passive_ability.get("gain", [])
-                player_resources = player_data.get("resources", {})
-                
-                for item in start_bonus:
-                    resource = item.get("resource")
-                    amount = item.get("amount", 0)
-                    if resource in player_resources:
-                        player_resources[resource] = player_resources.get(resource, 0) + amount
-                        print(f"Applied start bonus to {player_name}: +{amount} {resource}")
-
-    if save_json_file(GAME_STATE_FILE, default_state):
+            # Bonus startowy zdolności lidera (np. "Fief of Arrakis" Rabbana)
+            hooks = leader_hooks(player_data, leaders_db)
+            if hooks.setup_bonus is not None:
+                hooks.setup_bonus(player_name, player_data, hooks.ability)
+    return default_state
+
+
+def perform_full_game_reset(game_id=DEFAULT_GAME_ID):
+    """Zastępuje stan gry zawartością z game_stat.DEFAULT.json."""
+    default_state = build_new_game_state()
+    if default_state is None:
+        return False, f"Error: Default state file '{GAME_STATE_DEFAULT_FILE}' not found."
+
+    if replace_game_state(default_state, {"type": "full_reset"}, game_id):
         return True, "Success! The game has been fully reset to Round 1."
     else:
         return False, "Error: Could not write to game_stat.json."
 
 
-def perform_cleanup_and_new_round(game_state):
+def perform_cleanup_and_new_round(game_state, cards_db=None):
     """Resetuje planszę na kolejną rundę. (Automatyczne dobieranie)"""
     if game_state:
+        if cards_db is None:
+            cards_db = CATALOG.get("cards")
 
         # --- NOWA LOGIKA: Akumulacja Przyprawy ---
         spice_locations = ["the_greate_flat", "hagga_basin", "imperial_basin"]
@@ -1280,6 +1137,9 @@ def perform_cleanup_and_new_round(game_state):
         player_names = sorted(list(game_state.get("players", {}).keys()))
         game_state["currentPlayer"] = player_names[0] 
 
+        # Tasowanie talii z własnego strumienia losowego gry (game_rng)
+        rng = game_random(game_state)
+
         for player_name, player_data in game_state.get("players", {}).items():
             player_data["agents_placed"] = 0
             player_data["has_passed"] = False 
@@ -1289,20 +1149,17 @@ def perform_cleanup_and_new_round(game_state):
                 player_data["resources"]["troops_in_conflict"] = 0
 
 
-            player_data["draw_deck"] = player_data.get("draw_deck", []) + \
-                                     player_data.get("hand", []) + \
-                                     player_data.get("discard_pile", [])
-            player_data["hand"] = []
-            player_data["discard_pile"] = []
-
-            player_data["draw_deck"] = list(player_data.get("deck_pool", []))
+            # Cała talia (deck_pool) wraca do dobierania i jest tasowana;
+            # nowe strefy są tego samego rodzaju co stare (lista lub CardZone)
+            deck_pool = player_data.get("deck_pool", [])
+            shuffled = list(deck_pool)
+            rng.shuffle(shuffled)
 
-            random.shuffle(player_data["draw_deck"])
-
-            for _ in range(5):
-                if len(player_data["draw_deck"]) > 0:
-                    card = player_data["draw_deck"].pop(0)
-                    player_data["hand"].append(card)
+            # Dobierz 5 kart z wierzchu talii
+            player_data["hand"] = new_zone_like(player_data.get("hand", []), shuffled[:5])
+            player_data["discard_pile"] = new_zone_like(player_data.get("discard_pile", []))
+            player_data["draw_deck"] = new_zone_like(deck_pool, shuffled[5:])
+            reveal_counters.rebuild_counters(player_data, cards_db)
 
     return game_state
 
@@ -1332,15 +1189,20 @@ def set_player_hand(game_state, player_name, card_ids_list, cards_db):
             card_name = cards_db.get(card_id, {}).get("name", card_id)
             return False, f"Invalid card: '{card_name}' is not in player {player_name}'s deck pool."
             
-    player_state["hand"] = list(card_ids_list)
+    player_state["hand"] = new_zone_like(player_state.get("hand", []), card_ids_list)
+    reveal_counters.rebuild_counters(player_state, cards_db)
     
     # Logika pomocnicza: ustawia resztę kart jako 'draw_deck' dla jasności
-    draw_deck_list = list(deck_pool) 
-    for card in card_ids_list:
-        if card in draw_deck_list:
-            draw_deck_list.remove(card)
+    # (pula minus karty z ręki, z uwzględnieniem duplikatów)
+    in_hand = Counter(card_ids_list)
+    draw_deck_list = []
+    for card in deck_pool:
+        if in_hand[card] > 0:
+            in_hand[card] -= 1
+        else:
+            draw_deck_list.append(card)
             
-    player_state["draw_deck"] = draw_deck_list    
+    player_state["draw_deck"] = new_zone_like(deck_pool, draw_deck_list)
     # Zmieniona wiadomość sukcesu
     return True, f"Success! Set {len(card_ids_list)} card(s) for {player_name}."
 
@@ -1428,8 +1290,9 @@ def apply_rewards(game_state, player_name, rewards_list):
             elif r_type == "intrigue":
                 if "intrigue_hand" not in player_state:
                     player_state["intrigue_hand"] = []
+                rng = game_random(game_state)
                 for _ in range(r_amount):
-                    player_state["intrigue_hand"].append(f"Intrigue_Card_{random.randint(100,999)}")
+                    player_state["intrigue_hand"].append(f"Intrigue_Card_{rng.randint(100,999)}")
                 summary_parts.append(f"gained {r_amount} Intrigue Card(s)")
                 
         except Exception as e:
@@ -1439,6 +1302,94 @@ def apply_rewards(game_state, player_name, rewards_list):
     return ", ".join(summary_parts)
 
 
+def rank_conflict_results(game_state):
+    """
+    Ustala miejsca w konflikcie na podstawie siły graczy (karty + intrygi +
+    2 za każdą jednostkę w konflikcie). Zwraca (1. miejsce, 2. miejsce,
+    3. miejsce) jako listy graczy - zgodnie z zasadami remisów.
+    """
+    player_stats = []
+    for player_name, player_data in game_state.get("players", {}).items():
+        stats = player_data.get("reveal_stats", {})
+
+        # 1. Siła z kart (z calculate_reveal_stats)
+        base_swords_from_cards = stats.get("base_swords", 0)
+
+        # 2. Siła z intryg (np. Ambush)
+        bonus_swords_from_intrigues = player_data.get("active_effects", {}).get("fight_bonus_swords", 0)
+
+        # 3. (POPRAWKA) Siła z wysłanych wojsk (2 za jednostkę)
+        troops_committed = player_data.get("resources", {}).get("troops_in_conflict", 0)
+        swords_from_troops = troops_committed * 2
+
+        # 4. Finalna siła
+        final_swords = base_swords_from_cards + bonus_swords_from_intrigues + swords_from_troops
+
+        player_stats.append({
+            "name": player_name,
+            "swords": final_swords
+        })
+    
+    # 2. Pogrupuj graczy walczących (siła > 0) według ich wyników
+    contenders = [p for p in player_stats if p['swords'] > 0]
+    if not contenders:
+        return [], [], []
+
+    scores_to_players = {}
+    for p in contenders:
+        score = p['swords']
+        if score not in scores_to_players:
+            scores_to_players[score] = []
+        scores_to_players[score].append(p['name'])
+
+    # 3. Pobierz posortowaną listę unikalnych wyników
+    unique_scores = sorted(scores_to_players.keys(), reverse=True)
+
+    # 4. Zainicjuj listy nagród
+    first_place_list = []
+    second_place_list = []
+    third_place_list = []
+
+    # 5. Przypisz grupy graczy do wyników
+    players_score1 = scores_to_players[unique_scores[0]]
+    players_score2 = scores_to_players[unique_scores[1]] if len(unique_scores) > 1 else []
+    players_score3 = scores_to_players[unique_scores[2]] if len(unique_scores) > 2 else []
+
+    # 6. Zastosuj oficjalne zasady przyznawania nagród
+    if len(players_score1) == 1:
+        # --- Przypadek A: Czysty zwycięzca 1. miejsca ---
+        first_place_list = players_score1
+        
+        if len(players_score2) == 1:
+            # A1: Czysty zwycięzca 2. miejsca
+            second_place_list = players_score2
+            
+            # Sprawdź 3. miejsce
+            if len(players_score3) == 1:
+                # A1a: Czysty zwycięzca 3. miejsca
+                third_place_list = players_score3
+            # else (remis o 3. miejsce): nikt nie dostaje 3. nagrody
+        
+        elif len(players_score2) > 1:
+            # A2: Remis o 2. miejsce
+            # Nikt nie dostaje 2. nagrody. Zremisowani dostają 3. nagrodę.
+            third_place_list = players_score2
+    
+    elif len(players_score1) > 1:
+        # --- Przypadek B: Remis o 1. miejsce ---
+        # Nikt nie dostaje 1. nagrody. Zremisowani dostają 2. nagrodę.
+        second_place_list = players_score1
+        
+        # Sprawdź 3. miejsce
+        # Następna grupa (players_score2) dostaje 3. nagrodę
+        if len(players_score2) == 1:
+            # B1: Czysty "następny" gracz
+            third_place_list = players_score2
+        # else (remis o "następne" miejsce): nikt nie dostaje 3. nagrody
+
+    return first_place_list, second_place_list, third_place_list
+
+
 # --- ZAKTUALIZOWANA FUNKCJA (REQ 4) ---
 def process_conflict_resolve(game_state, first_place_list, second_place_list, third_place_list):
     """Zapisuje wyniki konfliktu i AUTOMATYCZNIE przyznaje nagrody.
@@ -1484,21 +1435,28 @@ def process_conflict_resolve(game_state, first_place_list, second_place_list, th
 
     return True, "Conflict results saved and rewards applied."
 
-def save_json_file_from_text(text_data):
+def save_json_file_from_text(text_data, game_id=DEFAULT_GAME_ID):
     """
-    Paruje tekst na JSON i zapisuje go do GAME_STATE_FILE.
+    Paruje tekst na JSON i zapisuje go jako stan gry `game_id`.
     Zwraca (True, "Success") lub (False, "Error Message").
     """
     try:
         # Krok 1: Spróbuj sparsować tekst, aby sprawdzić, czy jest poprawnym JSONem
         data = json.loads(text_data)
+        # Ręka i stos odrzuconych mogły zostać zmienione ręcznie - liczniki
+        # Odkrycia zostaną przeliczone przy następnym odczycie
+        if isinstance(data, dict):
+            for player_data in data.get("players", {}).values():
+                reveal_counters.invalidate_counters(player_data)
         
-        # Krok 2: Jeśli się udało, użyj istniejącej funkcji do zapisu
-        if save_json_file(GAME_STATE_FILE, data):
+        # Krok 2: Jeśli się udało, zapisz go (tylko jeśli nikt w międzyczasie nie zmienił gry)
+        if save_game_state(data, {"type": "debug_edit"}, game_id):
             return True, "Zapisano pomyślnie."
         else:
             return False, "Wystąpił błąd wejścia/wyjścia (I/O) podczas zapisu pliku."
             
+    except StaleStateError as e:
+        return False, f"Stan gry zmienił się od otwarcia edytora - odśwież stronę. ({e})"
     except json.JSONDecodeError as e:
         # Krok 3: Jeśli parsowanie się nie powiodło, zwróć błąd
         print(f"JSON DECODE ERROR: {e}")
@@ -1670,6 +1628,7 @@ def process_manual_override(game_state, cards_db, player_name, form_data):
     if (player_state.get("deck_pool", []) != new_pool):
         player_state["deck_pool"] = new_pool
         changes_log.append("zaktualizowano Pełną Talię")
+    reveal_counters.rebuild_counters(player_state, cards_db)
     # --- Koniec Walidacji Kart ---
 
     if not changes_log:
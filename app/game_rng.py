@@ -0,0 +1,41 @@
+# app/game_rng.py
+"""
+Deterministyczny strumień losowy każdej gry, zapisany w jej stanie.
+
+Stan gry ma pole "rng": {"seed": liczba, "counter": n}. Każda operacja
+losowa silnika (tasowanie talii w nowej rundzie, placeholdery kart Intryg)
+pobiera generator przez game_random(game_state), który jest wyznaczony przez
+parę (seed, counter) i przesuwa licznik o 1. Ten sam stan i ta sama
+sekwencja akcji dają więc zawsze ten sam wynik - niezależnie od procesu,
+PYTHONHASHSEED i tego, czy stan był po drodze zapisany i wczytany.
+"""
+import random
+
+RNG_KEY = "rng"
+
+
+def new_seed():
+    """Losowe ziarno dla nowej gry (z entropii systemu)."""
+    return random.SystemRandom().randrange(1 << 62)
+
+
+def seed_game(game_state, seed=None):
+    """Ustawia (lub resetuje) strumień losowy gry. Zwraca użyte ziarno."""
+    if seed is None:
+        seed = new_seed()
+    game_state[RNG_KEY] = {"seed": seed, "counter": 0}
+    return seed
+
+
+def game_random(game_state):
+    """
+    Zwraca generator dla następnej operacji losowej gry i przesuwa licznik.
+    Stan bez pola "rng" (stare zapisy) dostaje losowe ziarno przy pierwszym użyciu.
+    """
+    rng_state = game_state.get(RNG_KEY)
+    if rng_state is None:
+        seed_game(game_state)
+        rng_state = game_state[RNG_KEY]
+    counter = rng_state["counter"]
+    rng_state["counter"] = counter + 1
+    return random.Random(f"{rng_state['seed']}:{counter}")
@@ -0,0 +1,150 @@
+# app/leader_hooks.py
+"""
+Zdolności pasywne liderów jako funkcje podpięte do punktów zaczepienia silnika.
+
+Zdolność (po nazwie "ability_passive.name" z leaders.json) rejestruje
+register_ability() z funkcjami dla wybranych punktów zaczepienia:
+    cost_modifier(resource, amount, location_symbol) -> koszt pola po zdolności
+    occupancy_override(location_symbol) -> True, jeśli wolno wejść na zajęte pole
+    gain_modifier(ctx, resource, amount, bonus) -> zysk zasobu po zdolności
+        (bonus=True dla Przyprawy zgromadzonej na polu)
+    post_pay(ctx, resource, amount) -> dopisek do opisu ruchu po zapłaceniu kosztu pola
+    occupy_trigger(ctx) -> dopisek do opisu ruchu po efektach zajętego pola
+    setup_bonus(player_name, player_state, ability) -> bonus na start gry
+Silnik (is_move_valid, legal_moves, process_move, efekty) nie porównuje nazw
+zdolności: pyta leader_hooks() o zestaw punktów lidera gracza i wywołuje te,
+które nie są None. Zestawy są budowane raz na wczytanie katalogu liderów,
+więc w gorącej ścieżce to jeden odczyt ze słownika. Nowy lider z
+istniejącą zdolnością to tylko wpis w leaders.json, nowa zdolność - wywołanie
+register_ability() w tym pliku.
+"""
+from effects import DRAW_ONE_CARD, compile_actions, run_plan
+
+HOOK_POINTS = ("cost_modifier", "occupancy_override", "gain_modifier", "post_pay", "occupy_trigger", "setup_bonus")
+
+_ABILITIES = {}   # nazwa zdolności pasywnej -> {punkt zaczepienia: funkcja}
+
+
+class LeaderHooks:
+    """Punkty zaczepienia zdolności pasywnej jednego lidera (None - brak)."""
+    __slots__ = ("leader_id", "ability_name", "ability") + HOOK_POINTS
+
+    def __init__(self, leader_id=None, ability=None, hooks=None):
+        self.leader_id = leader_id
+        self.ability = ability or {}
+        self.ability_name = self.ability.get("name", "")
+        hooks = hooks or {}
+        for point in HOOK_POINTS:
+            setattr(self, point, hooks.get(point))
+
+
+NO_HOOKS = LeaderHooks()
+
+
+def register_ability(name, **hooks):
+    """Podpina funkcje zdolności pasywnej `name` pod punkty zaczepienia."""
+    unknown = set(hooks) - set(HOOK_POINTS)
+    if unknown:
+        raise ValueError(f"Unknown leader hook point(s): {', '.join(sorted(unknown))}")
+    _ABILITIES[name] = hooks
+
+
+def _build_leader_hooks(leaders_db):
+    table = {}
+    for leader_id, leader_data in leaders_db.items():
+        ability = leader_data.get("ability_passive", {})
+        table[leader_id] = LeaderHooks(leader_id, ability, _ABILITIES.get(ability.get("name")))
+    return table
+
+
+# (katalog liderów, {lider: LeaderHooks}) - jak compiled(), ale bez jego narzutu,
+# bo leader_hooks() jest wołane przy każdym ruchu i każdej walidacji
+_hooks_table = (None, {})
+
+
+def leader_hooks(player_state, leaders_db):
+    """Punkty zaczepienia lidera gracza (NO_HOOKS, jeśli lider nie ma obsłużonej zdolności)."""
+    global _hooks_table
+    source, table = _hooks_table
+    if source is not leaders_db:
+        if not leaders_db:
+            return NO_HOOKS
+        table = _build_leader_hooks(leaders_db)
+        _hooks_table = (leaders_db, table)
+    return table.get(player_state.get("leader"), NO_HOOKS)
+
+
+# --- Zdolności ---------------------------------------------------------------
+
+# Helena: agent może wejść na zajęte pole "populated areas" i "Landsraad"
+_KNOWS_EVERYTHING_SYMBOLS = ("populated areas", "Landsraad")
+
+register_ability(
+    "Knows Everything",
+    occupancy_override=lambda location_symbol: location_symbol in _KNOWS_EVERYTHING_SYMBOLS,
+)
+
+
+# Leto: pole Landsraad kosztuje o 1 Solari mniej
+def _landsraad_discount(resource, amount, location_symbol):
+    if resource == "solari" and location_symbol == "Landsraad":
+        return max(0, amount - 1)
+    return amount
+
+
+register_ability("Popularity in Landsraad", cost_modifier=_landsraad_discount)
+
+
+# Ilban: zapłata Solari za pole daje kartę z talii
+def _ruthless_negotiator(ctx, resource, amount):
+    if resource != "solari" or amount <= 0:
+        return ""
+    DRAW_ONE_CARD.apply(ctx)
+    return f" | Ilban's Ability: {', '.join(ctx.log)}"
+
+
+register_ability("Ruthless Negotiator", post_pay=_ruthless_negotiator)
+
+
+# Earl: zajęcie High Council daje 1 kartę Intrygi
+_CONNECTIONS_PLAN = compile_actions([{"gain": {"type": "resource", "resource": "intrigue", "amount": 1}}])
+
+
+def _connections(ctx):
+    if ctx.location_id != "high_council":
+        return ""
+    run_plan(_CONNECTIONS_PLAN, ctx)
+    return f" | Earl's Ability: {', '.join(ctx.log)}" if ctx.log else ""
+
+
+register_ability("Connections", occupy_trigger=_connections)
+
+
+# Ariana: o 1 Przyprawę mniej, ale dociągasz kartę
+def _spice_addiction(ctx, resource, amount, bonus):
+    if resource != "Spice" or amount <= 0:
+        return amount
+    reduced = max(0, amount - 1)
+    if bonus:
+        ctx.log.append(f"Zdolność Ariany: Zmieniono {amount} bonusowej Spice na {reduced}.")
+    else:
+        ctx.log.append(f"Zdolność Ariany: Zmieniono {amount} Spice na {reduced} Spice.")
+    DRAW_ONE_CARD.apply(ctx)
+    return reduced
+
+
+register_ability("Spice Addiction", gain_modifier=_spice_addiction)
+
+
+# Rabban: dodatkowe zasoby na start ("gain" zdolności w leaders.json)
+def _fief_of_arrakis(player_name, player_state, ability):
+    player_resources = player_state.get("resources", {})
+    for item in ability.get("gain", []):
+        resource = item.get("resource")
+        amount = item.get("amount", 0)
+        if resource in player_resources:
+            player_resources[resource] = player_resources.get(resource, 0) + amount
+            print(f"Applied start bonus to {player_name}: +{amount} {resource}")
+
+
+register_ability("Fief of Arrakis", setup_bonus=_fief_of_arrakis)
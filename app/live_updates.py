@@ -0,0 +1,187 @@
+# app/live_updates.py
+"""
+Rozgłaszanie zmian stanu gry do otwartych stron stołu (Server-Sent Events).
+
+Dla każdego stołu (game_id) pamiętana jest kopia ostatnio rozesłanego
+wycinka strony (page_state - baza) i lista subskrybentów (połączeń /events).
+Po każdym udanym zapisie publish() liczy JEDEN diff bazy z wycinkiem nowego
+stanu (state_diff) - ręce, stosy i plansza nie trafiają do łatki, bo strony
+dostają je w widokach pochodnych. Raz też wylicza zarejestrowane widoki
+pochodne (np. legalne ruchy graczy) i raz serializuje ramkę SSE, którą
+dostaje każdy subskrybent. Koszt ruchu nie zależy więc od
+liczby otwartych stron, a bez subskrybentów publish() nic nie liczy.
+
+Ramka zdarzenia "patch" (id = wersja stanu):
+    {"base": poprzednia wersja, "version": wersja, "patch": łatka, "views": {...}}
+Klient stosuje łatkę tylko na stanie w wersji "base"; inaczej (zgubione
+zdarzenia, restart serwera, zmiana stanu z innego procesu) dostaje zdarzenie
+"reload" i przeładowuje stronę. Stan jest w procesie serwera - przy kilku
+procesach każdy rozgłasza tylko własne zapisy.
+"""
+import json
+import os
+import queue
+import threading
+
+from state_diff import apply_patch, clone, diff
+
+# Co ile sekund strumień wysyła komentarz podtrzymujący połączenie
+HEARTBEAT_SECONDS = float(os.environ.get('DUNE_EVENTS_HEARTBEAT', '15') or 15)
+# Ile ramek może czekać na wolnego klienta, zanim zostanie odłączony (reload)
+SUBSCRIBER_QUEUE_SIZE = 64
+
+# Część stanu, którą strony trzymają u siebie i poprawiają łatkami (nagłówek,
+# historia rundy); resztę strony opisują widoki pochodne
+PAGE_STATE_KEYS = ("version", "round", "current_phase", "currentPlayer", "current_conflict_card", "round_history")
+
+RELOAD_FRAME = "event: reload\ndata: {}\n\n"
+HEARTBEAT_FRAME = ": ping\n\n"
+
+
+def _version(state):
+    return state.get("version", 0) if state else 0
+
+
+def page_state(game_state):
+    """Wycinek stanu osadzany w stronie jako baza łatek po stronie przeglądarki."""
+    return {key: game_state.get(key) for key in PAGE_STATE_KEYS}
+
+
+def patch_frame(base_version, state, patch, views):
+    """Ramka SSE z łatką stanu (serializowana raz dla wszystkich subskrybentów)."""
+    version = _version(state)
+    data = json.dumps({"base": base_version, "version": version, "patch": patch, "views": views},
+                      ensure_ascii=False, separators=(',', ':'), default=list)
+    return f"id: {version}\nevent: patch\ndata: {data}\n\n"
+
+
+class Subscription:
+    """Jedno połączenie /events: kolejka ramek do wysłania."""
+    __slots__ = ("game_id", "version", "queue", "closed")
+
+    def __init__(self, game_id, version):
+        self.game_id = game_id
+        self.version = version      # wersja bazy w chwili subskrypcji
+        self.queue = queue.Queue(SUBSCRIBER_QUEUE_SIZE)
+        self.closed = False
+
+    def next_frame(self, timeout=HEARTBEAT_SECONDS):
+        """Następna ramka albo None, jeśli przez `timeout` sekund nic nie przyszło."""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        """Odłącza subskrybenta: ostatnią ramką jest "reload"."""
+        self.closed = True
+        while True:
+            try:
+                self.queue.put_nowait(RELOAD_FRAME)
+                return
+            except queue.Full:
+                # Zaległe łatki i tak nie są już potrzebne - strona się przeładuje
+                try:
+                    self.queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+
+class _Feed:
+    __slots__ = ("state", "subscribers")
+
+    def __init__(self):
+        self.state = None           # kopia ostatnio rozesłanego page_state (baza łatek)
+        self.subscribers = []
+
+
+class LiveUpdates:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._feeds = {}            # game_id -> _Feed
+        self._views = {}            # nazwa -> fn(game_state) -> dane JSON albo None
+        self.published = 0
+        self.frames_sent = 0
+
+    def register_view(self, name, fn):
+        """
+        Rejestruje widok pochodny wysyłany razem z łatką (np. legalne ruchy).
+        `fn(game_state)` jest wołane raz na zapis, tylko gdy ktoś słucha;
+        wynik None pomija widok.
+        """
+        self._views[name] = fn
+
+    def subscribe(self, game_id, game_state):
+        """
+        Dodaje subskrybenta stołu. `game_state` to świeżo wczytany stan - jeśli
+        baza jest w innej wersji (np. zapis z innego procesu), staje się nową
+        bazą, a dotychczasowi subskrybenci dostają "reload".
+        """
+        with self._lock:
+            feed = self._feeds.setdefault(game_id, _Feed())
+            if feed.state is None or _version(feed.state) != _version(game_state):
+                for subscription in feed.subscribers:
+                    subscription.close()
+                feed.subscribers = []
+                feed.state = clone(page_state(game_state))
+            subscription = Subscription(game_id, _version(feed.state))
+            feed.subscribers.append(subscription)
+            return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            feed = self._feeds.get(subscription.game_id)
+            if feed is None:
+                return
+            if subscription in feed.subscribers:
+                feed.subscribers.remove(subscription)
+            if not feed.subscribers:
+                # Nikt nie słucha - baza byłaby tylko nieaktualną kopią stanu
+                del self._feeds[subscription.game_id]
+
+    def subscriber_count(self, game_id):
+        with self._lock:
+            feed = self._feeds.get(game_id)
+            return len(feed.subscribers) if feed is not None else 0
+
+    def publish(self, game_id, game_state):
+        """
+        Rozsyła zmianę stanu `game_id` po udanym zapisie. Zwraca liczbę
+        subskrybentów, którzy dostali ramkę.
+        """
+        with self._lock:
+            feed = self._feeds.get(game_id)
+            if feed is None or not feed.subscribers:
+                return 0
+            base_version = _version(feed.state)
+            if _version(game_state) <= base_version:
+                # Spóźniony zapis starszej wersji (inny wątek już ją rozesłał)
+                return 0
+            patch = diff(feed.state, page_state(game_state))
+            apply_patch(feed.state, patch)
+            views = {}
+            for name, fn in self._views.items():
+                try:
+                    value = fn(game_state)
+                except Exception as e:
+                    print(f"Error: live view '{name}' failed for game {game_id}: {e}")
+                    continue
+                if value is not None:
+                    views[name] = value
+            frame = patch_frame(base_version, game_state, patch, views)
+
+            delivered = []
+            for subscription in feed.subscribers:
+                try:
+                    subscription.queue.put_nowait(frame)
+                    delivered.append(subscription)
+                except queue.Full:
+                    # Klient nie nadąża - odłącz, po ponownym połączeniu przeładuje stronę
+                    subscription.close()
+            feed.subscribers = delivered
+            self.published += 1
+            self.frames_sent += len(delivered)
+            return len(delivered)
+
+
+LIVE = LiveUpdates()
@@ -0,0 +1,221 @@
+# app/metrics.py
+"""
+Pomiar czasu obsługi żądań: czas całkowity na trasę, rozbity na wczytanie
+stanu (load), wywołania silnika (engine), renderowanie szablonu (render)
+i zapis stanu (save). Reszta (routing Flaska, logika trasy) to "other".
+
+Dla każdej pary (trasa, faza) trzymane jest okno ostatnich WINDOW_SIZE
+pomiarów, z którego liczone są kwantyle p50/p95/p99, oraz skumulowane
+sumy i liczniki. export_prometheus() zwraca je w formacie tekstowym
+Prometheusa (typ summary).
+
+Opcjonalny profiler próbkujący: ułamek żądań (DUNE_PROFILE_SAMPLE, np. 0.05)
+jest wykonywany pod cProfile, a statystyki są sumowane w jeden obiekt
+pstats. profile_report() zwraca je jako tekst, dump_profile() zapisuje do
+pliku .prof (czytelnego dla pstats/snakeviz); jeśli ustawiono
+DUNE_PROFILE_DUMP, zrzut następuje też przy zamknięciu procesu.
+"""
+import atexit
+import cProfile
+import functools
+import io
+import os
+import pstats
+import random
+import threading
+import time
+from collections import deque
+
+PHASES = ("load", "engine", "render", "save")
+WINDOW_SIZE = 1024
+QUANTILES = (0.5, 0.95, 0.99)
+
+PROFILE_SAMPLE = float(os.environ.get('DUNE_PROFILE_SAMPLE', '0') or 0)
+PROFILE_DUMP_FILE = os.environ.get('DUNE_PROFILE_DUMP')
+
+_lock = threading.Lock()
+_local = threading.local()
+_series = {}          # (trasa, faza) -> _Series
+_requests = {}        # (trasa, metoda, status) -> liczba żądań
+
+_profile_lock = threading.Lock()
+_profile_stats = None
+_profiled_requests = 0
+
+
+class _Series:
+    __slots__ = ("window", "total", "count")
+
+    def __init__(self):
+        self.window = deque(maxlen=WINDOW_SIZE)
+        self.total = 0.0
+        self.count = 0
+
+    def add(self, seconds):
+        self.window.append(seconds)
+        self.total += seconds
+        self.count += 1
+
+
+class _RequestTimer:
+    __slots__ = ("start", "phases", "depth", "profiler")
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.depth = 0
+        self.profiler = None
+
+
+def timed(phase, fn):
+    """
+    Opakowuje funkcję tak, by jej czas był doliczany do fazy `phase`
+    bieżącego żądania. Liczy się tylko najbardziej zewnętrzne wywołanie
+    (np. silnik wywołujący inny silnik), a poza żądaniem wrapper nic nie mierzy.
+    """
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        timer = getattr(_local, "timer", None)
+        if timer is None or timer.depth:
+            return fn(*args, **kwargs)
+        timer.depth += 1
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            timer.phases[phase] += time.perf_counter() - start
+            timer.depth -= 1
+    return wrapper
+
+
+def start_request():
+    timer = _RequestTimer()
+    if PROFILE_SAMPLE > 0 and random.random() < PROFILE_SAMPLE:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+            timer.profiler = profiler
+        except ValueError:
+            # Inny wątek już profiluje (Python 3.12+ pozwala na jeden profiler naraz)
+            pass
+    _local.timer = timer
+
+
+def finish_request(route, method, status):
+    """Zamyka pomiar bieżącego żądania i dopisuje go do statystyk."""
+    timer = getattr(_local, "timer", None)
+    if timer is None:
+        return
+    _local.timer = None
+    total = time.perf_counter() - timer.start
+    if timer.profiler is not None:
+        timer.profiler.disable()
+        _add_profile(timer.profiler)
+
+    measured = dict(timer.phases)
+    measured["other"] = max(0.0, total - sum(timer.phases.values()))
+    measured["total"] = total
+    with _lock:
+        for phase, seconds in measured.items():
+            series = _series.get((route, phase))
+            if series is None:
+                series = _series[(route, phase)] = _Series()
+            series.add(seconds)
+        key = (route, method, status)
+        _requests[key] = _requests.get(key, 0) + 1
+
+
+def _quantile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def snapshot():
+    """{trasa: {faza: {p50, p95, p99, count, sum}}} - do podglądu i testów."""
+    with _lock:
+        items = [(key, sorted(series.window), series.count, series.total) for key, series in _series.items()]
+    result = {}
+    for (route, phase), window, count, total in items:
+        entry = {f"p{int(q * 100)}": _quantile(window, q) for q in QUANTILES}
+        entry.update(count=count, sum=total)
+        result.setdefault(route, {})[phase] = entry
+    return result
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def export_prometheus():
+    """Statystyki w formacie tekstowym Prometheusa (text/plain; version=0.0.4)."""
+    lines = [
+        "# HELP dune_request_duration_seconds Request wall time per route and phase (rolling window quantiles).",
+        "# TYPE dune_request_duration_seconds summary",
+    ]
+    for route, phases in sorted(snapshot().items()):
+        for phase, entry in sorted(phases.items()):
+            labels = f'route="{_label(route)}",phase="{phase}"'
+            for q in QUANTILES:
+                lines.append(f'dune_request_duration_seconds{{{labels},quantile="{q}"}} {entry[f"p{int(q * 100)}"]:.6f}')
+            lines.append(f'dune_request_duration_seconds_sum{{{labels}}} {entry["sum"]:.6f}')
+            lines.append(f'dune_request_duration_seconds_count{{{labels}}} {entry["count"]}')
+
+    lines.append("# HELP dune_requests_total Requests per route, method and status code.")
+    lines.append("# TYPE dune_requests_total counter")
+    with _lock:
+        requests = sorted(_requests.items())
+    for (route, method, status), count in requests:
+        lines.append(f'dune_requests_total{{route="{_label(route)}",method="{method}",status="{status}"}} {count}')
+
+    lines.append("# HELP dune_profiled_requests_total Requests sampled by the cProfile profiler.")
+    lines.append("# TYPE dune_profiled_requests_total counter")
+    lines.append(f"dune_profiled_requests_total {_profiled_requests}")
+    return "\n".join(lines) + "\n"
+
+
+# --- Profiler próbkujący ---
+
+def _add_profile(profiler):
+    global _profile_stats, _profiled_requests
+    with _profile_lock:
+        if _profile_stats is None:
+            _profile_stats = pstats.Stats(profiler)
+        else:
+            _profile_stats.add(profiler)
+        _profiled_requests += 1
+
+
+def profile_report(sort_by="cumulative", limit=50):
+    """Zsumowane statystyki profilera jako tekst (None, jeśli nic nie sprofilowano)."""
+    with _profile_lock:
+        if _profile_stats is None:
+            return None
+        stream = io.StringIO()
+        _profile_stats.stream = stream
+        _profile_stats.sort_stats(sort_by).print_stats(limit)
+    return f"{_profiled_requests} profiled requests\n" + stream.getvalue()
+
+
+def dump_profile(path):
+    """Zapisuje zsumowane statystyki do pliku .prof. Zwraca False, jeśli nie ma czego zapisać."""
+    with _profile_lock:
+        if _profile_stats is None:
+            return False
+        _profile_stats.dump_stats(path)
+    return True
+
+
+def reset():
+    global _profile_stats, _profiled_requests
+    with _lock:
+        _series.clear()
+        _requests.clear()
+    with _profile_lock:
+        _profile_stats = None
+        _profiled_requests = 0
+
+
+if PROFILE_DUMP_FILE:
+    atexit.register(dump_profile, PROFILE_DUMP_FILE)
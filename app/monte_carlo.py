@@ -0,0 +1,180 @@
+# app/monte_carlo.py
+"""
+Lokalny doradca ruchów (Monte Carlo) dla gracza AI - alternatywa dla promptu LLM.
+
+Dla każdego legalnego ruchu agenta (legal_moves) rozgrywa losowe lub
+zachłanne dogrywki (simulator.play_game) od bieżącego stanu i ocenia ruch
+średnim wynikiem: przewaga VP nad najlepszym przeciwnikiem na końcu
+dogrywki + premia za wygraną. Dogrywki są rozdzielane na procesy
+(ProcessPoolExecutor), a całość mieści się w zadanym budżecie czasu.
+
+Ukryte informacje: ręce przeciwników, którzy jeszcze grają w tej rundzie,
+a nie mają kart na ręce (ludzie grają z pełnej talii), są losowane z ich
+talii przy każdej dogrywce.
+"""
+import atexit
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import game_manager
+from game_manager import legal_moves, process_move, check_and_advance_phase
+import reveal_counters
+from card_zones import compact_state, new_zone_like
+from simulator import POLICIES, play_game
+from state_diff import clone
+from game_rng import seed_game
+
+DEFAULT_TIME_BUDGET = 2.0
+DEFAULT_HORIZON_ROUNDS = 3
+WIN_BONUS = 5.0
+
+_executor = None
+_executor_workers = 0
+
+
+def _get_executor(workers):
+    global _executor, _executor_workers
+    if _executor is None or _executor_workers != workers:
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+        # "spawn": serwer Flask jest wielowątkowy, a fork procesu z wątkami jest niebezpieczny
+        _executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        _executor_workers = workers
+    return _executor
+
+
+def _shutdown_executor():
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+
+
+atexit.register(_shutdown_executor)
+
+
+def _determinize(game_state, player_name, rng):
+    """Losuje ręce przeciwników, którzy mogą jeszcze grać, a nie mają kart."""
+    for name, player_state in game_state["players"].items():
+        if name == player_name or player_state.get("hand"):
+            continue
+        if player_state.get("has_passed") or player_state.get("agents_placed", 0) >= player_state.get("agents_total", 2):
+            continue
+        pool = list(player_state.get("deck_pool", []))
+        for card_id in player_state.get("discard_pile", []):
+            if card_id in pool:
+                pool.remove(card_id)
+        rng.shuffle(pool)
+        player_state["hand"] = new_zone_like(player_state.get("deck_pool", []), pool[:5])
+        reveal_counters.invalidate_counters(player_state)
+
+
+def _score(game_state, player_name):
+    players = game_state["players"]
+    own_vp = players[player_name].get("victory_points", 0)
+    best_other = max((p.get("victory_points", 0) for name, p in players.items() if name != player_name), default=0)
+    return own_vp - best_other + (WIN_BONUS if own_vp > best_other else 0.0)
+
+
+def _playout_worker(game_state, player_name, candidates, seed, deadline, policy_name, horizon_rounds):
+    """
+    Proces roboczy: rozgrywa dogrywki dla kolejnych kandydatów (po kolei, w
+    kółko) do upływu `deadline`. Zwraca ([(liczba, suma wyników, wygrane)], czas).
+    """
+    start = time.perf_counter()
+    rng = random.Random(seed)
+    locations_db, cards_db, _, conflicts_db, leaders_db = game_manager.load_catalogs()
+    dbs = (locations_db, cards_db, leaders_db)
+    # Strefy kart jako CardZone - kopia stanu na dogrywkę nie przechodzi po kartach
+    compact_state(game_state, cards_db)
+    policy = POLICIES[policy_name]()
+    policies = {name: policy for name in game_state["players"]}
+    max_rounds = game_state.get("round", 1) + horizon_rounds
+    market_size = len(game_state.get("imperium_row", []))
+
+    totals = [[0, 0.0, 0] for _ in candidates]
+    i = 0
+    while True:
+        card_id, location_id = candidates[i % len(candidates)]
+        trial = clone(game_state)
+        # Każda dogrywka ma własny strumień losowy gry (inne tasowania talii)
+        seed_game(trial, rng.randrange(1 << 62))
+        _determinize(trial, player_name, rng)
+        process_move(trial, locations_db, cards_db, leaders_db, player_name, card_id, location_id,
+                     **policy.move_kwargs(trial, player_name, (card_id, location_id), rng))
+        check_and_advance_phase(trial, cards_db)
+        play_game(trial, policies, rng, dbs, conflicts_db, max_rounds=max_rounds, market_size=market_size)
+        score = _score(trial, player_name)
+        entry = totals[i % len(candidates)]
+        entry[0] += 1
+        entry[1] += score
+        entry[2] += 1 if score > 0 else 0
+        i += 1
+        # Każdy kandydat dostaje co najmniej jedną dogrywkę
+        if i >= len(candidates) and time.time() >= deadline:
+            break
+    return totals, time.perf_counter() - start
+
+
+def recommend_moves(game_state, player_name, time_budget=DEFAULT_TIME_BUDGET, workers=None,
+                    policy_name="random", horizon_rounds=DEFAULT_HORIZON_ROUNDS, seed=None):
+    """
+    Zwraca (ranking, raport). Ranking to lista słowników
+    {card, location, playouts, score, win_rate} posortowana malejąco po score.
+    Raport zawiera liczbę dogrywek, czas i dogrywki/s na rdzeń.
+    """
+    candidates = legal_moves(game_state, player_name)
+    report = {"candidates": len(candidates), "playouts": 0, "seconds": 0.0, "workers": 0,
+              "playouts_per_sec": 0.0, "playouts_per_sec_per_core": 0.0}
+    if not candidates:
+        return [], report
+
+    workers = max(1, workers or os.cpu_count() or 1)
+    if seed is None:
+        seed = random.randrange(1 << 30)
+    state = clone(game_state)
+
+    start = time.perf_counter()
+    # Budżet obejmuje uruchomienie procesów i zebranie wyników - dogrywki kończą się nieco wcześniej
+    deadline = time.time() + time_budget * 0.9
+    if workers == 1:
+        results = [_playout_worker(state, player_name, candidates, seed, deadline, policy_name, horizon_rounds)]
+    else:
+        executor = _get_executor(workers)
+        futures = [
+            executor.submit(_playout_worker, state, player_name, candidates, seed + i, deadline, policy_name, horizon_rounds)
+            for i in range(workers)
+        ]
+        results = [future.result() for future in futures]
+    elapsed = time.perf_counter() - start
+
+    merged = [[0, 0.0, 0] for _ in candidates]
+    worker_seconds = 0.0
+    for totals, seconds in results:
+        worker_seconds += seconds
+        for entry, (count, score_sum, wins) in zip(merged, totals):
+            entry[0] += count
+            entry[1] += score_sum
+            entry[2] += wins
+
+    ranking = []
+    for (card_id, location_id), (count, score_sum, wins) in zip(candidates, merged):
+        ranking.append({
+            "card": card_id,
+            "location": location_id,
+            "playouts": count,
+            "score": score_sum / count if count else 0.0,
+            "win_rate": wins / count if count else 0.0,
+        })
+    ranking.sort(key=lambda item: (-item["score"], -item["win_rate"], item["card"], item["location"]))
+
+    playouts = sum(entry[0] for entry in merged)
+    report.update(
+        playouts=playouts,
+        seconds=elapsed,
+        workers=workers,
+        playouts_per_sec=playouts / elapsed if elapsed else 0.0,
+        playouts_per_sec_per_core=playouts / worker_seconds if worker_seconds else 0.0,
+    )
+    return ranking, report
@@ -0,0 +1,137 @@
+# app/move_preview.py
+"""
+Podgląd skutków każdego legalnego ruchu agenta gracza ("co by było, gdyby").
+
+Każda para (karta, lokacja) z legal_moves jest wykonywana przez process_move
+na forku stanu (state_fork.fork) - stan stołu pozostaje nietknięty. Ruch
+wymagający decyzji (get_agent_move_requirements) jest pokazywany osobno dla
+każdej opcji: choice_index 0..n-1 albo pay_cost tak/nie. Wiersz podglądu:
+    {"card", "card_name", "location", "location_name", "option", "kwargs",
+     "resources": {zasób: zmiana}, "influence": {frakcja: zmiana},
+     "victory_points": zmiana, "intrigues": zmiana liczby intryg,
+     "alliances": {frakcja: [stary, nowy]}, "opponents_vp": {gracz: zmiana},
+     "summary": opis ruchu z historii rundy}
+Słowniki zmian zawierają tylko niezerowe pozycje.
+
+Podglądy są pamiętane według wersji stanu (PreviewCache) - kolejne otwarcia
+podglądu tego samego stanu nic nie liczą. Liczenie jest sekwencyjne: fork i
+ruch to kilkadziesiąt mikrosekund, więc pełna ręka kosztuje kilka ms, a wątki
+nie przyspieszyłyby kodu Pythona (GIL), procesy zaś kosztują więcej niż ruchy.
+"""
+import threading
+
+from game_manager import legal_moves, process_move, get_agent_move_requirements
+from state_fork import fork
+
+
+def _changes(before, after):
+    """{klucz: zmiana} dla liczbowych pól, które się zmieniły."""
+    changes = {}
+    for key in set(before) | set(after):
+        delta = after.get(key, 0) - before.get(key, 0)
+        if delta:
+            changes[key] = delta
+    return changes
+
+
+def move_options(card_id, location_id, player_state, dbs):
+    """[(etykieta opcji, kwargs), ...] - jedna pozycja dla ruchu bez decyzji."""
+    locations_db, cards_db, _, leaders_db = dbs
+    requirements = get_agent_move_requirements(card_id, location_id, player_state, cards_db, locations_db, leaders_db)
+    if requirements["type"] == "choice":
+        return [(f"option {index + 1}", {"choice_index": index}) for index in range(len(requirements["data"]))]
+    if requirements["type"] in ("exchange", "conditional_pay"):
+        return [("pay", {"pay_cost": True}), ("skip", {"pay_cost": False})]
+    return [("", {})]
+
+
+def preview_move(game_state, dbs, player_name, card_id, location_id, **kwargs):
+    """Skutki jednego ruchu (wiersz podglądu bez nazw kart i lokacji)."""
+    locations_db, cards_db, _, leaders_db = dbs
+    scratch = fork(game_state)
+    process_move(scratch, locations_db, cards_db, leaders_db, player_name, card_id, location_id, **kwargs)
+
+    before = game_state["players"][player_name]
+    after = scratch["players"][player_name]
+    old_alliances = game_state.get("alliances") or {}
+    new_alliances = scratch.get("alliances") or {}
+    history = scratch.get("round_history") or [{}]
+    opponents_vp = {}
+    for name, opponent_state in game_state["players"].items():
+        if name != player_name:
+            delta = scratch["players"][name].get("victory_points", 0) - opponent_state.get("victory_points", 0)
+            if delta:
+                opponents_vp[name] = delta
+    return {
+        "card": card_id,
+        "location": location_id,
+        "kwargs": kwargs,
+        "resources": _changes(before.get("resources", {}), after.get("resources", {})),
+        "influence": _changes(before.get("influence", {}), after.get("influence", {})),
+        "victory_points": after.get("victory_points", 0) - before.get("victory_points", 0),
+        "intrigues": len(after.get("intrigue_hand", [])) - len(before.get("intrigue_hand", [])),
+        "alliances": {
+            faction: [old_alliances.get(faction), new_alliances.get(faction)]
+            for faction in set(old_alliances) | set(new_alliances)
+            if old_alliances.get(faction) != new_alliances.get(faction)
+        },
+        "opponents_vp": opponents_vp,
+        "summary": history[-1].get("summary", ""),
+    }
+
+
+def preview_moves(game_state, player_name, dbs):
+    """
+    Wiersze podglądu dla wszystkich legalnych ruchów gracza `player_name`.
+    `dbs` to (locations_db, cards_db, intrigues_db, leaders_db).
+    """
+    locations_db, cards_db, _, leaders_db = dbs
+    player_state = game_state.get("players", {}).get(player_name)
+    if not player_state:
+        return []
+    rows = []
+    for card_id, location_id in legal_moves(game_state, player_name, locations_db, cards_db, leaders_db):
+        card_data = cards_db.get(card_id, {})
+        location_data = locations_db.get(location_id, {})
+        for option, kwargs in move_options(card_id, location_id, player_state, dbs):
+            row = preview_move(game_state, dbs, player_name, card_id, location_id, **kwargs)
+            row["card_name"] = card_data.get("name", card_id)
+            row["location_name"] = location_data.get("name", location_id)
+            row["option"] = option
+            rows.append(row)
+    return rows
+
+
+class PreviewCache:
+    """Podglądy ruchów według (stół, gracz), ważne dla jednej wersji stanu."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._previews = {}       # game_id -> (wersja, dbs, {gracz: wiersze})
+        self.hits = 0
+        self.misses = 0
+
+    def preview(self, game_id, game_state, player_name, dbs):
+        """Zwraca (wiersze podglądu, czy_z_pamięci) dla bieżącego stanu gry `game_id`."""
+        version = game_state.get("version", 0)
+        with self._lock:
+            cached = self._previews.get(game_id)
+            if cached is None or cached[0] != version or any(a is not b for a, b in zip(cached[1], dbs)):
+                cached = self._previews[game_id] = (version, dbs, {})
+            rows = cached[2].get(player_name)
+            if rows is not None:
+                self.hits += 1
+                return rows, True
+            self.misses += 1
+
+        rows = preview_moves(game_state, player_name, dbs)
+        with self._lock:
+            cached[2][player_name] = rows
+        return rows, False
+
+    def forget(self, game_id):
+        with self._lock:
+            self._previews.pop(game_id, None)
+
+
+PREVIEWS = PreviewCache()
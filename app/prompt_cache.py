@@ -0,0 +1,78 @@
+# app/prompt_cache.py
+"""
+Pamięć promptów wydanych graczowi AI, kluczowana wersją stanu gry.
+
+Dla każdego stołu (game_id) pamiętana jest migawka ostatniego wydanego
+promptu (compact_prompt.prompt_snapshot) i teksty wygenerowane dla tej
+wersji stanu. Kolejne żądanie:
+    - dla tej samej wersji stanu - zwraca gotowy tekst (bez generowania),
+    - dla nowszej wersji - w formacie "delta" wypisuje tylko zmiany od
+      poprzedniego promptu, a jego migawka staje się bazą następnej delty.
+Formaty "full" i "compact" to zawsze pełne prompty (też zapamiętywane).
+Pamięć jest w procesie - po restarcie serwera pierwsza delta to pełny prompt.
+"""
+import threading
+
+from build_ai_prompt import generate_ai_prompt
+from compact_prompt import generate_compact_ai_prompt, generate_delta_prompt, prompt_snapshot
+
+PROMPT_FORMATS = ("full", "compact", "delta")
+
+
+class _IssuedPrompt:
+    """Migawka promptu wydanego dla jednej wersji stanu i jego warianty tekstu."""
+    __slots__ = ("version", "snapshot", "base", "cards_db", "texts")
+
+    def __init__(self, version, snapshot, base, cards_db):
+        self.version = version
+        self.snapshot = snapshot
+        self.base = base          # migawka poprzedniego promptu (baza delty) albo None
+        self.cards_db = cards_db
+        self.texts = {}           # (format, budżet) -> (tekst, odrzucone sekcje, czy_delta)
+
+
+class PromptCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._issued = {}         # game_id -> _IssuedPrompt
+        self.hits = 0
+        self.misses = 0
+
+    def issue(self, game_id, game_state, cards_db, intrigues_db=None, prompt_format="full", token_budget=None):
+        """
+        Zwraca (tekst, odrzucone sekcje, czy_delta, czy_z_pamięci) promptu dla
+        bieżącego stanu gry `game_id` i zapamiętuje go jako ostatnio wydany.
+        """
+        if prompt_format not in PROMPT_FORMATS:
+            raise ValueError(f"Unknown prompt format '{prompt_format}'.")
+        version = game_state.get("version", 0)
+        key = (prompt_format, token_budget)
+        with self._lock:
+            issued = self._issued.get(game_id)
+            if issued is not None and issued.version == version and issued.cards_db is cards_db:
+                cached = issued.texts.get(key)
+                if cached is not None:
+                    self.hits += 1
+                    return cached + (True,)
+            else:
+                base = issued.snapshot if issued is not None else None
+                issued = self._issued[game_id] = _IssuedPrompt(version, prompt_snapshot(game_state), base, cards_db)
+            self.misses += 1
+
+        if prompt_format == "delta":
+            result = generate_delta_prompt(issued.base, game_state, cards_db, intrigues_db, token_budget)
+        elif prompt_format == "compact":
+            result = generate_compact_ai_prompt(game_state, cards_db, intrigues_db, token_budget) + (False,)
+        else:
+            result = (generate_ai_prompt(game_state, cards_db), [], False)
+        with self._lock:
+            issued.texts[key] = result
+        return result + (False,)
+
+    def forget(self, game_id):
+        """Zapomina wydane prompty stołu (następna delta będzie pełnym promptem)."""
+        with self._lock:
+            self._issued.pop(game_id, None)
+
+
+PROMPTS = PromptCache()
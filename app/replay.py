@@ -0,0 +1,251 @@
+# app/replay.py
+"""
+Deterministyczne odtwarzanie zapisanych sekwencji akcji.
+
+Akcje mają format dziennika zdarzeń aplikacji (state_store.EventLogStore):
+    {"type": "agent_move", "player": ..., "card": ..., "location": ..., "kwargs": {...}}
+    {"type": "pass_turn", "player": ...}, {"type": "new_round"}, {"type": "buy_card", ...}, ...
+apply_action wykonuje akcję tymi samymi funkcjami game_manager, których
+używa odpowiadająca jej trasa. Losowość silnika pochodzi ze strumienia gry
+(game_rng), zapisanego w stanie, więc ten sam stan początkowy i te same
+akcje dają zawsze identyczny stan końcowy.
+
+Użycie:
+    python app/replay.py record out.json [--seed 1] [--policy random] [--max-rounds 10]
+        rozgrywa grę symulatorem i zapisuje {initial_state, actions, final_hash}
+    python app/replay.py run out.json [--repeat 20] [--list-zones]
+        odtwarza akcje, porównuje skrót stanu końcowego i podaje akcje/s
+"""
+import argparse
+import hashlib
+import json
+import random
+import sys
+import time
+
+import game_manager
+from game_manager import (
+    build_new_game_state, process_move, process_pass_turn, check_and_advance_phase,
+    perform_cleanup_and_new_round, process_conflict_set, calculate_and_store_reveal_stats,
+    process_commit_troops, rank_conflict_results, process_conflict_resolve, process_buy_card,
+    add_card_to_market, set_player_hand, process_intrigue, manual_add_intrigue, process_manual_override
+)
+from card_zones import compact_state, expand_state
+from state_diff import clone
+from simulator import POLICIES, SimulationStats, play_game, MAX_ROUNDS, TARGET_VP
+
+
+# --- Wykonanie akcji ---
+
+def _agent_move(game_state, action, dbs):
+    locations_db, cards_db, _, leaders_db = dbs
+    process_move(game_state, locations_db, cards_db, leaders_db, action["player"], action["card"],
+                 action["location"], **action.get("kwargs", {}))
+    check_and_advance_phase(game_state, cards_db)
+
+
+def _pass_turn(game_state, action, dbs):
+    process_pass_turn(game_state, action["player"])
+    check_and_advance_phase(game_state, dbs[1])
+
+
+def _set_current_player(game_state, action, dbs):
+    game_state["currentPlayer"] = action["player"]
+
+
+def _new_round(game_state, action, dbs):
+    perform_cleanup_and_new_round(game_state, dbs[1])
+
+
+def _set_conflict(game_state, action, dbs):
+    process_conflict_set(game_state, game_manager.CATALOG.get("conflicts"), action["conflict"])
+
+
+def _reveal_stats(game_state, action, dbs):
+    calculate_and_store_reveal_stats(game_state, dbs[1])
+
+
+def _commit_troops(game_state, action, dbs):
+    process_commit_troops(game_state, action["player"], action["amount"])
+
+
+def _resolve_conflict(game_state, action, dbs):
+    process_conflict_resolve(game_state, *rank_conflict_results(game_state))
+
+
+def _buy_card(game_state, action, dbs):
+    process_buy_card(game_state, action["player"], action["card"], dbs[1])
+
+
+def _add_to_market(game_state, action, dbs):
+    add_card_to_market(game_state, action["card"], dbs[1])
+
+
+def _set_hand(game_state, action, dbs):
+    set_player_hand(game_state, action["player"], action["cards"], dbs[1])
+
+
+def _play_intrigue(game_state, action, dbs):
+    _, cards_db, intrigues_db, leaders_db = dbs
+    process_intrigue(game_state, intrigues_db, cards_db, leaders_db, action["player"], action["intrigue"],
+                     **action.get("kwargs", {}))
+
+
+def _add_intrigue(game_state, action, dbs):
+    manual_add_intrigue(game_state, action["player"], action["intrigue"], dbs[2])
+
+
+def _manual_override(game_state, action, dbs):
+    # Formularz jest zapisany jako request.form.to_dict(flat=False) - wartości to listy
+    form = {key: value[0] if isinstance(value, list) and value else value
+            for key, value in action["form"].items()}
+    process_manual_override(game_state, dbs[1], action["player"], form)
+
+
+def _batch(game_state, action, dbs):
+    # Lista akcji zapisana jednym zapisem (/api/actions, zapis w tle)
+    for sub_action in action["actions"]:
+        apply_action(game_state, sub_action, dbs)
+
+
+ACTION_HANDLERS = {
+    "agent_move": _agent_move,
+    "pass_turn": _pass_turn,
+    "set_current_player": _set_current_player,
+    "new_round": _new_round,
+    "set_conflict": _set_conflict,
+    "reveal_stats": _reveal_stats,
+    "commit_troops": _commit_troops,
+    "resolve_conflict": _resolve_conflict,
+    "buy_card": _buy_card,
+    "add_to_market": _add_to_market,
+    "set_hand": _set_hand,
+    "play_intrigue": _play_intrigue,
+    "add_intrigue": _add_intrigue,
+    "manual_override": _manual_override,
+    "batch": _batch,
+}
+
+
+def replay_catalogs():
+    """(locations_db, cards_db, intrigues_db, leaders_db) - katalogi potrzebne akcjom."""
+    locations_db, cards_db, intrigues_db, _, leaders_db = game_manager.load_catalogs()
+    return locations_db, cards_db, intrigues_db, leaders_db
+
+
+def apply_action(game_state, action, dbs):
+    """Wykonuje jedną akcję na stanie (w miejscu). Nieznany typ akcji -> ValueError."""
+    action_type = action.get("type")
+    handler = ACTION_HANDLERS.get(action_type)
+    if handler is None:
+        raise ValueError(f"Action type '{action_type}' cannot be replayed.")
+    handler(game_state, action, dbs)
+    return game_state
+
+
+def replay(initial_state, actions, dbs=None, compact_zones=True):
+    """Odtwarza `actions` na kopii `initial_state`. Zwraca stan końcowy."""
+    if dbs is None:
+        dbs = replay_catalogs()
+    game_state = clone(initial_state)
+    if compact_zones:
+        compact_state(game_state, dbs[1])
+    for action in actions:
+        apply_action(game_state, action, dbs)
+    return game_state
+
+
+def state_hash(game_state):
+    """SHA-256 kanonicznego JSON stanu (strefy CardZone jako listy)."""
+    canonical = json.dumps(expand_state(clone(game_state)), sort_keys=True, separators=(',', ':'),
+                           ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+# --- Nagrywanie ---
+
+def record_game(seed=1, policy_names=("random",), max_rounds=MAX_ROUNDS, target_vp=TARGET_VP, compact_zones=True):
+    """
+    Rozgrywa jedną grę symulatorem, zapisując każdą akcję.
+    Zwraca {"initial_state", "actions", "final_hash"}.
+    """
+    locations_db, cards_db, _, conflicts_db, leaders_db = game_manager.load_catalogs()
+    rng = random.Random(seed)
+    initial_state = build_new_game_state(seed=rng.randrange(1 << 62))
+    game_state = clone(initial_state)
+    if compact_zones:
+        compact_state(game_state, cards_db)
+    player_names = sorted(game_state["players"])
+    policies = {
+        name: POLICIES[policy_names[i % len(policy_names)]]()
+        for i, name in enumerate(player_names)
+    }
+
+    stats = SimulationStats(log=[])
+    conflict_id = rng.choice(sorted(conflicts_db))
+    process_conflict_set(game_state, conflicts_db, conflict_id)
+    stats.record({"type": "set_conflict", "conflict": conflict_id})
+    play_game(game_state, policies, rng, (locations_db, cards_db, leaders_db), conflicts_db, stats,
+              max_rounds, target_vp)
+    return {"initial_state": initial_state, "actions": stats.log, "final_hash": state_hash(game_state)}
+
+
+# --- CLI ---
+
+def _record_command(args):
+    recording = record_game(args.seed, args.policy or ["random"], args.max_rounds)
+    with open(args.path, 'w', encoding='utf-8') as f:
+        json.dump(recording, f, ensure_ascii=False)
+    print(f"recorded {len(recording['actions'])} actions to {args.path}, final state {recording['final_hash'][:16]}")
+
+
+def _run_command(args):
+    with open(args.path, 'r', encoding='utf-8') as f:
+        recording = json.load(f)
+    dbs = replay_catalogs()
+    actions = recording["actions"]
+
+    final_hash = None
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        game_state = replay(recording["initial_state"], actions, dbs, compact_zones=not args.list_zones)
+        run_hash = state_hash(game_state)
+        if final_hash is not None and run_hash != final_hash:
+            print(f"MISMATCH: replays of the same recording differ ({final_hash[:16]} vs {run_hash[:16]})")
+            sys.exit(1)
+        final_hash = run_hash
+    elapsed = time.perf_counter() - start
+
+    total = len(actions) * args.repeat
+    print(f"replayed {len(actions)} actions x {args.repeat}: {total / elapsed:,.0f} actions/s")
+    expected = recording.get("final_hash")
+    if expected is not None and final_hash != expected:
+        print(f"MISMATCH: final state {final_hash[:16]} != recorded {expected[:16]}")
+        sys.exit(1)
+    print(f"OK: final state {final_hash[:16]} is identical to the recording.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record and deterministically replay game action sequences.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    record_parser = subparsers.add_parser('record', help='simulate a game and save its actions')
+    record_parser.add_argument('path')
+    record_parser.add_argument('--seed', type=int, default=1)
+    record_parser.add_argument('--policy', action='append', choices=sorted(POLICIES),
+                               help='policy per seat (repeat; assigned round-robin in seat order)')
+    record_parser.add_argument('--max-rounds', type=int, default=MAX_ROUNDS)
+    record_parser.set_defaults(func=_record_command)
+
+    run_parser = subparsers.add_parser('run', help='replay a recording and verify the final state')
+    run_parser.add_argument('path')
+    run_parser.add_argument('--repeat', type=int, default=20, help='replays (for actions/s)')
+    run_parser.add_argument('--list-zones', action='store_true', help='replay on plain list card zones')
+    run_parser.set_defaults(func=_run_command)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
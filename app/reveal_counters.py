@@ -0,0 +1,271 @@
+# app/reveal_counters.py
+"""
+Bieżące liczniki Fazy Odkrycia, aktualizowane przy każdym ruchu karty.
+
+Każdy gracz ma w stanie słownik "reveal_counters":
+    {"hand":   {"persuasion": n, "swords": n, "fremen": n, "bonus": {karta: liczba}},
+     "played": {"persuasion": n, "swords": n, "fremen": n, "bonus": {karta: liczba}}}
+"hand" odpowiada liście `hand`, "played" - liście `discard_pile`. Funkcje
+przenoszące karty (process_move, process_buy_card, set_player_hand,
+perform_cleanup_and_new_round) zmieniają liczniki w O(1) na kartę, więc
+sumy Perswazji i Mieczy nie wymagają przeglądania rąk.
+
+Premie warunkowe są zadeklarowane w cards.json (reveal_effect.bonus):
+    {"persuasion": 3, "when": "fremen_played", "description": "..."}
+    {"persuasion": 2, "per": ["fremen_played", "fremen_in_hand"], "excluding_self": true, ...}
+    {"persuasion": 2, "description": "..."}            (bez warunku)
+"when" - premia tylko, gdy licznik > 0; "per" - premia razy suma liczników;
+"excluding_self" - kopie tej karty w ręce nie liczą się do "per". Premie są
+kompilowane do tabeli i oceniane na wektorze liczników (COUNTER_NAMES)
+wyliczanym raz na odczyt - koszt zależy od liczby różnych kart z premią
+w ręce, a nie od liczby kart.
+
+Brak słownika oznacza "przelicz z list przy następnym odczycie" - tak
+traktowane są stare zapisy i stany edytowane ręcznie. `scan_reveal_totals`
+to pełne przeliczenie karta po karcie, używane w trybie weryfikacji.
+"""
+from catalog import compiled
+
+COUNTERS_KEY = "reveal_counters"
+ZONES = {"hand": "hand", "played": "discard_pile"}
+
+# Liczniki dostępne w warunkach premii
+COUNTER_NAMES = ("fremen_played", "fremen_in_hand", "emperor_alliance")
+# Liczniki ręki, do których karta może sama się wliczać (dla "excluding_self")
+_HAND_COUNTER_SYMBOLS = {"fremen_in_hand": "fremen"}
+
+
+class RevealBonus:
+    """Skompilowana premia warunkowa karty."""
+    __slots__ = ("persuasion", "swords", "when", "per", "excluding_self", "description")
+
+    def __init__(self, persuasion, swords, when, per, excluding_self, description):
+        self.persuasion = persuasion
+        self.swords = swords
+        self.when = when
+        self.per = per
+        self.excluding_self = excluding_self
+        self.description = description
+
+    def multiplier(self, vector, self_in_hand):
+        """Ile razy premia się należy (0 - warunek niespełniony)."""
+        if self.when is not None and vector[self.when] <= 0:
+            return 0
+        if not self.per:
+            return 1
+        count = 0
+        for name in self.per:
+            count += vector[name]
+        return count - self_in_hand
+
+
+class CardProfile:
+    """
+    Wkład jednej karty: bazowa Perswazja/Miecze (z premią bezwarunkową),
+    symbol Fremenów, premia warunkowa i opis dla widoku Odkrycia.
+    """
+    __slots__ = ("persuasion", "swords", "fremen", "bonus", "description")
+
+    def __init__(self, persuasion, swords, fremen, bonus, description):
+        self.persuasion = persuasion
+        self.swords = swords
+        self.fremen = fremen
+        self.bonus = bonus
+        self.description = description
+
+
+_NO_PROFILE = CardProfile(0, 0, False, None, "")
+
+
+def _compile_bonus(card_id, bonus_data, symbols):
+    when = bonus_data.get("when")
+    per = tuple(bonus_data.get("per", ()))
+    for name in ((when,) if when else ()) + per:
+        if name not in COUNTER_NAMES:
+            print(f"WARNING: Unknown reveal counter '{name}' in bonus of card '{card_id}'. Bonus ignored.")
+            return None
+    # Kopie tej karty w ręce liczą się do "per" tylko przez liczniki, do których karta należy
+    excluding_self = 0
+    if bonus_data.get("excluding_self", False):
+        excluding_self = sum(1 for name in per if _HAND_COUNTER_SYMBOLS.get(name) in symbols)
+    return RevealBonus(
+        bonus_data.get("persuasion", 0),
+        bonus_data.get("swords", 0),
+        when,
+        per,
+        excluding_self,
+        bonus_data.get("description", ""),
+    )
+
+
+def _build_profiles(cards_db):
+    profiles = {}
+    for card_id, card_data in cards_db.items():
+        reveal_effect = card_data.get("reveal_effect", {})
+        symbols = card_data.get("agent_symbols", [])
+        persuasion = reveal_effect.get("persuasion", 0)
+        swords = reveal_effect.get("swords", 0)
+        description = reveal_effect.get("possible actions", {}).get("description", "No effect.")
+        bonus = None
+
+        bonus_data = reveal_effect.get("bonus")
+        if bonus_data:
+            bonus = _compile_bonus(card_id, bonus_data, symbols)
+            if bonus is not None and bonus.when is None and not bonus.per:
+                # Premia bezwarunkowa (np. założony wybór) - wliczona w bazę
+                persuasion += bonus.persuasion
+                swords += bonus.swords
+                description = bonus.description
+                bonus = None
+        elif reveal_effect.get("manual_note"):
+            description = f"[MANUAL ACTION] {description} {reveal_effect['manual_note']}"
+        elif "deploy" in description or "retreat" in description:
+            description = f"[MANUAL ACTION] {description} (Pamiętaj, aby dostosować wojsko w konflikcie)."
+
+        profiles[card_id] = CardProfile(persuasion, swords, "fremen" in symbols, bonus, description)
+    return profiles
+
+
+def card_profiles(cards_db):
+    return compiled("reveal_profiles", _build_profiles, cards_db)
+
+
+def _empty_zone():
+    return {"persuasion": 0, "swords": 0, "fremen": 0, "bonus": {}}
+
+
+def _apply(zone, profile, card_id, sign):
+    zone["persuasion"] += sign * profile.persuasion
+    zone["swords"] += sign * profile.swords
+    if profile.fremen:
+        zone["fremen"] += sign
+    if profile.bonus is not None:
+        count = zone["bonus"].get(card_id, 0) + sign
+        if count:
+            zone["bonus"][card_id] = count
+        else:
+            zone["bonus"].pop(card_id, None)
+
+
+def build_counters(player_state, cards_db):
+    """Liczy liczniki od zera z list `hand` i `discard_pile` (bez zapisu)."""
+    profiles = card_profiles(cards_db)
+    counters = {}
+    for zone_name, list_key in ZONES.items():
+        zone = counters[zone_name] = _empty_zone()
+        for card_id in player_state.get(list_key, []):
+            profile = profiles.get(card_id)
+            if profile is not None:
+                _apply(zone, profile, card_id, 1)
+    return counters
+
+
+def get_counters(player_state, cards_db):
+    """Zwraca liczniki gracza; jeśli ich brak, buduje je i zapisuje w stanie."""
+    counters = player_state.get(COUNTERS_KEY)
+    if counters is None:
+        counters = player_state[COUNTERS_KEY] = build_counters(player_state, cards_db)
+    return counters
+
+
+def rebuild_counters(player_state, cards_db):
+    """Przelicza liczniki po podmianie całej ręki lub stosu odrzuconych."""
+    player_state[COUNTERS_KEY] = build_counters(player_state, cards_db)
+    return player_state[COUNTERS_KEY]
+
+
+def invalidate_counters(player_state):
+    """Usuwa liczniki - zostaną przeliczone przy następnym odczycie."""
+    player_state.pop(COUNTERS_KEY, None)
+
+
+def add_card(player_state, zone_name, card_id, cards_db):
+    """Karta trafiła do strefy ("hand" lub "played"). Bez liczników - nic nie robi."""
+    counters = player_state.get(COUNTERS_KEY)
+    if counters is not None:
+        _apply(counters[zone_name], card_profiles(cards_db).get(card_id, _NO_PROFILE), card_id, 1)
+
+
+def remove_card(player_state, zone_name, card_id, cards_db):
+    """Karta opuściła strefę ("hand" lub "played"). Bez liczników - nic nie robi."""
+    counters = player_state.get(COUNTERS_KEY)
+    if counters is not None:
+        _apply(counters[zone_name], card_profiles(cards_db).get(card_id, _NO_PROFILE), card_id, -1)
+
+
+def counter_vector(counters, has_emperor_alliance):
+    """Wektor liczników (COUNTER_NAMES), na którym oceniane są premie."""
+    return {
+        "fremen_played": counters["played"]["fremen"],
+        "fremen_in_hand": counters["hand"]["fremen"],
+        "emperor_alliance": 1 if has_emperor_alliance else 0,
+    }
+
+
+def evaluate_card(profile, vector, copies_in_hand):
+    """
+    Zwraca (persuasion, swords, description) jednej karty w ręce.
+    `copies_in_hand` - liczba kopii tej karty w ręce (dla "excluding_self").
+    """
+    persuasion = profile.persuasion
+    swords = profile.swords
+    description = profile.description
+    bonus = profile.bonus
+    if bonus is not None:
+        times = bonus.multiplier(vector, copies_in_hand * bonus.excluding_self)
+        if times > 0:
+            persuasion += bonus.persuasion * times
+            swords += bonus.swords * times
+            description = bonus.description.format(
+                persuasion=bonus.persuasion * times, swords=bonus.swords * times, count=times
+            )
+    return persuasion, swords, description
+
+
+def totals_from_counters(counters, cards_db, has_emperor_alliance):
+    """Zwraca (total_persuasion, base_swords) z liczników - bez przeglądania kart."""
+    hand = counters["hand"]
+    persuasion = hand["persuasion"]
+    swords = hand["swords"]
+    if hand["bonus"]:
+        profiles = card_profiles(cards_db)
+        vector = counter_vector(counters, has_emperor_alliance)
+        for card_id, copies in hand["bonus"].items():
+            bonus = profiles.get(card_id, _NO_PROFILE).bonus
+            if bonus is None:
+                continue
+            times = bonus.multiplier(vector, copies * bonus.excluding_self)
+            if times > 0:
+                persuasion += copies * bonus.persuasion * times
+                swords += copies * bonus.swords * times
+    return persuasion, swords
+
+
+def scan_reveal_totals(player_state, cards_db, has_emperor_alliance):
+    """
+    Pełne przeliczenie (total_persuasion, base_swords) karta po karcie z
+    list `hand` i `discard_pile` - wzorzec dla trybu weryfikacji.
+    """
+    hand_ids = player_state.get("hand", [])
+    vector = {
+        "fremen_played": sum(
+            1 for card_id in player_state.get("discard_pile", [])
+            if "fremen" in cards_db.get(card_id, {}).get("agent_symbols", [])
+        ),
+        "fremen_in_hand": sum(
+            1 for card_id in hand_ids
+            if "fremen" in cards_db.get(card_id, {}).get("agent_symbols", [])
+        ),
+        "emperor_alliance": 1 if has_emperor_alliance else 0,
+    }
+    profiles = card_profiles(cards_db)
+    total_persuasion = 0
+    base_swords = 0
+    for card_id in hand_ids:
+        profile = profiles.get(card_id)
+        if profile is None:
+            continue
+        persuasion, swords, _ = evaluate_card(profile, vector, hand_ids.count(card_id))
+        total_persuasion += persuasion
+        base_swords += swords
+    return total_persuasion, base_swords
@@ -0,0 +1,294 @@
+# app/simulator.py
+"""
+Symulator gry bez Flaska i bez zapisu na dysk.
+
+Rozgrywa pełne gry w pamięci, wywołując te same funkcje game_manager co
+trasy aplikacji: perform_cleanup_and_new_round (nowa runda), process_conflict_set,
+process_move / process_pass_turn (tury agentów), calculate_and_store_reveal_stats
+i process_commit_troops (odkrycie), rank_conflict_results + process_conflict_resolve
+(konflikt) oraz process_buy_card (zakupy). Decyzje graczy podejmują wymienne
+polityki (POLICIES). Stan startowy pochodzi z game_stat.DEFAULT.json -
+game_stat.json nie jest ani czytany, ani zapisywany. Strefy kart graczy są
+domyślnie zwarte (card_zones.CardZone); --list-zones zostawia zwykłe listy.
+
+Każda gra dostaje własne ziarno strumienia losowego (game_rng), wyznaczone
+z --seed, więc wynik symulacji jest powtarzalny. Z `SimulationStats(log=[])`
+każda zmiana stanu jest dopisywana do dziennika jako akcja w formacie
+dziennika zdarzeń aplikacji (zob. replay.py).
+
+Użycie:
+    python app/simulator.py [--games 1000] [--policy random] [--policy greedy] [--seed 1] [--list-zones]
+"""
+import argparse
+import random
+import time
+
+import game_manager
+from game_manager import (
+    build_new_game_state, perform_cleanup_and_new_round, process_conflict_set, legal_moves,
+    process_move, process_pass_turn, check_and_advance_phase, calculate_and_store_reveal_stats,
+    reveal_totals, process_commit_troops, rank_conflict_results, process_conflict_resolve,
+    process_buy_card, add_card_to_market, get_card_persuasion_cost
+)
+from state_diff import clone
+from card_zones import compact_state
+from game_rng import seed_game
+
+MAX_ROUNDS = 10
+TARGET_VP = 10
+
+
+# --- Polityki graczy ---
+
+def player_value(player_state):
+    """Prosta heurystyczna wartość pozycji gracza (dla polityki zachłannej)."""
+    resources = player_state.get("resources", {})
+    return (
+        3.0 * player_state.get("victory_points", 0)
+        + sum(player_state.get("influence", {}).values())
+        + 0.5 * (resources.get("solari", 0) + resources.get("Spice", 0) + resources.get("water", 0))
+        + 0.5 * resources.get("troops_garrison", 0)
+        + 0.5 * len(player_state.get("intrigue_hand", []))
+    )
+
+
+class RandomPolicy:
+    """Losowy legalny ruch, losowy wybór opcji, wszystkie wojska do konfliktu."""
+    name = "random"
+
+    def choose_move(self, game_state, player_name, moves, rng, dbs):
+        return rng.choice(moves)
+
+    def move_kwargs(self, game_state, player_name, move, rng):
+        return {"pay_cost": True, "choice_index": rng.randrange(2)}
+
+    def troops_to_commit(self, game_state, player_name, rng):
+        resources = game_state["players"][player_name].get("resources", {})
+        return resources.get("troops_garrison", 0) + resources.get("troops_in_conflict", 0)
+
+    def choose_purchase(self, game_state, player_name, affordable, rng):
+        return rng.choice(affordable) if affordable else None
+
+
+class GreedyPolicy(RandomPolicy):
+    """Ruch maksymalizujący player_value po jednym kroku (próba na kopii stanu)."""
+    name = "greedy"
+
+    def choose_move(self, game_state, player_name, moves, rng, dbs):
+        locations_db, cards_db, leaders_db = dbs
+        best_move, best_value = None, None
+        for move in moves:
+            trial = clone(game_state)
+            process_move(trial, locations_db, cards_db, leaders_db, player_name, move[0], move[1],
+                         **self.move_kwargs(game_state, player_name, move, rng))
+            value = player_value(trial["players"][player_name])
+            if best_value is None or value > best_value:
+                best_move, best_value = move, value
+        return best_move
+
+    def move_kwargs(self, game_state, player_name, move, rng):
+        return {"pay_cost": True, "choice_index": 0}
+
+    def choose_purchase(self, game_state, player_name, affordable, rng):
+        if not affordable:
+            return None
+        # Najdroższa karta, na jaką stać gracza
+        return max(affordable, key=lambda item: (item[1], item[0]))
+
+
+POLICIES = {
+    "random": RandomPolicy,
+    "greedy": GreedyPolicy,
+}
+
+
+# --- Fazy gry ---
+
+class SimulationStats:
+    __slots__ = ("games", "rounds", "moves", "passes", "purchases", "log")
+
+    def __init__(self, log=None):
+        self.games = self.rounds = self.moves = self.passes = self.purchases = 0
+        self.log = log
+
+    def record(self, action):
+        """Dopisuje akcję do dziennika (jeśli jest włączony)."""
+        if self.log is not None:
+            self.log.append(action)
+
+
+def start_round(game_state, conflicts_db, rng, stats=None):
+    perform_cleanup_and_new_round(game_state)
+    conflict_id = rng.choice(sorted(conflicts_db))
+    process_conflict_set(game_state, conflicts_db, conflict_id)
+    if stats is not None:
+        stats.record({"type": "new_round"})
+        stats.record({"type": "set_conflict", "conflict": conflict_id})
+
+
+def play_agent_phase(game_state, policies, rng, dbs, stats):
+    """Tury agentów (po kolei, w porządku alfabetycznym) aż wszyscy skończą."""
+    locations_db, cards_db, leaders_db = dbs
+    player_names = sorted(game_state["players"])
+    while game_state.get("current_phase") == "AGENT_TURN":
+        for player_name in player_names:
+            player_state = game_state["players"][player_name]
+            if player_state.get("has_passed") or player_state.get("agents_placed", 0) >= player_state.get("agents_total", 2):
+                continue
+            game_state["currentPlayer"] = player_name
+            stats.record({"type": "set_current_player", "player": player_name})
+            policy = policies[player_name]
+            moves = legal_moves(game_state, player_name, locations_db, cards_db, leaders_db)
+            move = policy.choose_move(game_state, player_name, moves, rng, dbs) if moves else None
+            if move is None:
+                process_pass_turn(game_state, player_name)
+                stats.record({"type": "pass_turn", "player": player_name})
+                stats.passes += 1
+            else:
+                kwargs = policy.move_kwargs(game_state, player_name, move, rng)
+                process_move(game_state, locations_db, cards_db, leaders_db, player_name, move[0], move[1], **kwargs)
+                stats.record({"type": "agent_move", "player": player_name, "card": move[0], "location": move[1],
+                              "kwargs": kwargs})
+                stats.moves += 1
+        # Akcje agentów w dzienniku (jak w aplikacji) same sprawdzają koniec fazy
+        check_and_advance_phase(game_state, cards_db)
+
+
+def play_reveal_phase(game_state, policies, rng, dbs, stats, market_size):
+    """Odkrycie: statystyki, wojska, rozstrzygnięcie konfliktu, zakupy, uzupełnienie rynku."""
+    _, cards_db, _ = dbs
+    calculate_and_store_reveal_stats(game_state, cards_db)
+    stats.record({"type": "reveal_stats"})
+    for player_name in sorted(game_state["players"]):
+        amount = policies[player_name].troops_to_commit(game_state, player_name, rng)
+        process_commit_troops(game_state, player_name, amount)
+        stats.record({"type": "commit_troops", "player": player_name, "amount": amount})
+
+    process_conflict_resolve(game_state, *rank_conflict_results(game_state))
+    stats.record({"type": "resolve_conflict"})
+
+    all_alliances = game_state.get("alliances", {})
+    for player_name in sorted(game_state["players"]):
+        policy = policies[player_name]
+        player_state = game_state["players"][player_name]
+        # process_buy_card sprawdza perswazję z ręki na żywo (bez odliczania
+        # wcześniejszych zakupów), więc budżet rundy liczymy tutaj
+        persuasion, _ = reveal_totals(player_state, cards_db, player_name, all_alliances)
+        while True:
+            affordable = []
+            for card_id in game_state.get("imperium_row", []):
+                cost = get_card_persuasion_cost(cards_db.get(card_id))
+                if cost <= persuasion:
+                    affordable.append((card_id, cost))
+            choice = policy.choose_purchase(game_state, player_name, affordable, rng)
+            if choice is None:
+                break
+            is_valid, _ = process_buy_card(game_state, player_name, choice[0], cards_db)
+            if not is_valid:
+                break
+            stats.record({"type": "buy_card", "player": player_name, "card": choice[0]})
+            persuasion -= choice[1]
+            stats.purchases += 1
+
+    _refill_market(game_state, cards_db, rng, market_size, stats)
+
+
+def _refill_market(game_state, cards_db, rng, market_size, stats=None):
+    buyable = [card_id for card_id, card_data in cards_db.items() if get_card_persuasion_cost(card_data) != 999]
+    while len(game_state.get("imperium_row", [])) < market_size and buyable:
+        card_id = rng.choice(buyable)
+        add_card_to_market(game_state, card_id, cards_db)
+        if stats is not None:
+            stats.record({"type": "add_to_market", "card": card_id})
+
+
+def game_over(game_state, max_rounds=MAX_ROUNDS, target_vp=TARGET_VP):
+    if game_state.get("round", 1) >= max_rounds:
+        return True
+    return any(p.get("victory_points", 0) >= target_vp for p in game_state["players"].values())
+
+
+def play_game(game_state, policies, rng, dbs, conflicts_db, stats=None, max_rounds=MAX_ROUNDS, target_vp=TARGET_VP, market_size=None):
+    """
+    Rozgrywa grę od bieżącego stanu do końca (w miejscu). Jeśli stan jest w
+    trakcie rundy, najpierw ją dokańcza. Zwraca zwycięzcę (najwięcej VP).
+    """
+    if stats is None:
+        stats = SimulationStats()
+    if market_size is None:
+        market_size = len(game_state.get("imperium_row", []))
+    while True:
+        if game_state.get("current_phase") == "AGENT_TURN":
+            play_agent_phase(game_state, policies, rng, dbs, stats)
+        if game_state.get("current_phase") == "REVEAL":
+            play_reveal_phase(game_state, policies, rng, dbs, stats, market_size)
+            stats.rounds += 1
+        if game_over(game_state, max_rounds, target_vp):
+            break
+        start_round(game_state, conflicts_db, rng, stats)
+    stats.games += 1
+    return max(sorted(game_state["players"]), key=lambda name: game_state["players"][name].get("victory_points", 0))
+
+
+def run_simulation(games, policy_names, seed=1, max_rounds=MAX_ROUNDS, target_vp=TARGET_VP, compact_zones=True):
+    """Rozgrywa `games` gier od stanu startowego. Zwraca raport (słownik)."""
+    locations_db, cards_db, _, conflicts_db, leaders_db = game_manager.load_catalogs()
+    dbs = (locations_db, cards_db, leaders_db)
+    template = build_new_game_state()
+    if compact_zones:
+        compact_state(template, cards_db)
+    player_names = sorted(template["players"])
+    policies = {
+        name: POLICIES[policy_names[i % len(policy_names)]]()
+        for i, name in enumerate(player_names)
+    }
+
+    rng = random.Random(seed)
+    stats = SimulationStats()
+    wins = {name: 0 for name in player_names}
+
+    start = time.perf_counter()
+    for _ in range(games):
+        # Stan startowy to już runda 1 z rozdanymi kartami - brakuje tylko konfliktu
+        game_state = clone(template)
+        seed_game(game_state, rng.randrange(1 << 62))
+        process_conflict_set(game_state, conflicts_db, rng.choice(sorted(conflicts_db)))
+        wins[play_game(game_state, policies, rng, dbs, conflicts_db, stats, max_rounds, target_vp)] += 1
+    elapsed = time.perf_counter() - start
+
+    return {
+        "games": stats.games,
+        "rounds": stats.rounds,
+        "moves": stats.moves,
+        "passes": stats.passes,
+        "purchases": stats.purchases,
+        "seconds": elapsed,
+        "games_per_sec": stats.games / elapsed,
+        "moves_per_sec": stats.moves / elapsed,
+        "policies": {name: policy.name for name, policy in policies.items()},
+        "wins": wins,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless Dune: Imperium game simulator.")
+    parser.add_argument('--games', type=int, default=1000)
+    parser.add_argument('--policy', action='append', choices=sorted(POLICIES),
+                        help='policy per seat (repeat; assigned round-robin in seat order)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--max-rounds', type=int, default=MAX_ROUNDS)
+    parser.add_argument('--list-zones', action='store_true', help='keep card zones as plain lists')
+    args = parser.parse_args()
+
+    report = run_simulation(args.games, args.policy or ["random"], args.seed, args.max_rounds,
+                            compact_zones=not args.list_zones)
+    print(f"games: {report['games']}  rounds: {report['rounds']}  moves: {report['moves']}  "
+          f"passes: {report['passes']}  purchases: {report['purchases']}")
+    print(f"{report['games_per_sec']:,.1f} games/s ({report['games_per_sec'] * 60:,.0f} games/min), "
+          f"{report['moves_per_sec']:,.0f} moves/s")
+    for name, policy in report["policies"].items():
+        print(f"  {name:<10} {policy:<8} wins: {report['wins'][name]}")
+
+
+if __name__ == '__main__':
+    main()
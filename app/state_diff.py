@@ -0,0 +1,75 @@
+# app/state_diff.py
+"""
+Zwięzłe różnice między dwoma stanami gry (dane w kształcie JSON).
+
+Łatka to lista operacji:
+    ["s", ścieżka, wartość]   - ustaw wartość pod ścieżką
+    ["d", ścieżka]            - usuń klucz
+    ["a", ścieżka, elementy]  - dopisz elementy na końcu listy
+Ścieżka to lista kluczy słowników (listy są zawsze podmieniane w całości
+albo rozszerzane przez "a").
+"""
+from card_zones import CardZone
+
+
+def clone(value):
+    """Szybka głęboka kopia danych JSON (dict/list/skalary)."""
+    if isinstance(value, dict):
+        return {key: clone(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [clone(item) for item in value]
+    if type(value) is CardZone:
+        return value.copy()
+    return value
+
+
+def diff(old, new, path=None, patch=None):
+    """Zwraca łatkę, która przekształca `old` w `new`."""
+    if patch is None:
+        patch = []
+    if path is None:
+        path = []
+
+    for key, new_value in new.items():
+        if key not in old:
+            patch.append(["s", path + [key], clone(new_value)])
+            continue
+        old_value = old[key]
+        if old_value is new_value:
+            continue
+        if isinstance(new_value, dict) and isinstance(old_value, dict):
+            diff(old_value, new_value, path + [key], patch)
+        elif isinstance(new_value, list) and isinstance(old_value, list):
+            if new_value == old_value:
+                continue
+            old_len = len(old_value)
+            if old_len < len(new_value) and new_value[:old_len] == old_value:
+                patch.append(["a", path + [key], clone(new_value[old_len:])])
+            else:
+                patch.append(["s", path + [key], clone(new_value)])
+        elif type(old_value) is not type(new_value) or old_value != new_value:
+            patch.append(["s", path + [key], clone(new_value)])
+
+    for key in old:
+        if key not in new:
+            patch.append(["d", path + [key]])
+    return patch
+
+
+def apply_patch(state, patch):
+    """Stosuje łatkę do `state` (w miejscu) i zwraca `state`."""
+    for op in patch:
+        kind, path = op[0], op[1]
+        target = state
+        for key in path[:-1]:
+            target = target[key]
+        key = path[-1]
+        if kind == "s":
+            target[key] = clone(op[2])
+        elif kind == "a":
+            target[key].extend(clone(op[2]))
+        elif kind == "d":
+            target.pop(key, None)
+        else:
+            raise ValueError(f"Unknown patch operation: {kind}")
+    return state
@@ -0,0 +1,143 @@
+# app/state_fork.py
+"""
+Tanie rozgałęzienie stanu gry do oceny ruchów "co by było, gdyby".
+
+Silnik (process_move, process_intrigue, process_buy_card, ...) zmienia stan
+w miejscu, więc sprawdzenie hipotetycznego ruchu wymagało dotąd pełnej kopii
+(copy.deepcopy / state_diff.clone). fork(state) zwraca ForkDict - płytką
+kopię najwyższego poziomu, która dzieli z rodzicem wszystkie zagnieżdżone
+słowniki i listy. Zagnieżdżony kontener jest kopiowany (płytko, znowu jako
+ForkDict) dopiero przy pierwszym sięgnięciu po niego przez fork - `[]`,
+get, setdefault, pop, items, values - i od tej chwili należy do forka.
+Ruch gracza kopiuje więc tylko ścieżki, które faktycznie odwiedza (jego
+gracz, zasoby, strefy kart, odwiedzona lokacja, historia rundy), a rodzic
+pozostaje nietknięty.
+
+Listy są kopiowane w całości przy pierwszym dostępie (listy kart to
+identyfikatory - kopia jest płytka; listy słowników, np. round_history,
+są kopiowane głęboko). CardZone kopiuje swoje bufory (copy()).
+
+Ograniczenia: fork jest do odczytu i zmian przez silnik, nie do zapisu -
+przed zapisem lub porównaniem z innym stanem zamień go na zwykłe dane
+(state_diff.clone, json.dumps). `dict(fork)` i `{**fork}` omijają kopiowanie
+przy dostępie (zwracają kontenery rodzica) - silnik ich na stanie nie używa.
+Rodzica nie wolno zmieniać, dopóki żyją jego forki.
+"""
+from card_zones import CardZone
+from state_diff import clone
+
+_MISSING = object()
+
+
+def _owned_copy(value):
+    """Kopia kontenera `value` na własność forka (skalary bez zmian)."""
+    value_type = type(value)
+    if value_type is dict or value_type is ForkDict:
+        return ForkDict(value)
+    if value_type is list:
+        for item in value:
+            if type(item) in _CONTAINERS:
+                return clone(value)
+        return list(value)
+    if value_type is CardZone:
+        return value.copy()
+    return value
+
+
+class ForkDict(dict):
+    """
+    Słownik kopiowany przy dostępie: klucze z `_owned` wskazują wartości
+    należące do forka, pozostałe kontenery są jeszcze współdzielone z rodzicem.
+    """
+    __slots__ = ("_owned",)
+
+    def __init__(self, parent=()):
+        dict.__init__(self, parent)
+        self._owned = set()
+
+    def _own(self, key, value):
+        if key in self._owned:
+            return value
+        self._owned.add(key)
+        copied = _owned_copy(value)
+        if copied is not value:
+            dict.__setitem__(self, key, copied)
+        return copied
+
+    def __getitem__(self, key):
+        return self._own(key, dict.__getitem__(self, key))
+
+    def get(self, key, default=None):
+        value = dict.get(self, key, _MISSING)
+        if value is _MISSING:
+            return default
+        return self._own(key, value)
+
+    def setdefault(self, key, default=None):
+        if key in self:
+            return self[key]
+        self._owned.add(key)
+        dict.__setitem__(self, key, default)
+        return default
+
+    def pop(self, key, *default):
+        if key in self and key not in self._owned:
+            self._own(key, dict.__getitem__(self, key))
+        self._owned.discard(key)
+        return dict.pop(self, key, *default)
+
+    def popitem(self):
+        key, value = dict.popitem(self)
+        if key not in self._owned:
+            value = _owned_copy(value)
+        self._owned.discard(key)
+        return key, value
+
+    def __setitem__(self, key, value):
+        self._owned.add(key)
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key):
+        self._owned.discard(key)
+        dict.__delitem__(self, key)
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def values(self):
+        return [self[key] for key in dict.keys(self)]
+
+    def items(self):
+        return [(key, self[key]) for key in dict.keys(self)]
+
+    def copy(self):
+        return ForkDict(self)
+
+    def __reduce__(self):
+        return dict, (dict(self.items()),)
+
+
+_CONTAINERS = (dict, list, ForkDict)
+
+
+def fork(game_state):
+    """
+    Rozgałęzienie `game_state`: zmiany forka nie dotykają `game_state`.
+    Fork forka też jest dozwolony (np. drugi ruch tej samej tury).
+    """
+    return ForkDict(game_state)
+
+
+def copied_containers(state):
+    """Liczba kontenerów, które fork zdążył skopiować (do pomiarów)."""
+    if type(state) is not ForkDict:
+        return 0
+    count = 0
+    for key in state._owned:
+        value = dict.get(state, key)
+        if type(value) is ForkDict:
+            count += 1 + copied_containers(value)
+        elif type(value) is list or type(value) is CardZone:
+            count += 1
+    return count
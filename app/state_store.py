@@ -0,0 +1,626 @@
+# app/state_store.py
+"""
+Backendy przechowywania stanu gry.
+
+- JsonFileStore: jeden plik JSON przepisywany przy każdym zapisie (tryb
+  domyślny, zgodny z dotychczasowym game_stat.json).
+- EventLogStore: dziennik zdarzeń (append-only, jedna zwięzła linia JSON na
+  akcję) + okresowe migawki. Koszt zapisu akcji zależy od rozmiaru zmiany,
+  a nie od rozmiaru całego stanu i historii.
+- SqliteStore: wiele gier w jednej bazie SQLite (tryb WAL), jeden wiersz na
+  grę, każda zmiana w osobnej transakcji.
+
+Każdy zapisany stan ma pole "version" (rosnące o 1 przy każdym zapisie).
+save() działa jak compare-and-swap: zapisuje tylko wtedy, gdy wersja
+wczytanego stanu jest równa aktualnej wersji w magazynie, w przeciwnym razie
+rzuca StaleStateError. replace() zawsze nadpisuje stan (reset gry).
+persist() zapisuje stan z jego własną wersją bez sprawdzania - używa go
+WriteBehindStore, który sam pilnuje wersji w pamięci i zapisuje w tle.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows - tylko blokada w obrębie procesu
+    fcntl = None
+
+from state_diff import apply_patch, clone, diff
+
+
+class StaleStateError(Exception):
+    """Stan gry został zmieniony przez kogoś innego od chwili wczytania."""
+
+    def __init__(self, game_id, expected_version, current_version):
+        super().__init__(f"Game '{game_id}' is at version {current_version}, "
+                         f"but the update was based on version {expected_version}.")
+        self.game_id = game_id
+        self.expected_version = expected_version
+        self.current_version = current_version
+
+
+def state_version(state):
+    return state.get("version", 0) if state else 0
+
+
+class _FileLock:
+    """Blokada zapisu: wątki w procesie + flock na pliku `.lock` między procesami."""
+
+    def __init__(self, path):
+        self.path = path
+        self._thread_lock = threading.Lock()
+        self._file = None
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        if fcntl is not None:
+            try:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                self._file = open(self.path, 'a')
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+            except Exception:
+                self._release()
+                raise
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._release()
+        return False
+
+    def _release(self):
+        if self._file is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+        self._thread_lock.release()
+
+
+def write_json_atomic(path, data, fsync=False, **dump_kwargs):
+    """Zapis przez plik tymczasowy + os.replace (czytelnik widzi stary albo nowy plik, nigdy urwany)."""
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, **dump_kwargs)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        # Nieudany zapis (brak miejsca, wartość spoza JSON) nie zostawia urwanego pliku .tmp
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    if fsync and hasattr(os, 'O_DIRECTORY'):
+        # Trwałość samej podmiany nazwy w katalogu
+        dir_fd = os.open(os.path.dirname(path) or '.', os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+class JsonFileStore:
+    """
+    Cały stan w jednym pliku JSON (indent=2). `missing_ok=True` - brak pliku
+    to zwykły przypadek (stół bez zapisanego stanu), a nie błąd do logu.
+    """
+
+    def __init__(self, path, game_id="default", fsync=False, missing_ok=False):
+        self.path = path
+        self.game_id = game_id
+        self.fsync = fsync
+        self.missing_ok = missing_ok
+        self._lock = _FileLock(f"{path}.lock")
+        self._known_version = None   # (sygnatura pliku, wersja) po ostatnim zapisie
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            if not self.missing_ok:
+                print(f"Error: File not found {self.path}")
+            return None
+        except json.JSONDecodeError:
+            print(f"Error: JSON decode error in {self.path}")
+            return None
+
+    def _signature(self):
+        try:
+            st = os.stat(self.path)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    def _current_version(self):
+        signature = self._signature()
+        if signature is None:
+            return None
+        if self._known_version and self._known_version[0] == signature:
+            return self._known_version[1]
+        version = state_version(self.load())
+        self._known_version = (signature, version)
+        return version
+
+    def version(self):
+        """Wersja zapisanego stanu (None, jeśli go nie ma) - bez parsowania niezmienionego pliku."""
+        return self._current_version()
+
+    def _write(self, state, version):
+        previous_version = state.get("version")
+        state["version"] = version
+        try:
+            write_json_atomic(self.path, state, fsync=self.fsync, indent=2)
+        except IOError:
+            print(f"Error: Could not write to file {self.path}")
+            if previous_version is None:
+                state.pop("version", None)
+            else:
+                state["version"] = previous_version
+            return False
+        self._known_version = (self._signature(), version)
+        return True
+
+    def save(self, state, action=None):
+        with self._lock:
+            current = self._current_version()
+            expected = state_version(state)
+            if current is not None and current != expected:
+                raise StaleStateError(self.game_id, expected, current)
+            return self._write(state, expected + 1)
+
+    def replace(self, state, action=None):
+        with self._lock:
+            return self._write(state, (self._current_version() or 0) + 1)
+
+    def persist(self, state, action=None):
+        with self._lock:
+            return self._write(state, state_version(state))
+
+
+class EventLogStore:
+    """
+    Stan gry jako migawka + dziennik zdarzeń.
+
+    Pliki w katalogu `directory`:
+        <game_id>.snapshot.json  - {"seq": n, "state": {...}}
+        <game_id>.events.jsonl   - {"seq": n, "action": {...}, "patch": [...]} na linię
+
+    Pełna migawka jest zapisywana co `snapshot_every` zdarzeń oraz na koniec
+    rundy (zmiana pola "round"); dziennik jest wtedy obcinany. Wczytanie
+    odtwarza stan z ostatniej migawki i zdarzeń o wyższym numerze.
+    Jeśli migawki jeszcze nie ma, stan początkowy pochodzi z `bootstrap_file`.
+    """
+
+    def __init__(self, directory, game_id="default", snapshot_every=100, bootstrap_file=None, fsync=False):
+        self.directory = directory
+        self.game_id = game_id
+        self.snapshot_every = snapshot_every
+        self.bootstrap_file = bootstrap_file
+        self.fsync = fsync
+        self.snapshot_path = os.path.join(directory, f"{game_id}.snapshot.json")
+        self.log_path = os.path.join(directory, f"{game_id}.events.jsonl")
+        self._state = None          # ostatni utrwalony stan (własna kopia)
+        self._seq = 0
+        self._snapshot_seq = 0
+        self._disk_signature = None
+        self._lock = _FileLock(os.path.join(directory, f"{game_id}.lock"))
+
+    # --- Odczyt ---
+
+    def _signature(self):
+        signature = []
+        for path in (self.snapshot_path, self.log_path):
+            try:
+                st = os.stat(path)
+                signature.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    def _read_snapshot(self):
+        try:
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+            return snapshot.get("seq", 0), snapshot.get("state")
+        except FileNotFoundError:
+            pass
+        if self.bootstrap_file:
+            try:
+                with open(self.bootstrap_file, 'r', encoding='utf-8') as f:
+                    return 0, json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                return 0, None
+        return 0, None
+
+    def _replay(self):
+        snapshot_seq, state = self._read_snapshot()
+        seq = snapshot_seq
+        if state is not None:
+            try:
+                with open(self.log_path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        if not line.strip():
+                            continue
+                        try:
+                            event = json.loads(line)
+                        except json.JSONDecodeError:
+                            # Urwana ostatnia linia (np. po awarii) - pomijamy
+                            break
+                        if event["seq"] <= seq:
+                            continue
+                        apply_patch(state, event["patch"])
+                        seq = event["seq"]
+            except FileNotFoundError:
+                pass
+        self._state = state
+        self._seq = seq
+        self._snapshot_seq = snapshot_seq
+        self._disk_signature = self._signature()
+
+    def _refresh(self):
+        if self._state is None or self._signature() != self._disk_signature:
+            self._replay()
+
+    def load(self):
+        with self._lock:
+            self._refresh()
+            if self._state is None:
+                return None
+            return clone(self._state)
+
+    def version(self):
+        """Wersja zapisanego stanu (None, jeśli go nie ma) - bez kopiowania stanu."""
+        with self._lock:
+            self._refresh()
+            return state_version(self._state) if self._state is not None else None
+
+    # --- Zapis ---
+
+    def _append(self, record):
+        os.makedirs(self.directory, exist_ok=True)
+        line = json.dumps(record, ensure_ascii=False, separators=(',', ':'))
+        with open(self.log_path, 'a', encoding='utf-8') as f:
+            f.write(line + "\n")
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+
+    def _write_snapshot(self, state):
+        os.makedirs(self.directory, exist_ok=True)
+        write_json_atomic(self.snapshot_path, {"seq": self._seq, "state": state}, fsync=self.fsync,
+                           separators=(',', ':'))
+        # Zdarzenia do `seq` są już w migawce - dziennik można wyczyścić
+        with open(self.log_path, 'w', encoding='utf-8'):
+            pass
+        self._snapshot_seq = self._seq
+
+    def save(self, state, action=None):
+        with self._lock:
+            self._refresh()
+            previous = self._state
+            if previous is None:
+                return self._replace(state, action)
+
+            expected = state_version(state)
+            current = state_version(previous)
+            if expected != current:
+                raise StaleStateError(self.game_id, expected, current)
+
+            patch = diff(previous, state)
+            if not patch:
+                return True
+            state["version"] = current + 1
+            patch.append(["s", ["version"], current + 1])
+            if self._append_patch(previous, state, action, patch):
+                return True
+            state["version"] = current
+            return False
+
+    def _append_patch(self, previous, state, action, patch):
+        try:
+            round_ended = previous.get("round") != state.get("round")
+            self._seq += 1
+            self._append({"seq": self._seq, "action": action, "patch": patch})
+            # Własną kopię aktualizujemy łatką - koszt zależy od rozmiaru zmiany
+            apply_patch(previous, patch)
+
+            if round_ended or self._seq - self._snapshot_seq >= self.snapshot_every:
+                self._write_snapshot(previous)
+            self._disk_signature = self._signature()
+            return True
+        except IOError:
+            print(f"Error: Could not append to event log {self.log_path}")
+            # Stan w pamięci mógł się rozjechać z dyskiem - wczytaj od nowa
+            self._state = None
+            return False
+
+    def replace(self, state, action=None):
+        """Zastępuje cały stan (pełny reset, edycja JSON) - zapisuje nową migawkę."""
+        with self._lock:
+            self._refresh()
+            return self._replace(state, action)
+
+    def persist(self, state, action=None):
+        with self._lock:
+            self._refresh()
+            if self._state is None:
+                return self._write_full(state)
+            patch = diff(self._state, state)
+            if not patch:
+                return True
+            return self._append_patch(self._state, state, action, patch)
+
+    def _replace(self, state, action):
+        state["version"] = state_version(self._state) + 1
+        return self._write_full(state)
+
+    def _write_full(self, state):
+        try:
+            self._seq += 1
+            self._state = clone(state)
+            self._write_snapshot(self._state)
+            self._disk_signature = self._signature()
+            return True
+        except IOError:
+            print(f"Error: Could not write snapshot {self.snapshot_path}")
+            self._state = None
+            return False
+
+
+class SqliteDatabase:
+    """
+    Baza SQLite z wieloma grami. Każdy wątek dostaje własne połączenie
+    (sqlite3 nie pozwala współdzielić połączeń między wątkami); tryb WAL
+    pozwala czytać równolegle z zapisem.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS games (
+            game_id    TEXT PRIMARY KEY,
+            state      TEXT NOT NULL,
+            version    INTEGER NOT NULL DEFAULT 0,
+            updated_at REAL NOT NULL DEFAULT (julianday('now'))
+        )
+    """
+
+    def __init__(self, path, busy_timeout=5.0, fsync=False):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        # FULL: fsync przy każdym zatwierdzeniu; NORMAL: tylko przy checkpoincie WAL
+        self.synchronous = "FULL" if fsync else "NORMAL"
+        self._local = threading.local()
+        conn = self.connection()
+        conn.execute(self.SCHEMA)
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(games)")]
+        if "version" not in columns:
+            conn.execute("ALTER TABLE games ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+
+    def connection(self):
+        """Połączenie bieżącego wątku (autocommit - pojedyncze odczyty)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"PRAGMA synchronous={self.synchronous}")
+            self._local.conn = conn
+        return conn
+
+    def transaction(self):
+        """`with db.transaction() as conn:` - BEGIN IMMEDIATE ... COMMIT/ROLLBACK."""
+        return _Transaction(self.connection())
+
+    def list_games(self):
+        return [row[0] for row in self.connection().execute("SELECT game_id FROM games ORDER BY game_id")]
+
+
+class _Transaction:
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
+
+
+class SqliteStore:
+    """Stan jednej gry (`game_id`) w bazie SqliteDatabase."""
+
+    def __init__(self, database, game_id="default", bootstrap_file=None):
+        self.database = database
+        self.game_id = game_id
+        self.bootstrap_file = bootstrap_file
+
+    def load(self):
+        row = self.database.connection().execute(
+            "SELECT state FROM games WHERE game_id = ?", (self.game_id,)).fetchone()
+        if row is not None:
+            return json.loads(row[0])
+        if self.bootstrap_file:
+            try:
+                with open(self.bootstrap_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                return None
+        return None
+
+    def version(self):
+        """Wersja zapisanego stanu (None, jeśli go nie ma) - bez odczytu kolumny `state`."""
+        row = self.database.connection().execute(
+            "SELECT version FROM games WHERE game_id = ?", (self.game_id,)).fetchone()
+        if row is not None:
+            return row[0]
+        bootstrap = self.load()
+        return state_version(bootstrap) if bootstrap is not None else None
+
+    def _write(self, conn, state, version, exists):
+        state["version"] = version
+        data = json.dumps(state, ensure_ascii=False, separators=(',', ':'))
+        if exists:
+            conn.execute(
+                "UPDATE games SET state = ?, version = ?, updated_at = julianday('now') WHERE game_id = ?",
+                (data, version, self.game_id))
+        else:
+            conn.execute("INSERT INTO games (game_id, state, version) VALUES (?, ?, ?)",
+                         (self.game_id, data, version))
+
+    def save(self, state, action=None):
+        expected = state_version(state)
+        try:
+            with self.database.transaction() as conn:
+                row = conn.execute("SELECT version FROM games WHERE game_id = ?", (self.game_id,)).fetchone()
+                if row is not None and row[0] != expected:
+                    raise StaleStateError(self.game_id, expected, row[0])
+                self._write(conn, state, expected + 1, row is not None)
+            return True
+        except sqlite3.Error as e:
+            state["version"] = expected
+            print(f"Error: Could not save game {self.game_id} to {self.database.path}: {e}")
+            return False
+
+    def replace(self, state, action=None):
+        try:
+            with self.database.transaction() as conn:
+                row = conn.execute("SELECT version FROM games WHERE game_id = ?", (self.game_id,)).fetchone()
+                self._write(conn, state, (row[0] if row else 0) + 1, row is not None)
+            return True
+        except sqlite3.Error as e:
+            print(f"Error: Could not save game {self.game_id} to {self.database.path}: {e}")
+            return False
+
+    def persist(self, state, action=None):
+        try:
+            with self.database.transaction() as conn:
+                row = conn.execute("SELECT version FROM games WHERE game_id = ?", (self.game_id,)).fetchone()
+                self._write(conn, state, state_version(state), row is not None)
+            return True
+        except sqlite3.Error as e:
+            print(f"Error: Could not save game {self.game_id} to {self.database.path}: {e}")
+            return False
+
+
+class WriteBehindStore:
+    """
+    Stan w pamięci jako źródło prawdy + zapis w tle do magazynu `inner`.
+
+    save()/replace() sprawdzają i podbijają wersję stanu w pamięci, po czym
+    budzą wątek zapisu. Wątek czeka najwyżej `max_staleness` sekund od
+    pierwszej niezapisanej zmiany i zapisuje ostatni stan jednym
+    inner.persist() - seria szybkich akcji to jeden zapis na dysk, a akcje
+    trafiają do dziennika jako jedna akcja "batch". flush() zapisuje
+    natychmiast (zamknięcie serwera). Gdy nie ma niezapisanych zmian, zmiana
+    wersji w `inner` (np. zapis z innego procesu) powoduje ponowne
+    wczytanie; niezapisane zmiany zawsze wygrywają, więc ten tryb jest dla
+    jednego procesu serwera.
+    """
+
+    def __init__(self, inner, max_staleness=0.5):
+        self.inner = inner
+        self.game_id = inner.game_id
+        self.max_staleness = max_staleness
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._flush_lock = threading.Lock()
+        self._state = None              # stan w pamięci (nigdy nie zmieniany w miejscu)
+        self._persisted_version = None  # wersja ostatnio zapisana w `inner`
+        self._pending = []              # akcje od ostatniego zapisu
+        self._dirty_since = None        # time.monotonic() pierwszej niezapisanej zmiany
+        self._thread = None
+        self.saves = 0
+        self.flushes = 0
+
+    def _current(self):
+        """Stan w pamięci; wczytuje go z `inner`, jeśli nie ma niezapisanych zmian, a `inner` się zmienił."""
+        if self._state is not None and state_version(self._state) != self._persisted_version:
+            return self._state
+        disk_version = self.inner.version()
+        if disk_version is not None and (self._state is None or disk_version != self._persisted_version):
+            self._state = self.inner.load()
+            self._persisted_version = state_version(self._state) if self._state is not None else None
+        return self._state
+
+    def load(self):
+        with self._lock:
+            state = self._current()
+            return clone(state) if state is not None else None
+
+    def version(self):
+        with self._lock:
+            state = self._current()
+            return state_version(state) if state is not None else None
+
+    def save(self, state, action=None):
+        with self._lock:
+            current_state = self._current()
+            expected = state_version(state)
+            if current_state is not None and state_version(current_state) != expected:
+                raise StaleStateError(self.game_id, expected, state_version(current_state))
+            state["version"] = expected + 1
+            self._remember(state, action)
+            return True
+
+    def replace(self, state, action=None):
+        with self._lock:
+            state["version"] = state_version(self._current()) + 1
+            self._remember(state, action)
+            return True
+
+    def _remember(self, state, action):
+        self._state = clone(state)
+        if action is not None:
+            self._pending.append(action)
+        self.saves += 1
+        if self._dirty_since is None:
+            self._dirty_since = time.monotonic()
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=f"write-behind-{self.game_id}", daemon=True)
+            self._thread.start()
+        self._changed.notify()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while self._dirty_since is None:
+                    self._changed.wait()
+                delay = self._dirty_since + self.max_staleness - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self.flush()
+
+    def pending(self):
+        """Czy są zmiany jeszcze niezapisane w `inner`."""
+        with self._lock:
+            return self._dirty_since is not None
+
+    def flush(self):
+        """Zapisuje niezapisany stan teraz. Zwraca False, jeśli zapis się nie powiódł."""
+        with self._flush_lock:
+            with self._lock:
+                if self._dirty_since is None:
+                    return True
+                state = self._state
+                actions, self._pending = self._pending, []
+                self._dirty_since = None
+            action = actions[0] if len(actions) == 1 else {"type": "batch", "actions": actions}
+            saved = self.inner.persist(state, action)
+            with self._lock:
+                if saved:
+                    self._persisted_version = state_version(state)
+                    self.flushes += 1
+                else:
+                    # Spróbujemy ponownie po kolejnym max_staleness
+                    self._pending = actions + self._pending
+                    if self._dirty_since is None:
+                        self._dirty_since = time.monotonic()
+                    self._changed.notify()
+            return saved
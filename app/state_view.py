@@ -0,0 +1,87 @@
+# app/state_view.py
+"""
+Widoki stanu gry z ukrytymi polami - bez kopiowania stanu.
+
+Maska opisuje, co ukryć:
+    {"round_history": HIDDEN,
+     "players": {"Ja": {"draw_deck": HIDDEN},
+                 "*":  {"hand": HIDDEN, "deck_pool": HIDDEN}}}
+Klucz z wartością HIDDEN znika z widoku, słownik oznacza maskę dla
+wartości pod tym kluczem, a "*" dotyczy wszystkich kluczy bez własnego
+wpisu. redacted_view tworzy nowe słowniki tylko na ścieżkach maski (stan,
+"players", każdy gracz) - reszta stanu (karty, historia, konflikt, ...) jest
+współdzielona z oryginałem, więc koszt nie rośnie z rozmiarem talii ani
+historii. Widok służy wyłącznie do odczytu/serializacji: zmiana
+współdzielonej wartości zmieniłaby stan gry.
+"""
+import json
+
+from card_zones import CardZone
+
+HIDDEN = None
+WILDCARD = "*"
+
+# Pola prywatne gracza (karty w ręce i talii, intrygi) oraz dane pochodne
+PRIVATE_PLAYER_FIELDS = ("hand", "deck_pool", "draw_deck", "intrigue_hand")
+DERIVED_PLAYER_FIELDS = ("reveal_counters",)
+
+
+def hide(*keys):
+    """Maska ukrywająca podane klucze."""
+    return {key: HIDDEN for key in keys}
+
+
+def merge_masks(*masks):
+    """Łączy maski (późniejsze wpisy dla tego samego klucza są scalane rekurencyjnie)."""
+    merged = {}
+    for mask in masks:
+        for key, sub_mask in mask.items():
+            current = merged.get(key, {})
+            if sub_mask is HIDDEN or current is HIDDEN:
+                merged[key] = HIDDEN
+            else:
+                merged[key] = merge_masks(current, sub_mask)
+    return merged
+
+
+def player_mask(visible_player=None, visible_fields=()):
+    """
+    Maska stanu dla widza `visible_player` (None - widok publiczny). Pola
+    prywatne innych graczy są ukryte; widz widzi ze swoich pól prywatnych
+    tylko te z `visible_fields`.
+    """
+    players = {WILDCARD: hide(*PRIVATE_PLAYER_FIELDS, *DERIVED_PLAYER_FIELDS)}
+    if visible_player is not None:
+        players[visible_player] = hide(
+            *(field for field in PRIVATE_PLAYER_FIELDS if field not in visible_fields), *DERIVED_PLAYER_FIELDS
+        )
+    return {"players": players}
+
+
+PUBLIC_MASK = player_mask()
+
+
+def redacted_view(value, mask):
+    """Zwraca widok `value` bez pól ukrytych przez `mask` (współdzieli resztę)."""
+    if not mask or not isinstance(value, dict):
+        return value
+    default = mask.get(WILDCARD, {})
+    view = {}
+    for key, item in value.items():
+        sub_mask = mask.get(key, default)
+        if sub_mask is HIDDEN:
+            continue
+        view[key] = redacted_view(item, sub_mask) if sub_mask else item
+    return view
+
+
+def json_default(value):
+    """`default` dla json.dumps: strefy kart CardZone jako listy."""
+    if type(value) is CardZone:
+        return value.to_json()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps_view(game_state, mask, **kwargs):
+    """Serializuje widok stanu do JSON (argumenty jak w json.dumps)."""
+    return json.dumps(redacted_view(game_state, mask), default=json_default, **kwargs)
@@ -0,0 +1,92 @@
+// Zmiany stanu na żywo (/events, live_updates.py).
+// Strona trzyma wycinek stanu (PAGE_STATE_KEYS) i poprawia go łatkami
+// ["s", ścieżka, wartość] / ["a", ścieżka, elementy] / ["d", ścieżka],
+// a resztę danych dostaje jako gotowe widoki ("table", "reveal").
+
+// Zwraca false, jeśli operacji nie da się zastosować (strona musi się przeładować)
+function applyLiveOp(state, op) {
+    const kind = op[0];
+    const path = op[1];
+    if (!(path[0] in state)) {
+        return true;  // poza wycinkiem strony - nieistotne
+    }
+    let target = state;
+    for (let i = 0; i < path.length - 1; i++) {
+        target = target[path[i]];
+        if (target === null || typeof target !== 'object') {
+            return false;
+        }
+    }
+    const key = path[path.length - 1];
+    if (kind === 's') {
+        target[key] = op[2];
+    } else if (kind === 'a' && Array.isArray(target[key])) {
+        target[key].push(...op[2]);
+    } else if (kind === 'd') {
+        if (path.length === 1) {
+            target[key] = null;
+        } else {
+            delete target[key];
+        }
+    } else {
+        return false;
+    }
+    return true;
+}
+
+function connectLiveUpdates(eventsUrl, pageState, onUpdate) {
+    if (!window.EventSource) {
+        return null;
+    }
+    const source = new EventSource(`${eventsUrl}?since=${pageState.version || 0}`);
+    const reload = function() {
+        source.close();
+        window.location.reload();
+    };
+
+    source.addEventListener('patch', function(event) {
+        const message = JSON.parse(event.data);
+        if (message.base !== (pageState.version || 0)) {
+            reload();
+            return;
+        }
+        for (const op of message.patch) {
+            if (!applyLiveOp(pageState, op)) {
+                reload();
+                return;
+            }
+        }
+        pageState.version = message.version;
+        onUpdate(pageState, message.views || {});
+    });
+    source.addEventListener('reload', reload);
+    return source;
+}
+
+function renderLiveHistory(listElement, history, emptyText) {
+    listElement.innerHTML = '';
+    if (!history || history.length === 0) {
+        const item = document.createElement('li');
+        item.textContent = emptyText;
+        listElement.appendChild(item);
+        return;
+    }
+    history.forEach(function(move) {
+        const item = document.createElement('li');
+        item.textContent = (move && move.summary) ? move.summary : JSON.stringify(move);
+        listElement.appendChild(item);
+    });
+}
+
+function renderLiveConflict(conflictElement, conflict, emptyText) {
+    conflict = conflict || { name: 'N/A', rewards_text: [] };
+    conflictElement.querySelector('.conflict-name').textContent = conflict.name;
+    const list = conflictElement.querySelector('ul');
+    list.innerHTML = '';
+    const rewards = conflict.rewards_text || [];
+    (rewards.length ? rewards : [emptyText]).forEach(function(reward) {
+        const item = document.createElement('li');
+        item.textContent = reward;
+        list.appendChild(item);
+    });
+}
@@ -0,0 +1,71 @@
+# benchmarks/_common.py
+"""Wspólne narzędzia benchmarków: ścieżki, stałe fixture'y i pomiar czasu."""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_DIR = os.path.join(ROOT_DIR, 'app')
+
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
+
+SAMPLE_STATE_FILE = os.path.join(APP_DIR, 'game_stat.json')
+DEFAULT_STATE_FILE = os.path.join(APP_DIR, 'game_stat.DEFAULT.json')
+
+
+def load_sample_state(path=SAMPLE_STATE_FILE):
+    """Wczytuje przykładowy stan gry (świeża kopia przy każdym wywołaniu)."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class TempStateDir:
+    """
+    Kontekst, który przekierowuje GAME_STATE_FILE do katalogu tymczasowego,
+    aby benchmarki nigdy nie nadpisywały app/game_stat.json.
+    """
+
+    def __init__(self, state=None):
+        self.state = state
+        self.path = None
+        self._dir = None
+        self._saved = None
+
+    def __enter__(self):
+        import game_manager
+        self._dir = tempfile.mkdtemp(prefix='dune_bench_')
+        self.path = os.path.join(self._dir, 'game_stat.json')
+        if self.state is None:
+            shutil.copyfile(SAMPLE_STATE_FILE, self.path)
+        else:
+            self.write(self.state)
+        self._saved = game_manager.GAME_STATE_FILE
+        game_manager.GAME_STATE_FILE = self.path
+        return self
+
+    def write(self, state):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2, ensure_ascii=False)
+
+    def __exit__(self, *exc):
+        import game_manager
+        game_manager.GAME_STATE_FILE = self._saved
+        shutil.rmtree(self._dir, ignore_errors=True)
+        return False
+
+
+def measure(fn, repeat=200, warmup=5):
+    """Zwraca (średnia, mediana) czasu wywołania `fn` w milisekundach."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000.0)
+    samples.sort()
+    return sum(samples) / len(samples), samples[len(samples) // 2]
@@ -0,0 +1,95 @@
+# benchmarks/bench_action_batch.py
+"""
+Lista akcji jednym zapisem (/api/actions) vs cykl wczytaj/wykonaj/zapisz na akcję.
+
+Nagrywa grę symulatorem (replay.record_game) i dzieli jej akcje na ciągi
+akcji graczy (ruchy agentów, pasy, intrygi, zakupy, wojska) przerywane
+akcjami "stołu" (nowa runda, konflikt; znaczniki tury symulatora są
+pomijane - jak przy przepisywaniu rundy z kartki). Każdy ciąg jest wykonywany:
+    - per-action: dla każdej akcji wczytanie stanu, walidacja i wykonanie
+      (action_batch z listą jednej akcji), zapis,
+    - batch: jedno wczytanie, apply_batch na całym ciągu, jeden zapis.
+Magazyn to plik JSON w katalogu tymczasowym. Sprawdza, że oba sposoby dają
+ten sam stan końcowy.
+
+Użycie:
+    python benchmarks/bench_action_batch.py [--seed 1] [--games 3]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import _common  # noqa: F401 - ścieżka do app/
+
+from action_batch import apply_batch, BATCH_HANDLERS
+from replay import record_game, replay_catalogs, apply_action, state_hash
+from state_diff import clone
+from state_store import JsonFileStore
+
+
+def _segments(actions):
+    """[(akcje stołu przed ciągiem, ciąg akcji graczy), ...]"""
+    segments, table, batch = [], [], []
+    for action in actions:
+        if action["type"] == "set_current_player":
+            continue    # znacznik tury symulatora - nie wpływa na legalność akcji
+        if action["type"] in BATCH_HANDLERS:
+            batch.append(action)
+            continue
+        if batch:
+            segments.append((table, batch))
+            table, batch = [], []
+        table.append(action)
+    segments.append((table, batch))
+    return segments
+
+
+def _run(recording, dbs, batched):
+    directory = tempfile.mkdtemp(prefix='dune_bench_')
+    try:
+        store = JsonFileStore(os.path.join(directory, 'game_stat.json'))
+        store.replace(clone(recording["initial_state"]))
+        elapsed = 0.0
+        saves = 0
+        for table, batch in _segments(recording["actions"]):
+            game_state = store.load()
+            for action in table:
+                apply_action(game_state, action, dbs)
+            store.save(game_state)
+            if not batch:
+                continue
+            start = time.perf_counter()
+            chunks = [batch] if batched else [[action] for action in batch]
+            for chunk in chunks:
+                new_state, _, logged = apply_batch(store.load(), chunk, dbs)
+                store.save(new_state, {"type": "batch", "actions": logged})
+                saves += 1
+            elapsed += time.perf_counter() - start
+        final_state = store.load()
+        final_state.pop("version", None)   # liczba zapisów różni się między trybami
+        return elapsed, saves, state_hash(final_state)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--games', type=int, default=3)
+    args = parser.parse_args()
+
+    dbs = replay_catalogs()
+    print(f"{'game':>5} {'actions':>8} {'per-action ms':>14} {'saves':>6} {'batch ms':>9} {'saves':>6} {'speedup':>8}")
+    for game in range(args.games):
+        recording = record_game(args.seed + game, compact_zones=False)
+        single_s, single_saves, single_hash = _run(recording, dbs, batched=False)
+        batch_s, batch_saves, batch_hash = _run(recording, dbs, batched=True)
+        assert single_hash == batch_hash, "Batched actions produced a different final state"
+        print(f"{game:>5} {single_saves:>8} {single_s * 1000:>14.1f} {single_saves:>6} {batch_s * 1000:>9.1f} "
+              f"{batch_saves:>6} {single_s / batch_s:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
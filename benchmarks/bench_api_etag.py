@@ -0,0 +1,64 @@
+# benchmarks/bench_api_etag.py
+"""
+API stanu z ETagiem: koszt odpowiedzi 304 vs pełnej odpowiedzi JSON.
+
+Dla każdego backendu magazynu (json / events / sqlite) z przykładowym
+stanem mierzy:
+    - 304: odczyt samej wersji (store.version()), jak /api/state z
+      aktualnym If-None-Match,
+    - 200: wczytanie stanu i zwarty JSON (jak /api/state),
+    - debug: wczytanie stanu i JSON z wcięciami (jak /debug_json),
+oraz rozmiar odpowiedzi w bajtach.
+
+Użycie:
+    python benchmarks/bench_api_etag.py [--repeat 200]
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+
+from _common import load_sample_state, measure
+
+from state_store import JsonFileStore, EventLogStore, SqliteDatabase, SqliteStore
+from state_view import redacted_view, json_default, hide, DERIVED_PLAYER_FIELDS
+
+API_STATE_MASK = {"players": {"*": hide(*DERIVED_PLAYER_FIELDS)}}
+
+
+def _stores(directory):
+    yield "json", JsonFileStore(os.path.join(directory, 'game_stat.json'))
+    yield "events", EventLogStore(os.path.join(directory, 'events'))
+    yield "sqlite", SqliteStore(SqliteDatabase(os.path.join(directory, 'games.db')))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='dune_bench_')
+    try:
+        print(f"{'backend':<8} {'304 us':>8} {'200 us':>8} {'debug us':>9} {'200 bytes':>10} {'debug bytes':>12}")
+        for name, store in _stores(directory):
+            store.replace(load_sample_state())
+
+            def compact():
+                return json.dumps(redacted_view(store.load(), API_STATE_MASK), ensure_ascii=False,
+                                  separators=(',', ':'), default=json_default)
+
+            def debug():
+                return json.dumps(store.load(), indent=2, ensure_ascii=False)
+
+            _, not_modified_ms = measure(store.version, repeat=args.repeat)
+            _, compact_ms = measure(compact, repeat=args.repeat)
+            _, debug_ms = measure(debug, repeat=args.repeat)
+            print(f"{name:<8} {not_modified_ms * 1000:>8.1f} {compact_ms * 1000:>8.1f} {debug_ms * 1000:>9.1f} "
+                  f"{len(compact().encode('utf-8')):>10,} {len(debug().encode('utf-8')):>12,}")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
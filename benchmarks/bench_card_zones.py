@@ -0,0 +1,72 @@
+# benchmarks/bench_card_zones.py
+"""
+Strefy kart jako listy vs CardZone (internowane identyfikatory w array('H')).
+
+Dla obu reprezentacji mierzy:
+  - pamięć jednego stanu gry w trakcie rozgrywki (po kilku rundach
+    symulatora) oraz samych stref kart - suma sys.getsizeof kontenerów;
+    napisy pominięte, bo klony stanu współdzielą je z katalogiem,
+  - czas klonowania stanu (state_diff.clone - kopia na każdą dogrywkę),
+  - ruchy/s symulatora dla polityk random i greedy (greedy klonuje stan dla
+    każdego kandydata na ruch).
+Wyniki gier są identyczne w obu trybach (ta sama kolejność losowań).
+
+Użycie:
+    python benchmarks/bench_card_zones.py [--games 200] [--seed 1]
+"""
+import argparse
+import random
+import sys
+
+from _common import measure
+
+import game_manager
+import simulator
+from card_zones import ZONE_KEYS, CardZone, compact_state
+from state_diff import clone
+
+
+def _mid_game_state(seed, compact):
+    locations_db, cards_db, _, conflicts_db, leaders_db = game_manager.load_catalogs()
+    state = game_manager.build_new_game_state(seed=seed)
+    if compact:
+        compact_state(state, cards_db)
+    rng = random.Random(seed)
+    policies = {name: simulator.RandomPolicy() for name in state["players"]}
+    game_manager.process_conflict_set(state, conflicts_db, rng.choice(sorted(conflicts_db)))
+    simulator.play_game(state, policies, rng, (locations_db, cards_db, leaders_db), conflicts_db, max_rounds=4)
+    return state
+
+
+def _deep_size(value):
+    """Bajty kontenerów (dict/list/CardZone) w `value`, bez napisów i małych liczb."""
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_deep_size(item) for item in value.values())
+    if isinstance(value, list):
+        return sys.getsizeof(value) + sum(_deep_size(item) for item in value)
+    if type(value) is CardZone:
+        return sys.getsizeof(value)
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--games', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'zones':>6} {'state B':>8} {'zones B':>8} {'clone us':>9} {'random mv/s':>12} {'greedy mv/s':>12}")
+    for compact in (False, True):
+        state = _mid_game_state(args.seed, compact)
+        state_bytes = _deep_size(state)
+        zone_bytes = sum(_deep_size(player_state[key]) for player_state in state["players"].values()
+                         for key in ZONE_KEYS if key in player_state)
+        _, clone_ms = measure(lambda: clone(state), repeat=2000)
+        random_report = simulator.run_simulation(args.games, ["random"], args.seed, compact_zones=compact)
+        greedy_report = simulator.run_simulation(max(1, args.games // 20), ["greedy"], args.seed, compact_zones=compact)
+        print(f"{'array' if compact else 'list':>6} {state_bytes:>8,} {zone_bytes:>8,} {clone_ms * 1000:>9.1f} "
+              f"{random_report['moves_per_sec']:>12,.0f} {greedy_report['moves_per_sec']:>12,.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+# benchmarks/bench_catalog.py
+"""
+Porównuje czas obsługi żądań GET (`/g/default/`, `/reveal`, `/ai_prompt`) z zimnym
+katalogiem (parsowanie wszystkich plików JSON przy każdym żądaniu, jak przed
+wprowadzeniem cache) i z ciepłym procesowym cache katalogów.
+
+Użycie:
+    python benchmarks/bench_catalog.py [--repeat N]
+"""
+import argparse
+
+from _common import TempStateDir, load_sample_state, measure
+
+import game_manager
+from app import app
+
+
+def _bench_route(client, url, repeat):
+    status = client.get(url).status_code
+    assert status == 200, f"GET {url} returned {status}"
+
+    def request_cold():
+        game_manager.CATALOG.clear()
+        client.get(url)
+
+    def request_warm():
+        client.get(url)
+
+    cold_mean, cold_median = measure(request_cold, repeat=repeat)
+    warm_mean, warm_median = measure(request_warm, repeat=repeat)
+    return cold_mean, cold_median, warm_mean, warm_median
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    agent_state = load_sample_state()
+    agent_state["current_phase"] = "AGENT_TURN"
+    reveal_state = load_sample_state()
+    reveal_state["current_phase"] = "REVEAL"
+
+    client = app.test_client()
+    prefix = f'/g/{game_manager.DEFAULT_GAME_ID}'
+    cases = [
+        (f'{prefix}/', agent_state),
+        (f'{prefix}/reveal', reveal_state),
+        (f'{prefix}/ai_prompt', agent_state),
+    ]
+
+    print(f"{'route':<20} {'cold mean':>10} {'cold p50':>10} {'warm mean':>10} {'warm p50':>10} {'speedup':>8}")
+    for url, state in cases:
+        with TempStateDir(state):
+            cold_mean, cold_median, warm_mean, warm_median = _bench_route(client, url, args.repeat)
+        speedup = cold_mean / warm_mean if warm_mean else float('inf')
+        print(f"{url:<20} {cold_mean:>8.3f}ms {cold_median:>8.3f}ms {warm_mean:>8.3f}ms {warm_median:>8.3f}ms {speedup:>7.2f}x")
+
+    stats = game_manager.CATALOG.stats()
+    print(f"\nCatalog cache: {stats['hits']} hits / {stats['misses']} misses")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+# benchmarks/bench_effects.py
+"""
+Mikrobenchmark process_move: ruchy/s dla każdej pary karta x lokacja.
+
+"before" to interpreter surowych list akcji z game_manager.py w podanej
+rewizji git (domyślnie pierwszy commit repozytorium), "after" to bieżący
+silnik wykonujący skompilowane plany efektów.
+
+Użycie:
+    python benchmarks/bench_effects.py [--rounds N] [--baseline-rev REV]
+"""
+import argparse
+import copy
+import importlib.util
+import os
+import subprocess
+import tempfile
+import time
+
+from _common import APP_DIR, ROOT_DIR, load_sample_state
+
+import game_manager
+
+MOVE_KWARGS = {"pay_cost": True, "choice_index": 0}
+
+
+def _load_baseline_module(rev):
+    source = subprocess.check_output(['git', 'show', f'{rev}:app/game_manager.py'], cwd=ROOT_DIR)
+    tmp_dir = tempfile.mkdtemp(prefix='dune_baseline_')
+    path = os.path.join(tmp_dir, 'game_manager_baseline.py')
+    with open(path, 'wb') as f:
+        f.write(source)
+    spec = importlib.util.spec_from_file_location('game_manager_baseline', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _root_revision():
+    output = subprocess.check_output(['git', 'rev-list', '--max-parents=0', 'HEAD'], cwd=ROOT_DIR, text=True)
+    return output.split()[0]
+
+
+def _playable_pairs(engine, dbs, player_name, base_state):
+    """Pary (karta, lokacja), które dany silnik wykonuje bez wyjątku."""
+    locations_db, cards_db, leaders_db = dbs
+    pairs = []
+    for card_id in cards_db:
+        for location_id in locations_db:
+            state = copy.deepcopy(base_state)
+            try:
+                engine.process_move(state, locations_db, cards_db, leaders_db, player_name, card_id, location_id, **MOVE_KWARGS)
+            except Exception:
+                continue
+            pairs.append((card_id, location_id))
+    return pairs
+
+
+def _moves_per_second(engine, dbs, player_name, base_state, pairs, rounds):
+    locations_db, cards_db, leaders_db = dbs
+    total_moves = 0
+    total_time = 0.0
+    for _ in range(rounds):
+        states = [copy.deepcopy(base_state) for _ in pairs]
+        start = time.perf_counter()
+        for state, (card_id, location_id) in zip(states, pairs):
+            engine.process_move(state, locations_db, cards_db, leaders_db, player_name, card_id, location_id, **MOVE_KWARGS)
+        total_time += time.perf_counter() - start
+        total_moves += len(pairs)
+    return total_moves / total_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--baseline-rev', default=None)
+    parser.add_argument('--player', default=game_manager.AI_PLAYER_NAME)
+    args = parser.parse_args()
+
+    rev = args.baseline_rev or _root_revision()
+    baseline = _load_baseline_module(rev)
+
+    base_state = load_sample_state()
+    for player_data in base_state["players"].values():
+        player_data["resources"].update(solari=10, Spice=10, water=5)
+
+    current_dbs = (game_manager.CATALOG.get("locations"), game_manager.CATALOG.get("cards"), game_manager.CATALOG.get("leaders"))
+    load = baseline.load_json_file
+    baseline_dbs = tuple(load(os.path.join(APP_DIR, name)) for name in ('locations.json', 'cards.json', 'leaders.json'))
+
+    # Porównujemy tylko pary, które oba silniki potrafią wykonać
+    baseline_pairs = set(_playable_pairs(baseline, baseline_dbs, args.player, base_state))
+    pairs = [pair for pair in _playable_pairs(game_manager, current_dbs, args.player, base_state) if pair in baseline_pairs]
+
+    before = _moves_per_second(baseline, baseline_dbs, args.player, base_state, pairs, args.rounds)
+    after = _moves_per_second(game_manager, current_dbs, args.player, base_state, pairs, args.rounds)
+
+    print(f"pairs: {len(pairs)} (card x location, player {args.player}), baseline rev {rev[:10]}")
+    print(f"before (interpreted): {before:>12,.0f} moves/s")
+    print(f"after  (compiled):    {after:>12,.0f} moves/s")
+    print(f"speedup: {after / before:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+# benchmarks/bench_event_log.py
+"""
+Koszt zapisu jednej akcji: pełny zapis game_stat.json vs dziennik zdarzeń.
+
+Stan startowy to przykładowy game_stat.json z historią sztucznie wydłużoną
+do zadanej liczby wpisów (symulacja długiej gry). Każda akcja dopisuje wpis
+do round_history i zmienia jeden zasób gracza - tak jak typowy ruch.
+Na koniec mierzone jest odtwarzanie: wczytanie samej migawki i migawki z
+dziennikiem przez nowe instancje magazynu (sprawdzając, że odtworzony stan
+jest identyczny z zapisanym) oraz przepustowość samego nakładania zdarzeń
+(zdarzenia/s).
+
+Użycie:
+    python benchmarks/bench_event_log.py [--actions N] [--history 0,1000,5000]
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from _common import load_sample_state
+
+from state_diff import apply_patch, clone
+from state_store import EventLogStore, JsonFileStore
+
+
+def _grow_history(state, entries):
+    history = state.setdefault("round_history", [])
+    template = {"player": "Peter", "card": "dune_the_desert_planet", "location": "imperial_basin",
+                "summary": "Gracz Peter zagrał kartę na Imperial Basin. | Zyskano 1 Spice."}
+    for _ in range(entries):
+        history.append(dict(template))
+
+
+def _apply_action(state, i):
+    player = sorted(state["players"])[i % len(state["players"])]
+    resources = state["players"][player]["resources"]
+    resources["solari"] = resources.get("solari", 0) + 1
+    state["round_history"].append({"player": player, "summary": f"Akcja {i}: +1 solari"})
+
+
+def _time_saves(store, state, actions):
+    start = time.perf_counter()
+    for i in range(actions):
+        _apply_action(state, i)
+        store.save(state, {"type": "bench", "i": i})
+    return (time.perf_counter() - start) * 1000.0 / actions
+
+
+def _time_fresh_load(directory, expected=None, repeat=5):
+    """Mediana czasu load() nowej instancji EventLogStore (ms)."""
+    samples = []
+    for _ in range(repeat):
+        store = EventLogStore(directory)
+        start = time.perf_counter()
+        state = store.load()
+        samples.append((time.perf_counter() - start) * 1000.0)
+        if expected is not None:
+            assert state == expected, "Replayed state differs from the saved state"
+    samples.sort()
+    return samples[len(samples) // 2]
+
+
+def _time_patches(store):
+    """Czas (s) parsowania i nałożenia wszystkich zdarzeń dziennika na stan z migawki."""
+    with open(store.snapshot_path, 'r', encoding='utf-8') as f:
+        state = json.load(f)["state"]
+    with open(store.log_path, 'r', encoding='utf-8') as f:
+        lines = [line for line in f if line.strip()]
+    start = time.perf_counter()
+    for line in lines:
+        apply_patch(state, json.loads(line)["patch"])
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--actions', type=int, default=300)
+    parser.add_argument('--history', default='0,1000,5000,20000')
+    parser.add_argument('--snapshot-every', type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"{'history':>8} {'json ms/action':>15} {'events ms/action':>17} {'speedup':>8}")
+    for history_size in [int(x) for x in args.history.split(',')]:
+        base_state = load_sample_state()
+        _grow_history(base_state, history_size)
+        tmp_dir = tempfile.mkdtemp(prefix='dune_bench_events_')
+        try:
+            json_store = JsonFileStore(os.path.join(tmp_dir, 'game_stat.json'))
+            json_ms = _time_saves(json_store, clone(base_state), args.actions)
+
+            # Bez migawek co N zdarzeń mierzymy czysty koszt dopisywania...
+            events_store = EventLogStore(os.path.join(tmp_dir, 'events'), snapshot_every=10 ** 9)
+            events_state = clone(base_state)
+            events_store.replace(events_state)
+            events_ms = _time_saves(events_store, events_state, args.actions)
+            print(f"{history_size:>8} {json_ms:>15.3f} {events_ms:>17.3f} {json_ms / events_ms:>7.1f}x")
+
+            # ...a osobno koszt zamortyzowany z migawkami
+            snap_store = EventLogStore(os.path.join(tmp_dir, 'snap'), snapshot_every=args.snapshot_every)
+            snap_state = clone(base_state)
+            snap_store.replace(snap_state)
+            snap_ms = _time_saves(snap_store, snap_state, args.actions)
+            print(f"{'':>8} {'':>15} {snap_ms:>17.3f}  (snapshot every {args.snapshot_every})")
+
+            # Odtwarzanie: świeże instancje czytają samą migawkę albo migawkę + dziennik
+            expected = events_store.load()
+            snapshot_dir = os.path.join(tmp_dir, 'snapshot_only')
+            os.makedirs(snapshot_dir)
+            snapshot_name = os.path.basename(events_store.snapshot_path)
+            shutil.copyfile(events_store.snapshot_path, os.path.join(snapshot_dir, snapshot_name))
+            snapshot_ms = _time_fresh_load(snapshot_dir)
+            full_ms = _time_fresh_load(events_store.directory, expected)
+            replay_s = _time_patches(events_store)
+            print(f"{'':>8} recovery: snapshot only {snapshot_ms:.1f} ms, snapshot + {args.actions} events "
+                  f"{full_ms:.1f} ms; patches alone {args.actions / replay_s:,.0f} events/s")
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
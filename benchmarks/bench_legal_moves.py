@@ -0,0 +1,89 @@
+# benchmarks/bench_legal_moves.py
+"""
+legal_moves() vs wywołanie is_move_valid() dla każdej pary karta x lokacja.
+
+Stany: przykładowy game_stat.json (faza ustawiona na AGENT_TURN) oraz jego
+warianty z losowymi rękami, zasobami i zajętością pól (stałe ziarno).
+Dla każdego stanu i gracza oba sposoby muszą dać ten sam zbiór ruchów.
+
+Użycie:
+    python benchmarks/bench_legal_moves.py [--states 200] [--seed 7]
+"""
+import argparse
+import copy
+import random
+import time
+
+from _common import load_sample_state
+
+import game_manager
+
+
+def _random_states(base_state, count, seed, locations_db, cards_db):
+    rng = random.Random(seed)
+    card_ids = sorted(cards_db)
+    states = []
+    for _ in range(count):
+        state = copy.deepcopy(base_state)
+        state["current_phase"] = "AGENT_TURN"
+        for player_data in state["players"].values():
+            player_data["hand"] = rng.sample(card_ids, rng.randint(3, 10))
+            player_data["agents_placed"] = 0
+            player_data["has_passed"] = False
+            for resource in ("solari", "Spice", "water"):
+                player_data["resources"][resource] = rng.randint(0, 10)
+        owners = [None, None] + sorted(state["players"])
+        for location_id in locations_db:
+            state["locations_state"][location_id] = {"occupied_by": rng.choice(owners)}
+        states.append(state)
+    return states
+
+
+def _brute_force(state, player_name, locations_db, cards_db, leaders_db):
+    moves = []
+    for card_id in dict.fromkeys(state["players"][player_name].get("hand", [])):
+        for location_id in locations_db:
+            if game_manager.is_move_valid(state, locations_db, leaders_db, cards_db, player_name, card_id, location_id)[0]:
+                moves.append((card_id, location_id))
+    return moves
+
+
+def _time(fn, states, dbs):
+    locations_db, cards_db, leaders_db = dbs
+    results = []
+    start = time.perf_counter()
+    for state in states:
+        for player_name in state["players"]:
+            results.append(fn(state, player_name, locations_db, cards_db, leaders_db))
+    return time.perf_counter() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--states', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    locations_db, cards_db, _, _, leaders_db = game_manager.load_catalogs()
+    dbs = (locations_db, cards_db, leaders_db)
+    base_state = load_sample_state()
+    base_state["current_phase"] = "AGENT_TURN"
+    states = [base_state] + _random_states(base_state, args.states, args.seed, locations_db, cards_db)
+
+    game_manager.move_index(locations_db, cards_db)  # indeksy budowane raz, poza pomiarem
+    brute_s, brute = _time(_brute_force, states, dbs)
+    legal_s, legal = _time(game_manager.legal_moves, states, dbs)
+
+    for expected, actual in zip(brute, legal):
+        assert set(expected) == set(actual), "legal_moves() disagrees with is_move_valid()"
+
+    calls = len(brute)
+    moves = sum(len(m) for m in legal)
+    print(f"{calls} (state, player) queries, {moves} legal moves in total")
+    print(f"is_move_valid on every pair: {brute_s / calls * 1e6:>9.1f} us/query")
+    print(f"legal_moves():               {legal_s / calls * 1e6:>9.1f} us/query")
+    print(f"speedup: {brute_s / legal_s:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
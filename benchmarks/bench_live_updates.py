@@ -0,0 +1,87 @@
+# benchmarks/bench_live_updates.py
+"""
+Rozgłaszanie zmian stołu: jedna łatka na zapis (live_updates) vs N odświeżeń.
+
+Nagrywa grę symulatorem (replay.record_game) i odtwarza ją akcja po akcji.
+Po każdej akcji stan dostaje nową wersję i:
+    - live: LIVE.publish() z N subskrybentami - jeden diff, jeden widok
+      pochodny (legalne ruchy graczy, jak widok "table"), jedna ramka SSE
+      wrzucana do N kolejek,
+    - reload: N razy to, co robi przeładowanie strony bez /events - widok
+      pochodny liczony od nowa i pełny stan serializowany do JSON
+      (renderowania szablonu nie mierzymy, Flask nie jest tu wymagany).
+Podaje średni czas na ruch i średnią liczbę bajtów na klienta.
+
+Użycie:
+    python benchmarks/bench_live_updates.py [--clients 1,4,16] [--seed 1]
+"""
+import argparse
+import json
+import time
+
+import _common  # noqa: F401 - ścieżka do app/
+
+import game_manager
+from live_updates import LiveUpdates
+from replay import record_game, replay_catalogs, apply_action
+from state_diff import clone
+
+
+def _legal_moves_view(dbs):
+    locations_db, cards_db, _, leaders_db = dbs
+
+    def view(game_state):
+        return {
+            player_name: game_manager.legal_moves(game_state, player_name, locations_db, cards_db, leaders_db)
+            for player_name in game_state.get("players", {})
+        }
+    return view
+
+
+def _run(recording, dbs, clients, mode):
+    view = _legal_moves_view(dbs)
+    live = LiveUpdates()
+    live.register_view("table", view)
+    game_state = clone(recording["initial_state"])
+    game_state["version"] = 0
+    subscriptions = [live.subscribe("bench", game_state) for _ in range(clients)]
+
+    elapsed = 0.0
+    sent_bytes = 0
+    moves = 0
+    for action in recording["actions"]:
+        apply_action(game_state, action, dbs)
+        game_state["version"] += 1
+        start = time.perf_counter()
+        if mode == "live":
+            live.publish("bench", game_state)
+        else:
+            for _ in range(clients):
+                view(game_state)
+                sent_bytes += len(json.dumps(game_state, ensure_ascii=False, default=list))
+        elapsed += time.perf_counter() - start
+        moves += 1
+        for subscription in subscriptions:
+            while (frame := subscription.next_frame(timeout=0)) is not None:
+                sent_bytes += len(frame)
+    return elapsed / moves, sent_bytes / moves / clients, moves
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--clients', default='1,4,16')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    recording = record_game(args.seed, compact_zones=False)
+    dbs = replay_catalogs()
+    print(f"{len(recording['actions'])} actions recorded (seed {args.seed})")
+    print(f"{'clients':>8} {'mode':>7} {'us/move':>9} {'bytes/client/move':>18}")
+    for clients in [int(x) for x in args.clients.split(',') if x]:
+        for mode in ("live", "reload"):
+            per_move, per_client, _ = _run(recording, dbs, clients, mode)
+            print(f"{clients:>8} {mode:>7} {per_move * 1e6:>9.0f} {per_client:>18,.0f}")
+
+
+if __name__ == '__main__':
+    main()
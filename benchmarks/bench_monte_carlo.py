@@ -0,0 +1,52 @@
+# benchmarks/bench_monte_carlo.py
+"""
+Skalowanie doradcy Monte Carlo: dogrywki/s łącznie i na rdzeń dla różnej liczby procesów.
+
+Stan: przykładowy game_stat.json (faza AGENT_TURN), gracz AI_PLAYER_NAME.
+Przy idealnym skalowaniu "per core" pozostaje stałe, a "total" rośnie
+liniowo z liczbą procesów (do liczby fizycznych rdzeni).
+
+Użycie:
+    python benchmarks/bench_monte_carlo.py [--budget 3] [--workers 1,2,4] [--policy random]
+"""
+import argparse
+import os
+
+from _common import load_sample_state
+
+import game_manager
+import monte_carlo
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--budget', type=float, default=3.0)
+    parser.add_argument('--workers', default=None, help='comma separated, default: 1,2,4,... up to cpu_count')
+    parser.add_argument('--policy', default='random')
+    args = parser.parse_args()
+
+    if args.workers:
+        worker_counts = [int(x) for x in args.workers.split(',')]
+    else:
+        worker_counts, n = [], 1
+        while n <= (os.cpu_count() or 1):
+            worker_counts.append(n)
+            n *= 2
+
+    state = load_sample_state()
+    state["current_phase"] = "AGENT_TURN"
+    player_name = game_manager.AI_PLAYER_NAME
+
+    print(f"{'workers':>8} {'playouts':>9} {'total/s':>10} {'per core/s':>11}")
+    for workers in worker_counts:
+        if workers > 1:
+            # Rozgrzewka puli procesów (uruchomienie interpreterów nie wlicza się do pomiaru)
+            monte_carlo.recommend_moves(state, player_name, time_budget=0.2, workers=workers, policy_name=args.policy, seed=1)
+        ranking, report = monte_carlo.recommend_moves(state, player_name, time_budget=args.budget, workers=workers,
+                                                      policy_name=args.policy, seed=1)
+        print(f"{workers:>8} {report['playouts']:>9} {report['playouts_per_sec']:>10,.0f} "
+              f"{report['playouts_per_sec_per_core']:>11,.0f}   best: {ranking[0]['card']} -> {ranking[0]['location']}")
+
+
+if __name__ == '__main__':
+    main()
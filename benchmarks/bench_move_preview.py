@@ -0,0 +1,90 @@
+# benchmarks/bench_move_preview.py
+"""
+Podgląd ruchów (/preview/<gracz>): czas liczenia dla każdego gracza.
+
+Stany testowe to przykładowy app/game_stat.json oraz stany z tur agentów
+gry nagranej symulatorem (replay.record_game), gdzie gracze mają pełne
+ręce. Dla każdego stanu i gracza mierzy:
+    - fork: move_preview.preview_moves (kopia stanu przez state_fork.fork),
+    - deepcopy: to samo z copy.deepcopy zamiast forka (dawny sposób),
+    - cache: ponowne PREVIEWS.preview dla tej samej wersji stanu.
+Podaje średni i największy czas na gracza oraz liczbę podglądanych ruchów.
+
+Użycie:
+    python benchmarks/bench_move_preview.py [--seed 1] [--states 20]
+"""
+import argparse
+import copy
+import time
+
+from _common import load_sample_state
+
+import move_preview
+from game_rng import seed_game
+from move_preview import PreviewCache, preview_moves
+from replay import record_game, replay_catalogs, apply_action
+from state_diff import clone
+
+
+def _states(seed, limit):
+    sample = load_sample_state()
+    seed_game(sample, seed)
+    yield sample
+    recording = record_game(seed, compact_zones=False)
+    dbs = replay_catalogs()
+    game_state = clone(recording["initial_state"])
+    yielded = 0
+    for action in recording["actions"]:
+        apply_action(game_state, action, dbs)
+        if action["type"] == "new_round" and game_state.get("current_phase") == "AGENT_TURN":
+            yield clone(game_state)
+            yielded += 1
+            if yielded >= limit:
+                return
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--states', type=int, default=20)
+    args = parser.parse_args()
+
+    dbs = replay_catalogs()
+    original_fork = move_preview.fork
+    samples = {"fork": [], "deepcopy": [], "cache": []}
+    moves = 0
+    for version, game_state in enumerate(_states(args.seed, args.states)):
+        game_state["version"] = version
+        cache = PreviewCache()
+        for player_name in game_state["players"]:
+            elapsed, rows = _timed(lambda: preview_moves(game_state, player_name, dbs))
+            samples["fork"].append(elapsed)
+            moves += len(rows)
+
+            move_preview.fork = copy.deepcopy
+            try:
+                elapsed, baseline_rows = _timed(lambda: preview_moves(game_state, player_name, dbs))
+            finally:
+                move_preview.fork = original_fork
+            samples["deepcopy"].append(elapsed)
+            assert baseline_rows == rows, "Fork preview differs from deepcopy preview"
+
+            cache.preview("bench", game_state, player_name, dbs)
+            elapsed, _ = _timed(lambda: cache.preview("bench", game_state, player_name, dbs))
+            samples["cache"].append(elapsed)
+
+    previews = len(samples["fork"])
+    print(f"{previews} player previews, {moves / previews:.1f} moves per preview on average")
+    print(f"{'mode':<9} {'mean ms':>8} {'max ms':>8}")
+    for mode, values in samples.items():
+        print(f"{mode:<9} {sum(values) / len(values) * 1000:>8.2f} {max(values) * 1000:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
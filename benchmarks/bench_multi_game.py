@@ -0,0 +1,79 @@
+# benchmarks/bench_multi_game.py
+"""
+Wiele stołów w jednym procesie: akcje/s dla backendów json, events i sqlite.
+
+Każdy wątek obsługuje własny stół (game_id) i wykonuje cykl
+wczytaj -> zmień -> zapisz, tak jak handler trasy w app.py.
+
+Użycie:
+    python benchmarks/bench_multi_game.py [--tables 32] [--actions 50]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from _common import load_sample_state
+
+import game_manager
+
+
+def _play(game_id, actions, errors):
+    try:
+        for i in range(actions):
+            state = game_manager.load_game_state(game_id)
+            state["players"]["Peter"]["resources"]["solari"] += 1
+            state["round_history"].append({"player": "Peter", "summary": f"{game_id} action {i}"})
+            if not game_manager.save_game_state(state, {"type": "bench", "i": i}, game_id):
+                errors.append(game_id)
+    except Exception as e:
+        errors.append(f"{game_id}: {e}")
+
+
+def _run(backend, tables, actions):
+    tmp_dir = tempfile.mkdtemp(prefix='dune_bench_tables_')
+    saved = (game_manager.STATE_BACKEND, game_manager.GAME_STATE_FILE, game_manager.STATE_DB_FILE)
+    try:
+        game_manager.STATE_BACKEND = backend
+        game_manager.GAME_STATE_FILE = os.path.join(tmp_dir, 'game_stat.json')
+        game_manager.STATE_DB_FILE = os.path.join(tmp_dir, 'games.db')
+        game_ids = [f"table{i}" for i in range(tables)]
+        for game_id in game_ids:
+            game_manager.replace_game_state(load_sample_state(), game_id=game_id)
+
+        errors = []
+        threads = [threading.Thread(target=_play, args=(game_id, actions, errors)) for game_id in game_ids]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        expected = load_sample_state()["players"]["Peter"]["resources"]["solari"] + actions
+        for game_id in game_ids:
+            final = game_manager.load_game_state(game_id)
+            assert final["players"]["Peter"]["resources"]["solari"] == expected, game_id
+        return tables * actions / elapsed, errors
+    finally:
+        game_manager.STATE_BACKEND, game_manager.GAME_STATE_FILE, game_manager.STATE_DB_FILE = saved
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tables', type=int, default=32)
+    parser.add_argument('--actions', type=int, default=50)
+    parser.add_argument('--backends', default='json,events,sqlite')
+    args = parser.parse_args()
+
+    print(f"{args.tables} tables x {args.actions} actions, one thread per table")
+    for backend in args.backends.split(','):
+        rate, errors = _run(backend, args.tables, args.actions)
+        print(f"{backend:>8}: {rate:>10,.0f} actions/s  errors: {len(errors)}")
+
+
+if __name__ == '__main__':
+    main()
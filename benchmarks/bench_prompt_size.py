@@ -0,0 +1,115 @@
+# benchmarks/bench_prompt_size.py
+"""
+Rozmiar promptu AI: pełny (JSON z wcięciami) vs zwarty (compact_prompt).
+
+Dla przykładowego game_stat.json w obu fazach (AGENT_TURN i REVEAL) podaje
+liczbę znaków i szacowaną liczbę tokenów (znaki / 4) promptu pełnego,
+zwartego bez limitu i zwartego z kolejnymi budżetami tokenów (z listą
+odrzuconych sekcji). `--history N` dopisuje N ruchów do historii rundy,
+żeby pokazać koszt długiej rundy.
+
+Druga część rozgrywa symulatorem `--games` gier (ziarno `--seed`) i po
+każdym ruchu agenta wydaje graczowi AI prompt w każdym formacie
+(prompt_cache): średnia liczba tokenów na turę dla full/compact/delta oraz
+czas wygenerowania promptu i ponownego GET tej samej wersji stanu.
+
+Użycie:
+    python benchmarks/bench_prompt_size.py [--budgets 800,600,400] [--history 0] [--games 5]
+"""
+import argparse
+import random
+import time
+
+from _common import load_sample_state
+
+import game_manager
+import simulator
+from build_ai_prompt import generate_ai_prompt
+from compact_prompt import generate_compact_ai_prompt, estimate_tokens
+from prompt_cache import PromptCache, PROMPT_FORMATS
+
+
+def _grow_history(state, cards_db, entries):
+    history = state.setdefault("round_history", [])
+    players = sorted(state["players"])
+    card_ids = sorted(cards_db)
+    for i in range(entries):
+        card_data = cards_db[card_ids[i % len(card_ids)]]
+        history.append({"player": players[i % len(players)], "card": card_data.get("name"),
+                        "location": "Arrakeen",
+                        "summary": f"Player {players[i % len(players)]} played {card_data.get('name')} on Arrakeen."})
+
+
+class _PromptingPolicy(simulator.RandomPolicy):
+    """Losowa polityka, która przed każdym ruchem wydaje prompty we wszystkich formatach."""
+
+    def __init__(self, dbs, totals):
+        self.cards_db = dbs[1]
+        self.intrigues_db = game_manager.CATALOG.get("intrigues")
+        self.totals = totals
+        self.caches = {prompt_format: PromptCache() for prompt_format in PROMPT_FORMATS}
+
+    def choose_move(self, game_state, player_name, moves, rng, dbs):
+        game_state["version"] = game_state.get("version", 0) + 1
+        game_manager.calculate_and_store_reveal_stats(game_state, self.cards_db)
+        for prompt_format, cache in self.caches.items():
+            start = time.perf_counter()
+            text = cache.issue("bench", game_state, self.cards_db, self.intrigues_db, prompt_format)[0]
+            miss = time.perf_counter() - start
+            start = time.perf_counter()
+            cache.issue("bench", game_state, self.cards_db, self.intrigues_db, prompt_format)
+            hit = time.perf_counter() - start
+            entry = self.totals[prompt_format]
+            entry[0] += 1
+            entry[1] += estimate_tokens(text)
+            entry[2] += miss
+            entry[3] += hit
+        return super().choose_move(game_state, player_name, moves, rng, dbs)
+
+
+def _per_turn_prompts(games, seed):
+    locations_db, cards_db, _, conflicts_db, leaders_db = game_manager.load_catalogs()
+    dbs = (locations_db, cards_db, leaders_db)
+    rng = random.Random(seed)
+    totals = {prompt_format: [0, 0, 0.0, 0.0] for prompt_format in PROMPT_FORMATS}
+    for _ in range(games):
+        state = game_manager.build_new_game_state(seed=rng.randrange(1 << 62))
+        policies = {name: simulator.RandomPolicy() for name in state["players"]}
+        policies[game_manager.AI_PLAYER_NAME] = _PromptingPolicy(dbs, totals)
+        game_manager.process_conflict_set(state, conflicts_db, rng.choice(sorted(conflicts_db)))
+        simulator.play_game(state, policies, rng, dbs, conflicts_db)
+
+    print(f"\nper AI turn over {games} simulated games:")
+    print(f"{'format':<8} {'prompts':>8} {'avg tokens':>11} {'build us':>9} {'cached GET us':>14}")
+    for prompt_format, (count, tokens, miss, hit) in totals.items():
+        print(f"{prompt_format:<8} {count:>8} {tokens / count:>11,.0f} {miss / count * 1e6:>9.0f} {hit / count * 1e6:>14.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--budgets', default='800,600,400')
+    parser.add_argument('--history', type=int, default=0)
+    parser.add_argument('--games', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    _, cards_db, intrigues_db, _, _ = game_manager.load_catalogs()
+    print(f"{'phase':<11} {'prompt':<16} {'chars':>7} {'tokens':>7}  dropped sections")
+    for phase in ("AGENT_TURN", "REVEAL"):
+        state = load_sample_state()
+        state["current_phase"] = phase
+        _grow_history(state, cards_db, args.history)
+        game_manager.calculate_and_store_reveal_stats(state, cards_db)
+
+        full = generate_ai_prompt(state, cards_db)
+        print(f"{phase:<11} {'full':<16} {len(full):>7,} {estimate_tokens(full):>7,}")
+        for budget in [0] + [int(x) for x in args.budgets.split(',') if x]:
+            text, dropped = generate_compact_ai_prompt(state, cards_db, intrigues_db, token_budget=budget)
+            label = "compact" if not budget else f"compact <= {budget}"
+            print(f"{'':<11} {label:<16} {len(text):>7,} {estimate_tokens(text):>7,}  {', '.join(dropped)}")
+
+    _per_turn_prompts(args.games, args.seed)
+
+
+if __name__ == '__main__':
+    main()
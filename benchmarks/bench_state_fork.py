@@ -0,0 +1,96 @@
+# benchmarks/bench_state_fork.py
+"""
+Ocena ruchów "co by było, gdyby": fork stanu (state_fork) vs pełna kopia.
+
+Na przykładowym stanie (app/game_stat.json) wykonuje każdy kandydujący ruch
+na osobnej kopii stanu:
+    - move: każda legalna para (karta, lokacja) każdego gracza (process_move),
+    - intrigue: każda intryga z ręki każdego gracza (process_intrigue,
+      decyzje: pay_cost=True, choice_index=0),
+    - buy: każda karta z Imperium Row dla każdego gracza (process_buy_card).
+Kopia to copy.deepcopy, state_diff.clone albo state_fork.fork. Podaje średni
+czas kopia+ruch, liczbę kopiowanych kontenerów przez fork i sprawdza, że
+wyniki są identyczne, a stan bazowy nietknięty.
+
+Użycie:
+    python benchmarks/bench_state_fork.py [--repeat 50]
+"""
+import argparse
+import copy
+import time
+
+from _common import load_sample_state
+
+from game_manager import legal_moves, process_move, process_intrigue, process_buy_card
+from game_rng import seed_game
+from replay import replay_catalogs, state_hash
+from state_diff import clone
+from state_fork import fork, copied_containers
+
+COPIES = {
+    "deepcopy": copy.deepcopy,
+    "clone": clone,
+    "fork": fork,
+}
+
+
+def _candidates(game_state, dbs):
+    locations_db, cards_db, intrigues_db, leaders_db = dbs
+    candidates = {"move": [], "intrigue": [], "buy": []}
+    for player_name, player_state in game_state["players"].items():
+        for card_id, location_id in legal_moves(game_state, player_name, locations_db, cards_db, leaders_db):
+            candidates["move"].append(lambda state, p=player_name, c=card_id, l=location_id: process_move(
+                state, locations_db, cards_db, leaders_db, p, c, l))
+        for intrigue_id in player_state.get("intrigue_hand", []):
+            candidates["intrigue"].append(lambda state, p=player_name, i=intrigue_id: process_intrigue(
+                state, intrigues_db, cards_db, leaders_db, p, i, pay_cost=True, choice_index=0))
+        for card_id in game_state.get("imperium_row", []):
+            candidates["buy"].append(lambda state, p=player_name, c=card_id: process_buy_card(state, p, c, cards_db))
+    return candidates
+
+
+def _run(game_state, candidates, copy_state, repeat):
+    results = []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        results = []
+        for candidate in candidates:
+            scratch = copy_state(game_state)
+            candidate(scratch)
+            results.append(scratch)
+    elapsed = time.perf_counter() - start
+    copied = sum(copied_containers(scratch) for scratch in results)
+    hashes = [state_hash(clone(scratch)) for scratch in results]
+    return elapsed / repeat / len(candidates), copied / len(candidates), hashes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    dbs = replay_catalogs()
+    game_state = load_sample_state()
+    seed_game(game_state, 1)    # losowe efekty (dociąganie kart) mają dać ten sam wynik w każdej kopii
+    base_hash = state_hash(game_state)
+    print(f"{'kind':<9} {'candidates':>10} {'deepcopy us':>12} {'clone us':>9} {'fork us':>8} {'fork copies':>12} {'speedup':>8}")
+    for kind, candidates in _candidates(game_state, dbs).items():
+        if not candidates:
+            continue
+        timings = {}
+        reference = None
+        copies = 0
+        for name, copy_state in COPIES.items():
+            per_candidate, copies_per_candidate, hashes = _run(game_state, candidates, copy_state, args.repeat)
+            assert state_hash(game_state) == base_hash, f"{name} modified the base state"
+            assert reference is None or hashes == reference, f"{name} produced different results"
+            reference = hashes
+            timings[name] = per_candidate
+            if name == "fork":
+                copies = copies_per_candidate
+        print(f"{kind:<9} {len(candidates):>10} {timings['deepcopy'] * 1e6:>12.1f} {timings['clone'] * 1e6:>9.1f} "
+              f"{timings['fork'] * 1e6:>8.1f} {copies:>12.1f} {timings['deepcopy'] / timings['fork']:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
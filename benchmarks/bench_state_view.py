@@ -0,0 +1,90 @@
+# benchmarks/bench_state_view.py
+"""
+Maskowanie stanu dla promptu AI: copy.deepcopy + pop vs widok state_view.
+
+Stan to przykładowy game_stat.json z historią rundy wydłużoną do zadanej
+liczby wpisów i taliami graczy powiększonymi o `--deck` kart (długa gra).
+Dla obu ścieżek mierzy czas samego maskowania, czas maskowania z
+serializacją JSON (jak w generate_ai_prompt) oraz szczyt pamięci
+zaalokowanej przy maskowaniu (tracemalloc). Sprawdza też, że oba JSON-y są
+identyczne.
+
+Użycie:
+    python benchmarks/bench_state_view.py [--history 0,1000,5000] [--deck 40]
+"""
+import argparse
+import copy
+import json
+import tracemalloc
+
+from _common import load_sample_state, measure
+
+from build_ai_prompt import AI_VIEW_MASK
+from game_manager import AI_PLAYER_NAME
+from state_view import redacted_view, dumps_view
+
+
+def _grow_state(state, history, deck):
+    template = {"player": "Peter", "card": "dune_the_desert_planet", "location": "imperial_basin",
+                "summary": "Gracz Peter zagrał kartę na Imperial Basin. | Zyskano 1 Spice."}
+    state["round_history"] = [dict(template) for _ in range(history)]
+    for player_data in state["players"].values():
+        for key in ("deck_pool", "draw_deck", "discard_pile"):
+            cards = player_data.setdefault(key, [])
+            cards.extend(["dune_the_desert_planet"] * deck)
+
+
+def _deepcopy_mask(game_state):
+    """Dawna ścieżka generate_ai_prompt: pełna kopia i usuwanie pól."""
+    state = copy.deepcopy(game_state)
+    state.pop("round_history", None)
+    for player_name, player_data in state["players"].items():
+        player_data.pop("reveal_counters", None)
+        if player_name == AI_PLAYER_NAME:
+            player_data.pop("draw_deck", None)
+        else:
+            for key in ("hand", "deck_pool", "draw_deck", "intrigue_hand"):
+                player_data.pop(key, None)
+    return state
+
+
+def _peak_kb(fn):
+    tracemalloc.start()
+    result = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak / 1024.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--history', default='0,1000,5000')
+    parser.add_argument('--deck', type=int, default=40, help='extra cards per player zone')
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'history':>8} {'path':>9} {'mask us':>9} {'mask+json us':>13} {'mask peak KB':>13}")
+    for history_size in [int(x) for x in args.history.split(',')]:
+        state = load_sample_state()
+        _grow_state(state, history_size, args.deck)
+
+        old_json = json.dumps(_deepcopy_mask(state), indent=2, ensure_ascii=False)
+        new_json = dumps_view(state, AI_VIEW_MASK, indent=2, ensure_ascii=False)
+        assert old_json == new_json, "Redacted view serializes differently from the deepcopy path"
+
+        paths = (
+            ("deepcopy", lambda: _deepcopy_mask(state),
+             lambda: json.dumps(_deepcopy_mask(state), indent=2, ensure_ascii=False)),
+            ("view", lambda: redacted_view(state, AI_VIEW_MASK),
+             lambda: dumps_view(state, AI_VIEW_MASK, indent=2, ensure_ascii=False)),
+        )
+        for name, mask_fn, dump_fn in paths:
+            _, mask_ms = measure(mask_fn, repeat=args.repeat)
+            _, dump_ms = measure(dump_fn, repeat=args.repeat)
+            print(f"{history_size:>8} {name:>9} {mask_ms * 1000:>9.1f} {dump_ms * 1000:>13.1f} "
+                  f"{_peak_kb(mask_fn):>13.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+# benchmarks/bench_write_behind.py
+"""
+Opóźnienie "żądania" przy zapisie synchronicznym i zapisie w tle (write-behind).
+
+Nagrywa grę symulatorem (replay.record_game) i odtwarza ją tak, jak robią to
+trasy Flaska: dla każdej akcji wczytanie stanu z magazynu, wykonanie akcji i
+zapis. Dla każdego backendu (json / events / sqlite) porównuje magazyn
+synchroniczny z WriteBehindStore (`--staleness-ms`), z fsync i bez.
+Podaje p50/p95 czasu żądania, liczbę zapisów na dysk i czas końcowego
+flush(). `--think-ms` wstawia przerwę między żądaniami (gracze przy stole).
+
+Użycie:
+    python benchmarks/bench_write_behind.py [--staleness-ms 200] [--think-ms 0] [--seed 1]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import _common  # noqa: F401 - ścieżka do app/
+
+from replay import record_game, replay_catalogs, apply_action
+from state_diff import clone
+from state_store import JsonFileStore, EventLogStore, SqliteDatabase, SqliteStore, WriteBehindStore
+
+
+def _make_store(backend, directory, fsync):
+    if backend == "json":
+        return JsonFileStore(os.path.join(directory, 'game_stat.json'), fsync=fsync)
+    if backend == "events":
+        return EventLogStore(os.path.join(directory, 'events'), fsync=fsync)
+    return SqliteStore(SqliteDatabase(os.path.join(directory, 'games.db'), fsync=fsync))
+
+
+def _run(recording, dbs, backend, fsync, staleness, think):
+    directory = tempfile.mkdtemp(prefix='dune_bench_')
+    try:
+        store = _make_store(backend, directory, fsync)
+        store.replace(clone(recording["initial_state"]))
+        if staleness > 0:
+            store = WriteBehindStore(store, staleness)
+
+        samples = []
+        for action in recording["actions"]:
+            start = time.perf_counter()
+            game_state = store.load()
+            apply_action(game_state, action, dbs)
+            store.save(game_state, action)
+            samples.append(time.perf_counter() - start)
+            if think > 0:
+                time.sleep(think)
+
+        start = time.perf_counter()
+        if staleness > 0:
+            store.flush()
+        final_flush = time.perf_counter() - start
+        writes = store.flushes if staleness > 0 else len(samples)
+        samples.sort()
+        return samples[len(samples) // 2], samples[int(len(samples) * 0.95)], writes, final_flush
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--staleness-ms', type=int, default=200)
+    parser.add_argument('--think-ms', type=float, default=0)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    recording = record_game(args.seed, compact_zones=False)
+    dbs = replay_catalogs()
+    print(f"{len(recording['actions'])} requests per run (seed {args.seed})")
+    print(f"{'backend':<8} {'fsync':<6} {'mode':<13} {'p50 us':>8} {'p95 us':>8} {'disk writes':>12} {'final flush ms':>15}")
+    for backend in ("json", "events", "sqlite"):
+        for fsync in (False, True):
+            for staleness in (0, args.staleness_ms / 1000.0):
+                p50, p95, writes, final_flush = _run(recording, dbs, backend, fsync, staleness, args.think_ms / 1000.0)
+                mode = "sync" if staleness == 0 else f"behind {args.staleness_ms}ms"
+                print(f"{backend:<8} {'yes' if fsync else 'no':<6} {mode:<13} {p50 * 1e6:>8.0f} {p95 * 1e6:>8.0f} "
+                      f"{writes:>12} {final_flush * 1000:>15.1f}")
+
+
+if __name__ == '__main__':
+    main()
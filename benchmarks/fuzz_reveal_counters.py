@@ -0,0 +1,140 @@
+# benchmarks/fuzz_reveal_counters.py
+"""
+Fuzzing liczników Odkrycia: ścieżka przyrostowa kontra pełne przeliczenie.
+
+Na stanie startowym wykonywane są losowe akcje przenoszące karty (ruchy
+agentów, zakupy, ręczne ustawienie ręki, ręczna korekta list kart, nowa
+runda, zmiana sojuszu z Cesarzem). Po każdej akcji, dla każdego gracza,
+liczniki utrzymywane przyrostowo muszą być równe zbudowanym od zera, a
+sumy (Perswazja, Miecze) - równe wynikowi pełnego przeglądu ręki
+(reveal_counters.scan_reveal_totals). Każda rozbieżność kończy skrypt kodem 1.
+
+Użycie:
+    python benchmarks/fuzz_reveal_counters.py [--steps 20000] [--seed 1]
+"""
+import argparse
+import random
+import sys
+
+import _common  # noqa: F401  (ścieżka do app/)
+import game_manager
+import reveal_counters
+from state_diff import clone
+
+
+def _check(game_state, cards_db, step, action):
+    all_alliances = game_state.get("alliances", {}) or {}
+    for player_name, player_state in game_state["players"].items():
+        counters = player_state.get(reveal_counters.COUNTERS_KEY)
+        if counters is not None and counters != reveal_counters.build_counters(player_state, cards_db):
+            return f"step {step} ({action}): {player_name} counters {counters} != rebuilt"
+        has_emperor_alliance = all_alliances.get("emperor") == player_name
+        incremental = game_manager.reveal_totals(player_state, cards_db, player_name, all_alliances)
+        expected = reveal_counters.scan_reveal_totals(player_state, cards_db, has_emperor_alliance)
+        if incremental != expected:
+            return f"step {step} ({action}): {player_name} incremental {incremental} != full {expected}"
+    return None
+
+
+def _random_move(game_state, rng, dbs):
+    locations_db, cards_db, leaders_db = dbs
+    player_name = rng.choice(sorted(game_state["players"]))
+    moves = game_manager.legal_moves(game_state, player_name, locations_db, cards_db, leaders_db)
+    if not moves:
+        game_manager.process_pass_turn(game_state, player_name)
+        game_manager.check_and_advance_phase(game_state, cards_db)
+        return
+    card_id, location_id = rng.choice(moves)
+    game_manager.process_move(game_state, locations_db, cards_db, leaders_db, player_name, card_id, location_id,
+                              pay_cost=rng.random() < 0.5, choice_index=rng.randrange(2))
+    game_manager.check_and_advance_phase(game_state, cards_db)
+
+
+def _random_buy(game_state, rng, dbs):
+    _, cards_db, _ = dbs
+    buyable = [card_id for card_id, card_data in cards_db.items()
+               if game_manager.get_card_persuasion_cost(card_data) != 999]
+    if not game_state.get("imperium_row") or rng.random() < 0.3:
+        game_manager.add_card_to_market(game_state, rng.choice(buyable), cards_db)
+    player_name = rng.choice(sorted(game_state["players"]))
+    game_manager.process_buy_card(game_state, player_name, rng.choice(game_state["imperium_row"]), cards_db)
+
+
+def _random_hand(game_state, rng, dbs):
+    _, cards_db, _ = dbs
+    player_name = rng.choice(sorted(game_state["players"]))
+    deck_pool = game_state["players"][player_name].get("deck_pool", [])
+    hand = rng.sample(deck_pool, rng.randint(0, min(8, len(deck_pool))))
+    game_manager.set_player_hand(game_state, player_name, hand, cards_db)
+
+
+def _random_override(game_state, rng, dbs):
+    _, cards_db, _ = dbs
+    player_name = rng.choice(sorted(game_state["players"]))
+    pool = list(game_state["players"][player_name].get("deck_pool", []))
+    rng.shuffle(pool)
+    cut_a = rng.randint(0, len(pool))
+    cut_b = rng.randint(cut_a, len(pool))
+    form = {
+        "hand_cards": ", ".join(pool[:cut_a]),
+        "discard_pile_cards": ", ".join(pool[cut_a:cut_b]),
+        "draw_deck_cards": ", ".join(pool[cut_b:]),
+        "deck_pool_cards": ", ".join(pool),
+    }
+    game_manager.process_manual_override(game_state, cards_db, player_name, form)
+
+
+def _new_round(game_state, rng, dbs):
+    _, cards_db, _ = dbs
+    game_manager.perform_cleanup_and_new_round(game_state, cards_db)
+
+
+def _toggle_emperor(game_state, rng, dbs):
+    alliances = game_state.setdefault("alliances", {})
+    alliances["emperor"] = rng.choice(sorted(game_state["players"]) + [None])
+
+
+def _drop_counters(game_state, rng, dbs):
+    # Stan bez liczników (stary zapis, ręczna edycja JSON) - przeliczenie przy odczycie
+    player_name = rng.choice(sorted(game_state["players"]))
+    reveal_counters.invalidate_counters(game_state["players"][player_name])
+
+
+ACTIONS = [
+    (_random_move, 8),
+    (_random_buy, 3),
+    (_random_hand, 2),
+    (_random_override, 1),
+    (_new_round, 1),
+    (_toggle_emperor, 1),
+    (_drop_counters, 1),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fuzz incremental reveal counters against a full recompute.")
+    parser.add_argument('--steps', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    locations_db, cards_db, _, conflicts_db, leaders_db = game_manager.load_catalogs()
+    dbs = (locations_db, cards_db, leaders_db)
+    rng = random.Random(args.seed)
+    actions, weights = zip(*ACTIONS)
+
+    template = game_manager.build_new_game_state(seed=args.seed)
+    game_state = clone(template)
+    for step in range(args.steps):
+        if step % 500 == 0:
+            game_state = clone(template)
+        action = rng.choices(actions, weights)[0]
+        action(game_state, rng, dbs)
+        error = _check(game_state, cards_db, step, action.__name__)
+        if error:
+            print(f"MISMATCH {error}")
+            sys.exit(1)
+    print(f"OK: {args.steps} steps, incremental counters match the full recompute.")
+
+
+if __name__ == '__main__':
+    main()
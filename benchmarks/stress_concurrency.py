@@ -0,0 +1,114 @@
+# benchmarks/stress_concurrency.py
+"""
+Test obciążeniowy optymistycznej współbieżności: równoległe akcje na jednym stole.
+
+Wiele wątków (albo procesów) wysyła jednocześnie POST /g/<game_id>/add_intrigue
+dla tego samego gracza. Każda akcja dopisuje jedną kartę do intrigue_hand,
+więc na końcu liczba kart musi być równa liczbie stanowej + liczbie akcji
+zaakceptowanych (302). Odrzucone (409) nie mogą zostawić śladu. Każda
+rozbieżność oznacza zgubioną aktualizację.
+
+Użycie:
+    python benchmarks/stress_concurrency.py [--workers 16] [--requests 25]
+                                            [--backends json,events,sqlite] [--processes]
+"""
+import argparse
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+from _common import load_sample_state
+
+GAME_ID = 'stress'
+PLAYER = 'Peter'
+INTRIGUE_ID = 'bribery'
+
+
+def _configure(backend, tmp_dir):
+    import game_manager
+    game_manager.STATE_BACKEND = backend
+    game_manager.GAME_STATE_FILE = os.path.join(tmp_dir, 'game_stat.json')
+    game_manager.STATE_DB_FILE = os.path.join(tmp_dir, 'games.db')
+    return game_manager
+
+
+def _worker(backend, tmp_dir, requests, results):
+    _configure(backend, tmp_dir)
+    import app as app_module
+    client = app_module.app.test_client()
+    accepted = rejected = errors = 0
+    for _ in range(requests):
+        response = client.post(f'/g/{GAME_ID}/add_intrigue',
+                               data={'player_name': PLAYER, 'intrigue_id': INTRIGUE_ID})
+        if response.status_code == 302:
+            accepted += 1
+        elif response.status_code == 409:
+            rejected += 1
+        else:
+            errors += 1
+    results.put((accepted, rejected, errors))
+
+
+def _run(backend, workers, requests, use_processes):
+    tmp_dir = tempfile.mkdtemp(prefix='dune_stress_')
+    try:
+        game_manager = _configure(backend, tmp_dir)
+        game_manager.replace_game_state(load_sample_state(), game_id=GAME_ID)
+        initial = len(game_manager.load_game_state(GAME_ID)["players"][PLAYER].get("intrigue_hand", []))
+
+        if use_processes:
+            ctx = multiprocessing.get_context('spawn')
+            results = ctx.Queue()
+            runners = [ctx.Process(target=_worker, args=(backend, tmp_dir, requests, results)) for _ in range(workers)]
+        else:
+            import queue
+            results = queue.Queue()
+            runners = [threading.Thread(target=_worker, args=(backend, tmp_dir, requests, results)) for _ in range(workers)]
+
+        start = time.perf_counter()
+        for runner in runners:
+            runner.start()
+        totals = [0, 0, 0]
+        for _ in runners:
+            for i, value in enumerate(results.get()):
+                totals[i] += value
+        for runner in runners:
+            runner.join()
+        elapsed = time.perf_counter() - start
+
+        # Świeży odczyt z dysku/bazy (nie z pamięci podręcznej tego procesu)
+        game_manager._state_stores.clear()
+        final_state = game_manager.load_game_state(GAME_ID)
+        final = len(final_state["players"][PLAYER]["intrigue_hand"])
+        accepted, rejected, errors = totals
+        lost = initial + accepted - final
+        print(f"{backend:>8}: {accepted:>5} accepted, {rejected:>4} rejected (409), {errors} errors, "
+              f"version {final_state.get('version')}, lost updates: {lost}, "
+              f"{workers * requests / elapsed:,.0f} req/s")
+        return lost == 0 and errors == 0
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=25)
+    parser.add_argument('--backends', default='json,events,sqlite')
+    parser.add_argument('--processes', action='store_true', help='workers are processes instead of threads')
+    args = parser.parse_args()
+
+    mode = 'processes' if args.processes else 'threads'
+    print(f"{args.workers} {mode} x {args.requests} requests on one table")
+    ok = True
+    for backend in args.backends.split(','):
+        ok = _run(backend, args.workers, args.requests, args.processes) and ok
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
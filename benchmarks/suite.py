@@ -0,0 +1,337 @@
+# benchmarks/suite.py
+"""
+Zestaw benchmarków gorących ścieżek silnika (stdlib timeit) z trybem porównania.
+
+Fixture'y są deterministyczne: zbudowane z game_stat.DEFAULT.json
+(build_new_game_state) i rozegrane symulatorem ze stałym ziarnem do
+trzech punktów gry - "start" (runda 1 z konfliktem), "agent_turn" (każdy
+gracz wystawił jednego agenta) i "reveal" (koniec tur agentów, statystyki
+odkrycia policzone, wojska w konflikcie). game_stat.json nie jest czytany
+ani zapisywany.
+
+Wyniki (czas na jedno wywołanie w mikrosekundach: best/median/mean z
+powtórzeń timeit) są zapisywane jako JSON. Z --compare wyniki są
+porównywane z zapisaną linią bazową: przypadek, którego czas "best" wzrósł
+o więcej niż --threshold, jest oznaczany jako regresja, a skrypt kończy się
+kodem 1.
+
+Użycie:
+    python benchmarks/suite.py [--output benchmarks/results/latest.json]
+                               [--compare benchmarks/results/baseline.json] [--threshold 0.2]
+                               [--only process_move,generate_ai_prompt] [--repeat 7] [--seed 1]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+
+from _common import ROOT_DIR, TempStateDir
+
+import game_manager
+from build_ai_prompt import generate_ai_prompt
+from simulator import RandomPolicy, SimulationStats, play_agent_phase
+from state_diff import clone
+
+RESULTS_DIR = os.path.join(ROOT_DIR, 'benchmarks', 'results')
+DEFAULT_OUTPUT = os.path.join(RESULTS_DIR, 'latest.json')
+DEFAULT_SEED = 1
+DEFAULT_REPEAT = 7
+DEFAULT_THRESHOLD = 0.2
+INTRIGUE_ID = 'occasion'  # prosty GAIN - bez decyzji gracza
+
+CASES = {}
+
+
+def case(name, number):
+    """
+    Rejestruje przypadek. Funkcja dostaje (fixtures, dbs, number) i zwraca
+    (setup, stmt, ops, teardown): setup jest wołany przed każdym powtórzeniem
+    (poza pomiarem), stmt `number` razy w pomiarze, ops to liczba operacji
+    w jednym wywołaniu stmt, a teardown sprząta po przypadku. setup
+    i teardown mogą być None.
+    """
+    def register(fn):
+        CASES[name] = (fn, number)
+        return fn
+    return register
+
+
+# --- Fixture'y ---
+
+def build_fixtures(seed=DEFAULT_SEED):
+    locations_db, cards_db, _, conflicts_db, leaders_db = game_manager.load_catalogs()
+    dbs = (locations_db, cards_db, leaders_db)
+    rng = random.Random(seed)
+    policy = RandomPolicy()
+
+    # Tasowania silnika idą ze strumienia gry (game_rng), więc fixture'y są powtarzalne
+    start = game_manager.build_new_game_state(seed=seed)
+    game_manager.process_conflict_set(start, conflicts_db, rng.choice(sorted(conflicts_db)))
+
+    agent_turn = clone(start)
+    for player_name in sorted(agent_turn["players"]):
+        agent_turn["currentPlayer"] = player_name
+        moves = game_manager.legal_moves(agent_turn, player_name, locations_db, cards_db, leaders_db)
+        if moves:
+            move = policy.choose_move(agent_turn, player_name, moves, rng, dbs)
+            game_manager.process_move(agent_turn, locations_db, cards_db, leaders_db, player_name, move[0], move[1],
+                                      **policy.move_kwargs(agent_turn, player_name, move, rng))
+    agent_turn["currentPlayer"] = game_manager.AI_PLAYER_NAME
+
+    reveal = clone(start)
+    play_agent_phase(reveal, {name: policy for name in reveal["players"]}, rng, dbs, SimulationStats())
+    game_manager.calculate_and_store_reveal_stats(reveal, cards_db)
+    for player_name in sorted(reveal["players"]):
+        game_manager.process_commit_troops(reveal, player_name, policy.troops_to_commit(reveal, player_name, rng))
+
+    return {"start": start, "agent_turn": agent_turn, "reveal": reveal}
+
+
+def _clones(state, count):
+    return [clone(state) for _ in range(count)]
+
+
+# --- Przypadki ---
+
+@case("load_game_data", number=50)
+def _load_game_data(fixtures, dbs, number):
+    saved_backend = game_manager.STATE_BACKEND
+    game_manager.STATE_BACKEND = 'json'
+    tmp = TempStateDir(fixtures["agent_turn"]).__enter__()
+
+    def stmt():
+        game_manager.load_game_data()
+
+    def teardown():
+        tmp.__exit__(None, None, None)
+        game_manager.STATE_BACKEND = saved_backend
+
+    return None, stmt, 1, teardown
+
+
+@case("save_json_file", number=50)
+def _save_json_file(fixtures, dbs, number):
+    tmp_dir = tempfile.mkdtemp(prefix='dune_bench_')
+    path = os.path.join(tmp_dir, 'game_stat.json')
+    state = fixtures["agent_turn"]
+
+    def stmt():
+        game_manager.save_json_file(path, state)
+
+    def teardown():
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    return None, stmt, 1, teardown
+
+
+@case("is_move_valid", number=20)
+def _is_move_valid(fixtures, dbs, number):
+    locations_db, cards_db, leaders_db = dbs
+    state = fixtures["agent_turn"]
+    player_name = game_manager.AI_PLAYER_NAME
+    pairs = [(card_id, location_id)
+             for card_id in dict.fromkeys(state["players"][player_name].get("hand", []))
+             for location_id in locations_db]
+
+    def stmt():
+        for card_id, location_id in pairs:
+            game_manager.is_move_valid(state, locations_db, leaders_db, cards_db, player_name, card_id, location_id)
+
+    return None, stmt, len(pairs), None
+
+
+@case("process_move", number=200)
+def _process_move(fixtures, dbs, number):
+    locations_db, cards_db, leaders_db = dbs
+    state = fixtures["agent_turn"]
+    player_name = game_manager.AI_PLAYER_NAME
+    card_id, location_id = sorted(game_manager.legal_moves(state, player_name, locations_db, cards_db, leaders_db))[0]
+    pending = []
+
+    def setup():
+        pending[:] = _clones(state, number)
+
+    def stmt():
+        game_manager.process_move(pending.pop(), locations_db, cards_db, leaders_db, player_name, card_id, location_id,
+                                  pay_cost=True, choice_index=0)
+
+    return setup, stmt, 1, None
+
+
+@case("process_intrigue", number=200)
+def _process_intrigue(fixtures, dbs, number):
+    _, cards_db, leaders_db = dbs
+    intrigues_db = game_manager.CATALOG.get("intrigues")
+    state = clone(fixtures["agent_turn"])
+    player_name = game_manager.AI_PLAYER_NAME
+    state["players"][player_name].setdefault("intrigue_hand", []).append(INTRIGUE_ID)
+    pending = []
+
+    def setup():
+        pending[:] = _clones(state, number)
+
+    def stmt():
+        game_manager.process_intrigue(pending.pop(), intrigues_db, cards_db, leaders_db, player_name, INTRIGUE_ID)
+
+    return setup, stmt, 1, None
+
+
+@case("calculate_reveal_stats", number=200)
+def _calculate_reveal_stats(fixtures, dbs, number):
+    _, cards_db, _ = dbs
+    state = fixtures["reveal"]
+    all_alliances = state.get("alliances", {})
+    players = sorted(state["players"].items())
+
+    def stmt():
+        for player_name, player_state in players:
+            game_manager.calculate_reveal_stats(player_state, cards_db, player_name, all_alliances)
+
+    return None, stmt, len(players), None
+
+
+@case("rank_conflict_results", number=500)
+def _rank_conflict_results(fixtures, dbs, number):
+    state = fixtures["reveal"]
+
+    def stmt():
+        game_manager.rank_conflict_results(state)
+
+    return None, stmt, 1, None
+
+
+@case("perform_cleanup_and_new_round", number=200)
+def _perform_cleanup_and_new_round(fixtures, dbs, number):
+    state = fixtures["reveal"]
+    pending = []
+
+    def setup():
+        pending[:] = _clones(state, number)
+
+    def stmt():
+        game_manager.perform_cleanup_and_new_round(pending.pop())
+
+    return setup, stmt, 1, None
+
+
+@case("generate_ai_prompt", number=50)
+def _generate_ai_prompt(fixtures, dbs, number):
+    _, cards_db, _ = dbs
+    state = fixtures["agent_turn"]
+
+    def stmt():
+        generate_ai_prompt(state, cards_db)
+
+    return None, stmt, 1, None
+
+
+# --- Uruchomienie i porównanie ---
+
+def run_case(name, fixtures, dbs, repeat):
+    fn, number = CASES[name]
+    setup, stmt, ops, teardown = fn(fixtures, dbs, number)
+    timings = []
+    try:
+        if setup:
+            setup()
+        stmt()  # rozgrzewka (cache katalogów i planów efektów)
+        for _ in range(repeat):
+            if setup:
+                setup()
+            timings.append(timeit.timeit(stmt, number=number) / (number * ops) * 1e6)
+    finally:
+        if teardown:
+            teardown()
+    timings.sort()
+    return {
+        "best_us": timings[0],
+        "median_us": timings[len(timings) // 2],
+        "mean_us": sum(timings) / len(timings),
+        "repeat": repeat,
+        "number": number,
+        "ops_per_call": ops,
+    }
+
+
+def _git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold):
+    """Zwraca listę (nazwa, baseline_us, current_us, zmiana, regresja)."""
+    rows = []
+    for name, current in results["cases"].items():
+        previous = baseline.get("cases", {}).get(name)
+        if previous is None:
+            continue
+        change = current["best_us"] / previous["best_us"] - 1.0
+        rows.append((name, previous["best_us"], current["best_us"], change, change > threshold))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    parser.add_argument('--compare', metavar='BASELINE', help='baseline results JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='relative slowdown of best_us counted as a regression (default 0.2 = 20%%)')
+    parser.add_argument('--only', help='comma separated case names')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    args = parser.parse_args()
+
+    names = args.only.split(',') if args.only else list(CASES)
+    unknown = [name for name in names if name not in CASES]
+    if unknown:
+        parser.error(f"unknown case(s): {', '.join(unknown)}; available: {', '.join(CASES)}")
+
+    locations_db, cards_db, _, _, leaders_db = game_manager.load_catalogs()
+    dbs = (locations_db, cards_db, leaders_db)
+    fixtures = build_fixtures(args.seed)
+
+    results = {
+        "meta": {
+            "timestamp": time.strftime('%Y-%m-%dT%H:%M:%S'),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+        },
+        "cases": {},
+    }
+    print(f"{'case':<32} {'best us':>10} {'median us':>10}")
+    for name in names:
+        entry = run_case(name, fixtures, dbs, args.repeat)
+        results["cases"][name] = entry
+        print(f"{name:<32} {entry['best_us']:>10.1f} {entry['median_us']:>10.1f}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        rows = compare(results, baseline, args.threshold)
+        print(f"\n{'case':<32} {'baseline':>10} {'current':>10} {'change':>8}")
+        for name, before, after, change, regressed in rows:
+            flag = '  REGRESSION' if regressed else ''
+            print(f"{name:<32} {before:>10.1f} {after:>10.1f} {change:>+8.1%}{flag}")
+        if any(row[4] for row in rows):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()